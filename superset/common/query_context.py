@@ -14,8 +14,8 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import copy
 import logging
-import pickle as pkl
 from datetime import datetime, timedelta
 from typing import Any, ClassVar, Dict, List, Optional
 
@@ -26,7 +26,7 @@ from superset import app, cache, db, security_manager
 from superset.connectors.base.models import BaseDatasource
 from superset.connectors.connector_registry import ConnectorRegistry
 from superset.stats_logger import BaseStatsLogger
-from superset.utils import core as utils
+from superset.utils import cache_codec, core as utils, incremental_cache
 from superset.utils.core import DTTM_ALIAS
 
 from .query_object import QueryObject
@@ -112,6 +112,46 @@ class QueryContext:
             "df": df,
         }
 
+    def get_incremental_result(
+        self, query_obj: QueryObject, **kwargs: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the result of a time series query from the blocks of the
+        incremental cache, None when the datasource doesn't use it
+        """
+        query_dict = query_obj.to_dict()
+        rule = incremental_cache.get_rule(self.datasource, query_dict)
+        if rule is None or self.force:
+            return None
+
+        queries = []
+
+        def query_range(start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+            range_obj = copy.copy(query_obj)
+            range_obj.from_dttm, range_obj.to_dttm = start, end
+            result = self.get_query_result(range_obj)
+            if result["status"] == utils.QueryStatus.FAILED:
+                return None
+            queries.append(result["query"])
+            return result["df"]
+
+        df = incremental_cache.get_incremental_df(
+            rule,
+            self.cache_key(query_obj, time_range=None, **kwargs),
+            query_dict,
+            query_range,
+            shift=timedelta(hours=self.datasource.offset or 0) + query_obj.time_shift,
+            timeout=self.cache_timeout,
+        )
+        if df is None:
+            return None
+        return {
+            "query": ";\n\n".join(queries),
+            "status": utils.QueryStatus.SUCCESS,
+            "error_message": None,
+            "df": df,
+        }
+
     @staticmethod
     def df_metrics_to_num(  # pylint: disable=invalid-name,no-self-use
         df: pd.DataFrame, query_object: QueryObject
@@ -191,7 +231,7 @@ class QueryContext:
             if cache_value:
                 stats_logger.incr("loading_from_cache")
                 try:
-                    cache_value = pkl.loads(cache_value)
+                    cache_value = cache_codec.loads_df_payload(cache_value)
                     df = cache_value["df"]
                     query = cache_value["query"]
                     status = utils.QueryStatus.SUCCESS
@@ -206,7 +246,9 @@ class QueryContext:
 
         if query_obj and not is_loaded:
             try:
-                query_result = self.get_query_result(query_obj)
+                query_result = self.get_incremental_result(
+                    query_obj, **kwargs
+                ) or self.get_query_result(query_obj)
                 status = query_result["status"]
                 query = query_result["query"]
                 error_message = query_result["error_message"]
@@ -226,7 +268,7 @@ class QueryContext:
             if is_loaded and cache_key and cache and status != utils.QueryStatus.FAILED:
                 try:
                     cache_value = dict(dttm=cached_dttm, df=df, query=query)
-                    cache_binary = pkl.dumps(cache_value, protocol=pkl.HIGHEST_PROTOCOL)
+                    cache_binary = cache_codec.dumps_df_payload(cache_value)
 
                     logger.info(
                         "Caching %d chars at key %s", len(cache_binary), cache_key
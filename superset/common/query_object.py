@@ -131,12 +131,12 @@ class QueryObject:
         "5 days ago" or "now").
         """
         cache_dict = self.to_dict()
-        cache_dict.update(extra)
 
         for k in ["from_dttm", "to_dttm"]:
             del cache_dict[k]
         if self.time_range:
             cache_dict["time_range"] = self.time_range
+        cache_dict.update(extra)
         json_data = self.json_dumps(cache_dict, sort_keys=True)
         return hashlib.md5(json_data.encode("utf-8")).hexdigest()
 
@@ -397,6 +397,69 @@ ALLOWED_EXTENSIONS = {*EXCEL_EXTENSIONS, *CSV_EXTENSIONS}
 # note: index option should not be overridden
 CSV_EXPORT = {"encoding": "utf-8"}
 
+# Dataset downloads are streamed in chunks of DATASET_EXPORT_CHUNK_SIZE rows.
+# A completed download is kept in DATASET_EXPORT_DIR for DATASET_EXPORT_TTL
+# seconds so that interrupted downloads can resume with range requests.
+DATASET_EXPORT_CHUNK_SIZE = 50000
+DATASET_EXPORT_DIR = os.path.join(DATA_DIR, "dataset_exports")
+DATASET_EXPORT_TTL = 60 * 60
+# An interrupted download is completed in the background, unless it grows past
+# DATASET_EXPORT_COMPLETE_MAX_BYTES.
+DATASET_EXPORT_COMPLETE_MAX_BYTES = 1024 * 1024 * 1024
+
+# "Save results as table" writes the chart frame in chunks of
+# SAVE_TABLE_CHUNK_SIZE rows. Frames larger than SAVE_TABLE_ASYNC_ROW_LIMIT rows
+# are handed to a celery worker through the RESULTS_BACKEND when one is set.
+SAVE_TABLE_CHUNK_SIZE = 10000
+SAVE_TABLE_ASYNC_ROW_LIMIT = 100000
+
+# Excel exports of analytics task results are built once per task and kept in
+# EXCEL_EXPORT_DIR for EXCEL_EXPORT_TTL seconds
+EXCEL_EXPORT_DIR = os.path.join(DATA_DIR, "excel_exports")
+EXCEL_EXPORT_TTL = 60 * 60 * 24
+
+# Databases with an "engine_pool" object in their extra, e.g.
+# {"engine_pool": {"pool_size": 5, "max_overflow": 10, "idle_timeout": 300}},
+# share pooled engines per schema and effective user. At most
+# DB_ENGINE_POOL_MAX_ENGINES such engines are kept per process.
+DB_ENGINE_POOL_MAX_ENGINES = 50
+
+# Time series and scatter charts whose form data turns `downsample` on are
+# downsampled to about this many points per chart, unless their form data sets
+# `downsample_max_points`
+VIZ_DOWNSAMPLE_MAX_POINTS = 5000
+
+# Time series queries on the datasources listed here, by full name as in
+# "[examples].[public].[births]" or "*" for any table, are cached per block of
+# time grains so that moving time ranges only query the blocks they miss, e.g.
+# {"*": {"volatile_window": 3600, "block_buckets": 24, "timeout": 86400}}.
+# Blocks ending less than `volatile_window` seconds ago are always queried, and
+# blocks are widened so that a range never spans more than `max_blocks` (256).
+# See superset.utils.incremental_cache
+INCREMENTAL_CACHE_RULES: Dict[str, Any] = {}
+
+# Dataframes of the chart data cache are encoded with DATA_CACHE_CODEC, "arrow"
+# for compressed Arrow IPC streams or "pickle". Arrow streams larger than
+# CACHE_CODEC_DISK_THRESHOLD bytes are kept in CACHE_CODEC_DISK_DIR, local to
+# each server, for CACHE_CODEC_DISK_TTL seconds, None keeps them all in the
+# cache backend. See superset.utils.cache_codec
+DATA_CACHE_CODEC = "arrow"
+CACHE_CODEC_COMPRESSION = "lz4"
+CACHE_CODEC_DISK_THRESHOLD: Optional[int] = None
+CACHE_CODEC_DISK_DIR = os.path.join(DATA_DIR, "cache_blobs")
+CACHE_CODEC_DISK_TTL = 60 * 60 * 24
+
+# The cache-warmup task computes the charts of its strategy in the worker on
+# `workers` threads, running at most `per_database` queries at once on each
+# database, and skips the charts not started within `time_budget` seconds.
+# Set `in_process` to False to fetch their explore URLs from the web server.
+CACHE_WARMUP_EXECUTOR: Dict[str, Any] = {
+    "in_process": True,
+    "workers": 4,
+    "per_database": 2,
+    "time_budget": 55 * 60,
+}
+
 # ---------------------------------------------------
 # Time grain configurations
 # ---------------------------------------------------
@@ -862,6 +925,12 @@ RAY_MAX_CONCURRENT = os.getenv("RAY_MAX_CONCURRENT")
 RAY_CPU_PER_TRIAL = os.getenv("RAY_CPU_PER_TRIAL")
 RAY_GPU_PER_TRIAL = os.getenv("RAY_GPU_PER_TRIAL")
 
+# Filtered input frames of the analytics tasks are staged there as Parquet so
+# that a task retried by celery reads them back instead of querying again.
+# Staged frames older than ANALYTIC_STAGING_TTL seconds are swept.
+ANALYTIC_STAGING_DIR = os.path.join(DATA_DIR, "analytic_staging")
+ANALYTIC_STAGING_TTL = 60 * 60 * 2
+
 N_CPU_CLASSIFICATION=os.getenv("N_CPU_CLASSIFICATION")
 N_GPU_CLASSIFICATION=os.getenv("N_GPU_CLASSIFICATION")
 
@@ -14,6 +14,7 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import hashlib
 import json
 import logging
 from typing import Any, Dict, Hashable, List, Optional, Type
@@ -23,11 +24,14 @@ from sqlalchemy import and_, Boolean, Column, Integer, String, Text
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import foreign, Query, relationship
 
+from superset import app, cache
 from superset.constants import NULL_STRING
 from superset.models.helpers import AuditMixinNullable, ImportMixin, QueryResult
 from superset.models.slice import Slice
 from superset.utils import core as utils
 
+logger = logging.getLogger(__name__)
+
 METRIC_FORM_DATA_PARAMS = [
     "metric",
     "metrics",
@@ -208,8 +212,11 @@ class BaseDatasource(
         )
         
         groupValues = {}
+        columns_values = self.values_for_columns(
+            [column.column_name for column in self.columns]
+        )
         for column in self.columns:
-            data = self.values_for_column(column.data.get('column_name'))
+            data = columns_values[column.column_name]
             inValue = []
             for value in data:
                 if value is not None:
@@ -368,6 +375,73 @@ class BaseDatasource(
         values in filters in the explore view"""
         raise NotImplementedError()
 
+    def fetch_values_for_columns(
+        self, column_names: List[str], limit: int, prefix: Optional[str] = None
+    ) -> Dict[str, List]:
+        """Queries the distinct values of some columns, one query per column
+        unless the datasource batches them"""
+        values = {}
+        for column_name in column_names:
+            column_values = self.values_for_column(column_name, limit)
+            if prefix:
+                column_values = [
+                    value
+                    for value in column_values
+                    if value is not None and str(value).startswith(prefix)
+                ]
+            values[column_name] = column_values
+        return values
+
+    def values_cache_key(
+        self, column_name: str, limit: int, prefix: Optional[str] = None
+    ) -> str:
+        json_data = json.dumps(
+            [self.uid, str(self.changed_on), column_name, limit, prefix]
+        )
+        return "values_for_column/{}".format(
+            hashlib.md5(json_data.encode("utf-8")).hexdigest()
+        )
+
+    def values_for_columns(
+        self, column_names: List[str], limit: int = 10000, prefix: Optional[str] = None
+    ) -> Dict[str, List]:
+        """Returns the distinct values of some columns, starting with `prefix`
+
+        Values are cached per column, keyed on the datasource and its
+        `changed_on`, the columns missing from the cache are fetched at once"""
+        keys = {name: self.values_cache_key(name, limit, prefix) for name in column_names}
+        values: Dict[str, List] = {}
+        if cache:
+            try:
+                for name, cached in zip(keys, cache.get_many(*keys.values())):
+                    if cached is not None:
+                        values[name] = cached
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning("Could not read cached column values: %s", ex)
+
+        missing = [name for name in column_names if name not in values]
+        if missing:
+            fetched = self.fetch_values_for_columns(missing, limit, prefix)
+            values.update(fetched)
+            if cache:
+                try:
+                    cache.set_many(
+                        {keys[name]: fetched[name] for name in fetched},
+                        timeout=self.values_cache_timeout,
+                    )
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.warning("Could not cache column values: %s", ex)
+        return values
+
+    @property
+    def values_cache_timeout(self) -> int:
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        database = getattr(self, "database", None)
+        if database is not None and database.cache_timeout is not None:
+            return database.cache_timeout
+        return app.config["CACHE_DEFAULT_TIMEOUT"]
+
     @staticmethod
     def default_query(qry) -> Query:
         return qry
@@ -18,6 +18,7 @@
 import logging
 import re
 from collections import OrderedDict
+from contextlib import closing
 from datetime import datetime
 from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple, Union
 
@@ -36,11 +37,14 @@ from sqlalchemy import (
     desc,
     ForeignKey,
     Integer,
+    literal,
+    null,
     or_,
     select,
     String,
     Table,
     Text,
+    union_all,
 )
 from sqlalchemy.exc import CompileError
 from sqlalchemy.orm import backref, Query, relationship, RelationshipProperty, Session
@@ -66,6 +70,9 @@ config = app.config
 metadata = Model.metadata  # pylint: disable=no-member
 logger = logging.getLogger(__name__)
 
+# Columns of distinct types that one query of fetch_values_for_columns selects
+VALUES_QUERY_MAX_SLOTS = 32
+
 
 class SqlaQuery(NamedTuple):
     extra_cache_keys: List[Any]
@@ -646,29 +653,89 @@ class SqlaTable(Model, BaseDatasource):
         """Runs query against sqla to retrieve some
         sample values for the given column.
         """
+        return self.values_for_columns([column_name], limit)[column_name]
+
+    def fetch_values_for_columns(
+        self, column_names: List[str], limit: int, prefix: Optional[str] = None
+    ) -> Dict[str, List]:
+        """Retrieves the distinct values of the columns with the UNION ALL of a
+        SELECT DISTINCT per column. A row holds the index of its column and the
+        value, in a slot shared by the columns of the same type so that values
+        keep their type. Columns of unknown type get a slot of their own and a
+        query holds at most VALUES_QUERY_MAX_SLOTS slots."""
         cols = {col.column_name: col for col in self.columns}
-        target_col = cols[column_name]
         tp = self.get_template_processor()
 
-        qry = (
-            select([target_col.get_sqla_col()])
-            .select_from(self.get_from_clause(tp))
-            .distinct()
-        )
-        if limit:
-            qry = qry.limit(limit)
-
-        if self.fetch_values_predicate:
-            tp = self.get_template_processor()
-            qry = qry.where(tp.process_template(self.fetch_values_predicate))
+        def distinct_values(column_name: str, i: int) -> ColumnElement:
+            sqla_col = cols[column_name].get_sqla_col()
+            qry = select([sqla_col.label("value")]).select_from(
+                self.get_from_clause(tp)
+            )
+            if self.fetch_values_predicate:
+                qry = qry.where(tp.process_template(self.fetch_values_predicate))
+            if prefix:
+                pattern = re.sub(r"([/%_])", r"/\1", prefix) + "%"
+                qry = qry.where(sa.cast(sqla_col, String).like(pattern, escape="/"))
+            qry = qry.distinct()
+            if limit:
+                qry = qry.limit(limit)
+            return qry.alias("values_{}".format(i)).c.value
+
+        # batches of column indexes, with the slot of each type in the batch
+        batches: List[Tuple[List[int], Dict[Any, int]]] = []
+        slot_keys = []
+        for i, column_name in enumerate(column_names):
+            slot_key = (cols[column_name].type or "").upper() or i
+            slot_keys.append(slot_key)
+            if (
+                not batches
+                or (
+                    slot_key not in batches[-1][1]
+                    and len(batches[-1][1]) >= VALUES_QUERY_MAX_SLOTS
+                )
+            ):
+                batches.append(([], {}))
+            indexes, slots = batches[-1]
+            indexes.append(i)
+            slots.setdefault(slot_key, len(slots))
 
         engine = self.database.get_sqla_engine()
-        sql = "{}".format(
-            qry.compile(engine, compile_kwargs={"literal_binds": True}, dialect=postgresql.dialect(paramstyle="named")))
-        sql = self.mutate_query_from_config(sql)
+        values: Dict[str, List] = {column_name: [] for column_name in column_names}
+        for indexes, slots in batches:
+            labels = ["__values_{}".format(k) for k in range(len(slots))]
+            selects = []
+            for i in indexes:
+                value = distinct_values(column_names[i], i)
+                slot = slots[slot_keys[i]]
+                selects.append(
+                    select(
+                        [literal(i).label("__column")]
+                        + [
+                            (value if k == slot else null()).label(label)
+                            for k, label in enumerate(labels)
+                        ]
+                    )
+                )
 
-        df = pd.read_sql_query(sql=sql, con=engine)
-        return df[column_name].to_list()
+            sql = "{}".format(
+                union_all(*selects).compile(
+                    engine,
+                    compile_kwargs={"literal_binds": True},
+                    dialect=postgresql.dialect(paramstyle="named"),
+                )
+            )
+            sql = self.mutate_query_from_config(sql)
+
+            # through a raw cursor, percent signs of the prefix are not parameters
+            with closing(engine.raw_connection()) as conn:
+                with closing(conn.cursor()) as cursor:
+                    self.database.db_engine_spec.execute(cursor, sql)
+                    rows = cursor.fetchall()
+
+            for row in rows:
+                i = row[0]
+                values[column_names[i]].append(row[slots[slot_keys[i]] + 1])
+        return values
 
     def mutate_query_from_config(self, sql: str) -> str:
         """Apply config's SQL_QUERY_MUTATOR
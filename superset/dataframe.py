@@ -27,7 +27,6 @@ from datetime import date, datetime
 
 import numpy as np
 import pandas as pd
-from pandas.core.common import maybe_box_datetimelike
 from pandas.core.dtypes.dtypes import ExtensionDtype
 
 from superset.utils.core import JS_MAX_INTEGER
@@ -62,6 +61,41 @@ def dedup(l, suffix="__", case_sensitive=True):
     return new_l
 
 
+def _stringify_large_ints(series):
+    """Turns the ints too big for JavaScript of a column into strings"""
+    values = series.to_numpy()
+    if series.dtype.kind in "iu":
+        too_big = (values > JS_MAX_INTEGER) | (values < -JS_MAX_INTEGER)
+        if not too_big.any():
+            return series
+    elif series.dtype == object and pd.api.types.infer_dtype(
+        values, skipna=True
+    ) in ("integer", "mixed-integer"):
+        too_big = np.array(
+            [type(v) is int and abs(v) > JS_MAX_INTEGER for v in values], dtype=bool
+        )
+        if not too_big.any():
+            return series
+    else:
+        return series
+    series = series.astype(object)
+    series[too_big] = series[too_big].astype(str)
+    return series
+
+
+def df_to_records(df):
+    """
+    Converts a frame to a list of records. Only the int columns are
+    inspected for values too big for JavaScript, a column at a time.
+    """
+    columns = {}
+    for i, column in enumerate(df.columns):
+        columns[column] = _stringify_large_ints(df.iloc[:, i])
+    return pd.DataFrame(columns, columns=df.columns, index=df.index).to_dict(
+        orient="records"
+    )
+
+
 def is_numeric(dtype):
     if hasattr(dtype, "_is_numeric"):
         return dtype._is_numeric
@@ -146,22 +180,7 @@ class SupersetDataFrame:
 
     @classmethod
     def format_data(cls, df):
-        # work around for https://github.com/pandas-dev/pandas/issues/18372
-        data = [
-            dict(
-                (k, maybe_box_datetimelike(v))
-                for k, v in zip(df.columns, np.atleast_1d(row))
-            )
-            for row in df.values
-        ]
-        for d in data:
-            for k, v in list(d.items()):
-                # if an int is too big for Java Script to handle
-                # convert it to a string
-                if isinstance(v, int):
-                    if abs(v) > JS_MAX_INTEGER:
-                        d[k] = str(v)
-        return data
+        return df_to_records(df)
 
     @classmethod
     def db_type(cls, dtype):
@@ -17,11 +17,10 @@
 import json
 import logging
 import os
-import pandas as pd
+import re
 
 from marshmallow import ValidationError
 from superset.exceptions import SupersetErrorException, SupersetException
-from superset.db_engine_specs.base import BaseEngineSpec
 from wtforms.validators import ValidationError
 from superset.dashboards.schemas import CloneSchema
 
@@ -29,7 +28,7 @@ import tempfile
 import uuid
 
 import yaml
-from flask import g, request, Response
+from flask import g, request, Response, send_file, stream_with_context
 from flask_appbuilder.api import BaseApi, expose, protect, rison, safe
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_babel import lazy_gettext as _
@@ -53,6 +52,8 @@ from superset.datasets.commands.exceptions import (
 )
 
 from superset.datasets.commands.refresh import RefreshDatasetCommand
+from superset.datasets.dao import DatasetDAO
+from superset.datasets.utils import iter_csv, sweep_files, tee_to_file
 from superset.datasets.commands.update import UpdateDatasetCommand
 from superset.datasets.schemas import (
     DatasetPostSchema,
@@ -60,6 +61,7 @@ from superset.datasets.schemas import (
     get_export_ids_schema,
     get_delete_ids_schema
 )
+from superset.tasks.clone import clone_dataset
 from superset.views.base import DatasourceFilter, generate_download_headers
 from superset.views.base_api import BaseSupersetModelRestApi
 from superset.views.database.filters import DatabaseFilter
@@ -85,6 +87,7 @@ class DatasetRestApi(BaseSupersetModelRestApi):
         "refresh",
         "upload_csv",
         "clone",
+        "clone_status",
         "download"
     }
     list_columns = [
@@ -860,15 +863,18 @@ class DatasetRestApi(BaseSupersetModelRestApi):
           return self.response_400(message="Table name is exist")
         cloned_table = db.session.query(SqlaTable).get(table_id)
         if cloned_table is not None:
-          BaseEngineSpec.clone_table(database, cloned_table.schema, cloned_table.table_name, temp_schema, table_name)
-          new_table = cloned_table.copy()
-          new_table.id = None
-          new_table.table_name = table_name
-          new_table.database = database
-          new_table.schema = temp_schema
-          new_table.fetch_metadata()
-          db.session.add(new_table)
-          db.session.commit()
+          if cloned_table.database_id != database.id:
+            # Copying across databases streams every row, do it in the background.
+            # The task id starts with the id of the requesting user, who is the
+            # only one allowed to read its status.
+            task = clone_dataset.apply_async(
+                args=(cloned_table.id, database.id, table_name, temp_schema),
+                task_id=f"{g.user.id}-{uuid.uuid4()}",
+            )
+            return self.response(202, message='Clone dataset started', task_id=task.id)
+
+          database.db_engine_spec.clone_table(database, cloned_table.schema, cloned_table.table_name, temp_schema, table_name)
+          DatasetDAO.create_clone(cloned_table, database, table_name, temp_schema)
           return self.response(200, message='Clone dataset success')
         else:
             return self.response_404()
@@ -876,23 +882,90 @@ class DatasetRestApi(BaseSupersetModelRestApi):
         db.session.rollback()
         return self.response_400(message=str(e))
     
+    @expose("/clone/<task_id>", methods=["GET"])
+    @protect()
+    @safe
+    def clone_status(self, task_id: str) -> Response:
+        user_id, _, _ = task_id.partition("-")
+        if user_id != str(g.user.id):
+            return self.response_404()
+        task = clone_dataset.AsyncResult(task_id)
+        info = task.info if isinstance(task.info, dict) else {}
+        if task.state == "FAILURE":
+            return self.response(200, status=task.state, message=str(task.info))
+        return self.response(
+            200, status=task.state, rows=info.get("rows"), id=info.get("id")
+        )
+
     @expose("/download/<pk>", methods=["GET"])
     @protect()
     @safe
     def download(self, pk: int):
-        query = db.session.query(SqlaTable).filter_by(id=pk)
-        item  = query.one_or_none()
+        """Streams the table as CSV, gzipped with `?compression=gzip`.
+
+        Each download is tagged with the ETag of an export kept in
+        DATASET_EXPORT_DIR, which is completed in the background when the
+        client goes away. A range request whose If-Range names a completed
+        export resumes from it, any other request streams a new export.
+        """
+        item = db.session.query(SqlaTable).filter_by(id=pk).one_or_none()
         if item is None:
-          return self.response_404()
-        
-        engine = item.database.get_sqla_engine()
-        sql = f'SELECT * FROM "{item.schema}"."{item.table_name}" ' if item.schema is not None else f'SELECT * FROM "{item.table_name}"'
-        df = pd.read_sql_query(sql=sql, con=engine)
+            return self.response_404()
+
         config = app.config
-        csv = df.to_csv(index=False,  **config["CSV_EXPORT"])
-        response = Response(csv, mimetype="text/csv")
-        response.headers[
-            "Content-Disposition"
-        ] = f"attachment; filename={item.table_name}.csv"
+        compression = "gzip" if request.args.get("compression") == "gzip" else None
+        mimetype = "application/gzip" if compression else "text/csv"
+        extension = ".csv.gz" if compression else ".csv"
+        filename = f"{item.table_name}{extension}"
+        sweep_files(config["DATASET_EXPORT_DIR"], config["DATASET_EXPORT_TTL"])
+
+        def export_path(export_id: str) -> str:
+            return os.path.join(
+                config["DATASET_EXPORT_DIR"], f"{item.id}_{export_id}{extension}"
+            )
+
+        if_range = request.if_range.etag
+        if (
+            request.range is not None
+            and if_range
+            and re.fullmatch(r"[0-9a-f]{32}", if_range)
+            and os.path.exists(export_path(if_range))
+        ):
+            path = export_path(if_range)
+            response = send_file(
+                path,
+                mimetype=mimetype,
+                as_attachment=True,
+                attachment_filename=filename,
+                add_etags=False,
+                conditional=False,
+            )
+            response.set_etag(if_range)
+            return response.make_conditional(
+                request, accept_ranges=True, complete_length=os.path.getsize(path)
+            )
+
+        export_id = uuid.uuid4().hex
+        quote = item.database.get_quoter()
+        table = (
+            f"{quote(item.schema)}.{quote(item.table_name)}"
+            if item.schema
+            else quote(item.table_name)
+        )
+        chunks = item.database.iter_df(
+            f"SELECT * FROM {table}",
+            item.schema,
+            chunksize=config["DATASET_EXPORT_CHUNK_SIZE"],
+        )
+        data = tee_to_file(
+            iter_csv(chunks, compression=compression, **config["CSV_EXPORT"]),
+            export_path(export_id),
+            complete_on_close=True,
+            complete_max_bytes=config["DATASET_EXPORT_COMPLETE_MAX_BYTES"],
+        )
+        response = Response(stream_with_context(data), mimetype=mimetype)
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        response.headers["Accept-Ranges"] = "bytes"
+        response.set_etag(export_id)
         return response
 
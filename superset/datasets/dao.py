@@ -184,6 +184,46 @@ class DatasetDAO(BaseDAO):
         """
         return DatasetMetricDAO.create(properties, commit=commit)
 
+    @staticmethod
+    def create_clone(
+        cloned_table: SqlaTable,
+        database: Database,
+        table_name: str,
+        schema: Optional[str] = None,
+        commit: bool = True,
+    ) -> SqlaTable:
+        """Creates the dataset of a physical table cloned from `cloned_table`"""
+        new_table = cloned_table.copy()
+        new_table.id = None
+        new_table.table_name = table_name
+        new_table.database = database
+        new_table.schema = schema
+        new_table.fetch_metadata()
+        db.session.add(new_table)
+        if commit:
+            db.session.commit()
+        return new_table
+
+    @staticmethod
+    def get_or_create_physical(
+        database: Database, table_name: str, schema: Optional[str] = None
+    ) -> SqlaTable:
+        """
+        Returns the dataset of a physical table that was just (re)written,
+        creating it when missing, with its metadata refreshed
+        """
+        table = (
+            db.session.query(SqlaTable)
+            .filter_by(database_id=database.id, schema=schema, table_name=table_name)
+            .one_or_none()
+        )
+        if table is None:
+            table = SqlaTable(table_name=table_name, database=database, schema=schema)
+            db.session.add(table)
+            db.session.commit()
+        table.fetch_metadata()
+        return table
+
     @staticmethod
     def bulk_delete(models: Optional[List[SqlaTable]], commit: bool = True) -> None:
         item_ids = [model.id for model in models] if models else []
@@ -1,5 +1,15 @@
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, BinaryIO, Iterator, Optional
+
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 def get_satisfied_formats(row, unique_formats):
     satisfied_formats = []  
     for format in unique_formats:
@@ -28,4 +38,118 @@ def parse_by_format_with_valid_frequency(series, formats):
                 return result
         except Exception:
             pass
-    return pd.to_datetime(series, format=formats[0])
\ No newline at end of file
+    return pd.to_datetime(series, format=formats[0])
+
+
+def iter_csv(
+    chunks: Iterator[pd.DataFrame], compression: Optional[str] = None, **kwargs: Any
+) -> Iterator[bytes]:
+    """
+    Encodes DataFrame chunks to CSV one at a time, writing the header only
+    once and optionally gzipping the output as it goes.
+    """
+    encoding = kwargs.pop("encoding", "utf-8")
+    # wbits=31 makes zlib write a gzip container
+    compressor = zlib.compressobj(wbits=31) if compression == "gzip" else None
+    header = True
+    for df in chunks:
+        data = df.to_csv(index=False, header=header, **kwargs).encode(encoding)
+        header = False
+        if compressor:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor:
+        yield compressor.flush()
+
+
+# Interrupted downloads completed in the background at the same time, the
+# others are dropped
+MAX_BACKGROUND_COMPLETIONS = 4
+_completion_slots = threading.BoundedSemaphore(MAX_BACKGROUND_COMPLETIONS)
+
+
+def _complete_file(
+    data: Iterator[bytes],
+    f: BinaryIO,
+    tmp_path: str,
+    path: str,
+    max_bytes: Optional[int] = None,
+) -> None:
+    try:
+        with f:
+            for block in data:
+                f.write(block)
+                if max_bytes is not None and f.tell() > max_bytes:
+                    logger.info("Not completing %s, over %d bytes", path, max_bytes)
+                    break
+            else:
+                f.close()
+                os.replace(tmp_path, path)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Could not complete %s", path)
+    finally:
+        _completion_slots.release()
+        close = getattr(data, "close", None)
+        if close:
+            close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def tee_to_file(
+    data: Iterator[bytes],
+    path: str,
+    complete_on_close: bool = False,
+    complete_max_bytes: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Passes blocks through while writing them to `path`. The file only appears
+    once the whole stream was consumed. An interrupted stream leaves nothing,
+    unless `complete_on_close` is set: when the consumer closes the stream
+    early, the rest of it is written to the file in a background thread. At
+    most MAX_BACKGROUND_COMPLETIONS of them run at once, and a file growing
+    past `complete_max_bytes` is given up.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    f: Optional[BinaryIO] = open(tmp_path, "wb")
+    try:
+        for block in data:
+            f.write(block)
+            yield block
+        f.close()
+        f = None
+        os.replace(tmp_path, path)
+    except GeneratorExit:
+        if (
+            complete_on_close
+            and (complete_max_bytes is None or f.tell() <= complete_max_bytes)
+            and _completion_slots.acquire(blocking=False)
+        ):
+            threading.Thread(
+                target=_complete_file,
+                args=(data, f, tmp_path, path, complete_max_bytes),
+                daemon=True,
+            ).start()
+            f = None
+        raise
+    finally:
+        if f is not None:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def sweep_files(directory: str, ttl: int) -> None:
+    """Removes the files of `directory` older than `ttl` seconds"""
+    if not os.path.isdir(directory):
+        return
+    expire_before = time.time() - ttl
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except OSError:
+            continue
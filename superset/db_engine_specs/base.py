@@ -24,6 +24,7 @@ from contextlib import closing
 from datetime import datetime
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     NamedTuple,
@@ -34,20 +35,22 @@ from typing import (
     Union,
 )
 
+import numpy
 import pandas as pd
 import sqlparse
 from flask import g
 from flask_babel import lazy_gettext as _
-from sqlalchemy import column, DateTime, select
+from sqlalchemy import Column, column, DateTime, MetaData, select
+from sqlalchemy import Table as SaTable
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.engine.interfaces import Compiled, Dialect
 from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import quoted_name, text
+from sqlalchemy.sql import quoted_name, sqltypes, text
 from sqlalchemy.sql.expression import ColumnClause, ColumnElement, Select, TextAsFrom
-from sqlalchemy.types import TypeEngine, Text, String
+from sqlalchemy.types import Integer, TypeEngine, Text, String
 from wtforms.form import Form
 
 from superset import app, sql_parse
@@ -156,6 +159,7 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
     arraysize = 0
     max_column_name_length = 0
     try_remove_schema_from_table_name = True  # pylint: disable=invalid-name
+    allows_copy_from_stdin = False
 
     # default matching patterns for identifying column types
     db_column_types: Dict[utils.DbColumnType, Tuple[Pattern, ...]] = {
@@ -469,6 +473,140 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         df = pd.concat(chunk for chunk in chunks)
         return df
 
+    @staticmethod
+    def infer_csv_dtypes(**kwargs: Any) -> Dict[str, Any]:
+        """ Stream a csv once to find the dtype each column would have if the
+        whole file was read at once, while only holding one chunk in memory
+        :param kwargs: params to be passed to DataFrame.read_csv
+        :return: Dict of column name to pandas dtype
+        """
+        from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+        kwargs["encoding"] = "utf-8"
+        kwargs["iterator"] = True
+        dtypes: Dict[str, Any] = {}
+        for chunk in pd.read_csv(**kwargs):
+            for column, dtype in chunk.dtypes.items():
+                previous = dtypes.get(column)
+                if previous is None or previous == dtype:
+                    dtypes[column] = dtype
+                elif (
+                    is_numeric_dtype(previous)
+                    and is_numeric_dtype(dtype)
+                    and not is_bool_dtype(previous)
+                    and not is_bool_dtype(dtype)
+                ):
+                    dtypes[column] = numpy.dtype("float64")
+                else:
+                    dtypes[column] = numpy.dtype("object")
+        return dtypes
+
+    @staticmethod
+    def parse_csv_dates(
+        series: pd.Series, date_format: Optional[str] = None
+    ) -> Optional[pd.Series]:
+        """ Parse a csv column as datetimes
+        :param series: Column of a csv chunk
+        :param date_format: strftime format of the dates, inferred if None
+        :return: The parsed column, None if any of its values does not parse
+        """
+        from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+        if is_numeric_dtype(series):
+            return None
+        try:
+            if date_format is None:
+                parsed, _ = handle_datetime_column(series)
+            else:
+                parsed = pd.to_datetime(series, format=date_format, errors="coerce")
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if not is_datetime64_any_dtype(parsed) or (parsed.isna() & series.notna()).any():
+            return None
+        return parsed
+
+    @staticmethod
+    def guess_csv_date_format(series: pd.Series, parsed: pd.Series) -> Optional[str]:
+        """ Find the strftime format that parses a csv column the way
+        `handle_datetime_column` did
+        :param series: Column of a csv chunk
+        :param parsed: The column parsed by `parse_csv_dates`
+        :return: The format, None if no single format matches
+        """
+        try:
+            from pandas.tseries.api import guess_datetime_format
+        except ImportError:  # pandas < 2.0
+            from pandas._libs.tslibs.parsing import (
+                _guess_datetime_format as guess_datetime_format,
+            )
+
+        values = series.dropna()
+        if values.empty:
+            return None
+        for dayfirst in (False, True):
+            date_format = guess_datetime_format(str(values.iloc[0]), dayfirst=dayfirst)
+            if date_format is not None and pd.to_datetime(
+                series, format=date_format, errors="coerce"
+            ).equals(parsed):
+                return date_format
+        return None
+
+    @classmethod
+    def infer_csv_date_columns(cls, **kwargs: Any) -> Dict[str, str]:
+        """ Stream a csv to find the columns whose values all parse as datetimes,
+        in every chunk. The format of each column is settled on the first
+        chunk and used as is for the following ones
+        :param kwargs: params to be passed to DataFrame.read_csv
+        :return: The date column names and their strftime format
+        """
+        kwargs["encoding"] = "utf-8"
+        kwargs["iterator"] = True
+        date_formats: Optional[Dict[str, str]] = None
+        for chunk in pd.read_csv(**kwargs):
+            if date_formats is None:
+                date_formats = {}
+                for column in chunk.columns:
+                    parsed = cls.parse_csv_dates(chunk[column])
+                    if parsed is None:
+                        continue
+                    date_format = cls.guess_csv_date_format(chunk[column], parsed)
+                    if date_format is not None:
+                        date_formats[column] = date_format
+            date_formats = {
+                column: date_format
+                for column, date_format in date_formats.items()
+                if cls.parse_csv_dates(chunk[column], date_format) is not None
+            }
+            if not date_formats:
+                break
+        return date_formats or {}
+
+    @staticmethod
+    def get_upload_column_dtypes(df: pd.DataFrame) -> Dict[str, TypeEngine]:
+        """ SQL types of the text columns of a DataFrame about to be uploaded
+        :param df: Dataframe with data to be uploaded
+        :return: Dict of column name to SQL type, passed as to_sql() `dtype`
+        """
+        from actableai.utils import get_type_special_no_ag
+
+        column_dtypes = {}
+        for column in df.columns:
+            type_special = get_type_special_no_ag(df[column])
+            if type_special == "text":
+                column_dtypes[column] = Text()
+            elif type_special == "category":
+                column_dtypes[column] = String()
+        return column_dtypes
+
+    @classmethod
+    def get_bulk_insert_method(cls) -> Optional[Callable]:
+        """ The `method` DataFrame.to_sql() bulk loads uploads with: COPY FROM
+        STDIN for engines that allow it, executemany otherwise
+        """
+        if cls.allows_copy_from_stdin:
+            return cls.psql_insert_copy
+        return None
+
     @classmethod
     def df_to_sql(  # pylint: disable=invalid-name
         cls, df: pd.DataFrame, **kwargs: Any
@@ -480,19 +618,8 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         :param df: Dataframe with data to be uploaded
         :param kwargs: kwargs to be passed to to_sql() method
         """
-        from actableai.utils import get_type_special_no_ag
-
         if "dtype" not in kwargs:
-            column_dtypes = {}
-
-            for column in df.columns:
-                type_special = get_type_special_no_ag(df[column])
-                if type_special == "text":
-                    column_dtypes[column] = Text()
-                elif type_special == "category":
-                    column_dtypes[column] = String()
-
-            kwargs["dtype"] = column_dtypes
+            kwargs["dtype"] = cls.get_upload_column_dtypes(df)
 
         df.to_sql(**kwargs)
 
@@ -581,37 +708,81 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         """
         Create table from contents of a csv. Note: this method does not create
         metadata for the table.
-        """
-        from pandas.api.types import is_numeric_dtype
 
-        df = cls.csv_to_df(filepath_or_buffer=filename, **csv_to_df_kwargs, )
-        # AUTO GET DATE COLUMN
-        invalid_date_columns = []
-        for c in list(df.columns):
-            try:
-                if is_numeric_dtype(df[c]):
-                    continue
-                df[c], _ = handle_datetime_column(df[c])
-                # if col_dtype == "mixed_datetime":
-                #     invalid_date_columns.append(c)
-            except:
-                continue
-
-        #RENAME COLUMN
-        for c in list(df.columns.values):
-            df = df.rename(columns={c: c.translate({ord(s): "_" for s in "\"!@#$%^&*()[]{};:,./<>?\|`~-=+"})}, copy=False)
+        The csv is streamed twice, chunk by chunk, so that memory stays bounded
+        whatever the file size: a first pass settles the dtype of each column
+        over the whole file, the second one enforces it on every chunk and
+        bulk loads the chunks in a single transaction (see
+        `get_bulk_insert_method`). Date columns and their format are settled
+        over the whole file beforehand (see `infer_csv_date_columns`).
+        """
+        from pandas.api.types import is_datetime64_any_dtype
+
+        csv_to_df_kwargs = {"chunksize": 10000, **csv_to_df_kwargs}
+        parse_dates = csv_to_df_kwargs.get("parse_dates") or []
+        dtypes = {
+            column: dtype
+            for column, dtype in cls.infer_csv_dtypes(
+                filepath_or_buffer=filename, **csv_to_df_kwargs
+            ).items()
+            if column not in parse_dates and not is_datetime64_any_dtype(dtype)
+        }
 
         engine = cls.get_engine(database)
         if schema:
             # only add schema when it is preset and non empty
             df_to_sql_kwargs["schema"] = schema
-        if engine.dialect.supports_multivalues_insert:
-            df_to_sql_kwargs["method"] = "multi"
-        cls.df_to_sql(df=df, con=engine, **df_to_sql_kwargs)
-        # warning_msg = f"WARNING: Datetime column(s) {','.join(invalid_date_columns)} contains multiple formats \
-        #     and will be converted to the majority format. \
-        #     Other datetime formats will be considered as NaT"\
-        #     if len(invalid_date_columns) > 0 else ""
+        df_to_sql_kwargs["method"] = cls.get_bulk_insert_method()
+
+        # a column is only loaded as dates when the whole file parses with the
+        # same format, a value that does not in a later chunk keeps it as text
+        date_formats = cls.infer_csv_date_columns(
+            filepath_or_buffer=filename, dtype=dtypes, **csv_to_df_kwargs
+        )
+        columns_rename: Dict[str, str] = {}
+        chunks = pd.read_csv(
+            filepath_or_buffer=filename,
+            encoding="utf-8",
+            dtype=dtypes,
+            **csv_to_df_kwargs,
+        )
+        # every chunk is loaded on the same connection in a single transaction
+        # so that a failing chunk does not leave a partially loaded table
+        with engine.begin() as conn:
+            for i, df in enumerate(chunks):
+                for c, date_format in date_formats.items():
+                    parsed = cls.parse_csv_dates(df[c], date_format)
+                    if parsed is None:
+                        raise Exception(
+                            "Could not parse the dates of column {}".format(c)
+                        )
+                    df[c] = parsed
+
+                if i == 0:
+                    #RENAME COLUMN
+                    columns_rename = {
+                        c: c.translate({ord(s): "_" for s in "\"!@#$%^&*()[]{};:,./<>?\|`~-=+"})
+                        for c in df.columns.values
+                    }
+
+                df = df.rename(columns=columns_rename, copy=False)
+                if i == 0:
+                    df_to_sql_kwargs.setdefault(
+                        "dtype", cls.get_upload_column_dtypes(df)
+                    )
+                else:
+                    df_to_sql_kwargs["if_exists"] = "append"
+                cls.df_to_sql(df=df, con=conn, **df_to_sql_kwargs)
+
+            if not columns_rename:
+                # Header only csv, the reader yields no chunk at all
+                df = pd.read_csv(
+                    filepath_or_buffer=filename,
+                    encoding="utf-8",
+                    **{**csv_to_df_kwargs, "chunksize": None, "nrows": 0},
+                )
+                cls.df_to_sql(df=df, con=conn, **df_to_sql_kwargs)
+
         return {
             "status": "SUCCESS",
             "warning_msg": ""
@@ -639,8 +810,7 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         if table.schema:
             # only add schema when it is preset and non empty
             df_to_sql_kwargs["schema"] = table.schema
-        if engine.dialect.supports_multivalues_insert:
-            df_to_sql_kwargs["method"] = "multi"
+        df_to_sql_kwargs["method"] = cls.get_bulk_insert_method()
         cls.df_to_sql(df=df, con=engine, **df_to_sql_kwargs)
 
     @classmethod
@@ -954,6 +1124,18 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         """
         return {}
 
+    @classmethod
+    def get_streaming_cursor(cls, connection: Any) -> Any:
+        """
+        Cursor of a raw DBAPI connection used to stream large results with
+        fetchmany. Drivers buffering the whole result client side fall back to
+        a regular cursor.
+
+        :param connection: Raw DBAPI connection
+        :return: Cursor instance
+        """
+        return connection.cursor()
+
     @classmethod
     def execute(cls, cursor: Any, query: str, **kwargs: Any) -> None:
         """
@@ -1111,16 +1293,138 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         return extra
 
     @classmethod
-    def clone_table(cls, database, srcSchema, srcTableName, destSchema, destTableName):
+    def clone_table(
+        cls,
+        database,
+        srcSchema,
+        srcTableName,
+        destSchema,
+        destTableName,
+        src_database=None,
+        chunksize=10000,
+        progress=None,
+    ):
+        """
+        Clone a table into `database`. When the source lives in the same
+        database the copy is left to the database with CREATE TABLE ... AS
+        SELECT. Otherwise the source rows are streamed through a server-side
+        cursor and bulk loaded chunk by chunk (see `get_bulk_insert_method`)
+        into a table whose columns follow the source table's types. The
+        half-copied table is dropped if any chunk fails.
+
+        :param src_database: Database of the source table, `database` if None
+        :param progress: Called with the number of rows copied so far
+        """
+        engine = cls.get_engine(database)
+        quote = engine.dialect.identifier_preparer.quote
+        dest = (
+            f"{quote(destSchema)}.{quote(destTableName)}"
+            if destSchema is not None
+            else quote(destTableName)
+        )
+
+        if src_database is None or src_database.id == database.id:
+            src = (
+                f"{quote(srcSchema)}.{quote(srcTableName)}"
+                if srcSchema is not None
+                else quote(srcTableName)
+            )
+            with closing(engine.connect()) as conn:
+                conn.execute(f"CREATE TABLE {dest} AS SELECT * FROM {src}")
+            return
+
+        src_quote = src_database.get_quoter()
+        src = (
+            f"{src_quote(srcSchema)}.{src_quote(srcTableName)}"
+            if srcSchema is not None
+            else src_quote(srcTableName)
+        )
+        if engine.has_table(destTableName, schema=destSchema):
+            raise ValueError(f"Table {dest} already exists.")
+
+        # the target columns follow the source table rather than the dtypes
+        # pandas happens to infer for the first chunk
+        column_types = cls.get_clone_column_types(
+            src_database, srcSchema, srcTableName, engine.dialect
+        )
+        integer_columns = [
+            name for name, type_ in column_types.items() if isinstance(type_, Integer)
+        ]
+        rows = 0
         try:
-            engine = cls.get_engine(database)
-            sql = f'SELECT * FROM "{srcSchema}"."{srcTableName}" ' if srcSchema is not None else f'SELECT * FROM "{srcTableName}"'
-            df = pd.read_sql(sql, engine)
-            return df.to_sql(destTableName, engine,
-                         if_exists="fail",
-                         chunksize=10000,
-                         index=False,
-                         schema=destSchema
-                        )
-        except Exception as e:
-            raise e
+            SaTable(
+                destTableName,
+                MetaData(),
+                *[Column(name, type_) for name, type_ in column_types.items()],
+                schema=destSchema,
+            ).create(engine)
+            for df in src_database.iter_df(
+                f"SELECT * FROM {src}", srcSchema, chunksize=chunksize
+            ):
+                for name in integer_columns:
+                    if name in df and df[name].dtype.kind == "f":
+                        # NULLs upcast integer columns to float64
+                        df[name] = df[name].astype("Int64")
+                df.to_sql(
+                    destTableName,
+                    engine,
+                    if_exists="append",
+                    index=False,
+                    schema=destSchema,
+                    method=cls.get_bulk_insert_method(),
+                    chunksize=chunksize,
+                )
+                rows += len(df)
+                if progress:
+                    progress(rows)
+        except Exception:
+            with closing(engine.connect()) as conn:
+                conn.execute(f"DROP TABLE IF EXISTS {dest}")
+            raise
+
+    @staticmethod
+    def get_clone_column_types(
+        src_database: "Database",
+        schema: Optional[str],
+        table_name: str,
+        dialect: Dialect,
+    ) -> Dict[str, TypeEngine]:
+        """
+        Map the columns of a source table to types the target dialect can
+        create. Types the target does not know, e.g. Postgres' JSONB on MySQL,
+        fall back to their closest generic SQLAlchemy type, and to TEXT when
+        there is none.
+
+        :param src_database: Database of the source table
+        :param dialect: Dialect of the target database
+        :return: Column name to type
+        """
+
+        def compiles_on_target(type_: TypeEngine) -> bool:
+            try:
+                type_.compile(dialect=dialect)
+            except Exception:  # pylint: disable=broad-except
+                return False
+            return True
+
+        column_types: Dict[str, TypeEngine] = {}
+        for col in src_database.get_columns(table_name, schema):
+            type_ = col["type"]
+            if not compiles_on_target(type_):
+                generic = (
+                    base
+                    for base in type(type_).__mro__
+                    if base.__module__ == sqltypes.__name__
+                    and issubclass(base, TypeEngine)
+                )
+                type_ = Text()
+                for base in generic:
+                    try:
+                        candidate = col["type"].adapt(base)
+                    except Exception:  # pylint: disable=broad-except
+                        continue
+                    if compiles_on_target(candidate):
+                        type_ = candidate
+                        break
+            column_types[col["name"]] = type_
+        return column_types
@@ -14,6 +14,7 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import uuid
 from datetime import datetime
 from typing import Any, List, Optional, Tuple, TYPE_CHECKING
 
@@ -68,6 +69,12 @@ class PostgresEngineSpec(PostgresBaseEngineSpec):
     engine = "postgresql"
     max_column_name_length = 63
     try_remove_schema_from_table_name = False
+    allows_copy_from_stdin = True
+
+    @classmethod
+    def get_streaming_cursor(cls, connection: Any) -> Any:
+        # named psycopg2 cursors are server-side cursors
+        return connection.cursor(name=f"superset_{uuid.uuid4().hex}")
 
     @classmethod
     def get_table_names(
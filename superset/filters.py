@@ -1,11 +1,80 @@
 import os
 from superset import db as dbs
 from sqlalchemy import bindparam, text
+import numpy as np
 import pandas as pd
-from pandas.api.types import is_datetime64tz_dtype
+import pyarrow as pa
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64tz_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_object_dtype,
+)
 
 
-def data_filters(tb_name, db, schema, filters=None, order_by=None, columns=None, datasource_id=None):
+def fix_tz_columns(df):
+    # Removing psycopg2.tz.FixedOffsetTimezone from the offsets of DateTime values
+    tz_columns = df.apply(is_datetime64tz_dtype)
+    df.loc[:, tz_columns] = df.loc[:, tz_columns].apply(lambda x : pd.to_datetime(x, utc=True))
+    return df
+
+
+def downcast_df(df, max_category_ratio=0.5):
+    """
+    Shrinks the memory footprint of a DataFrame without losing information:
+    integers and floats are downcast only when every value survives the
+    round-trip, and string columns with few distinct values become
+    categoricals.
+
+    `max_category_ratio` is the largest share of distinct values a string
+    column can have to become categorical, None disables categoricals.
+    """
+    for column in df.columns:
+        series = df[column]
+        if is_integer_dtype(series.dtype):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif is_float_dtype(series.dtype) and series.dtype != np.float32:
+            downcast = series.astype(np.float32)
+            if ((downcast == series) | series.isna()).all():
+                df[column] = downcast
+        elif (
+            max_category_ratio is not None
+            and is_object_dtype(series.dtype)
+            and len(series) > 0
+        ):
+            n_unique = series.nunique(dropna=True)
+            if n_unique <= max_category_ratio * len(series):
+                df[column] = series.astype("category")
+    return df
+
+
+def concat_chunks(chunks):
+    """
+    Concatenates DataFrame chunks. A column that is entirely null in a chunk
+    carries no type of its own, so it takes the dtype the column has in the
+    other chunks instead of turning the whole column into objects.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+
+    dtypes = {}
+    for chunk in chunks:
+        for column, dtype in chunk.dtypes.items():
+            if column not in dtypes and not chunk[column].isna().all():
+                dtypes[column] = dtype
+    for chunk in chunks:
+        for column, dtype in dtypes.items():
+            if chunk[column].dtype != dtype and chunk[column].isna().all():
+                if is_integer_dtype(dtype):
+                    dtype = np.float64
+                elif is_bool_dtype(dtype):
+                    dtype = np.object_
+                chunk[column] = chunk[column].astype(dtype)
+    return pd.concat(chunks, ignore_index=True, copy=False)
+
+
+def build_data_filters_query(tb_name, schema, filters=None, order_by=None, columns=None, datasource_id=None):
     # Transform list to set to remove duplicates
     if columns is not None:
         columns = list(dict.fromkeys(columns))
@@ -70,10 +139,75 @@ def data_filters(tb_name, db, schema, filters=None, order_by=None, columns=None,
 
     row_limit = os.getenv("ANALYTIC_ROW_LIMIT", 1000000)
     query += f" LIMIT {row_limit}"
-    df = db.get_df(query, schema)
+    return query
 
-    # Removing psycopg2.tz.FixedOffsetTimezone from the offsets of DateTime values
-    tz_columns = df.apply(is_datetime64tz_dtype)
-    df.loc[:, tz_columns] = df.loc[:, tz_columns].apply(lambda x : pd.to_datetime(x, utc=True))
 
-    return df
\ No newline at end of file
+def iter_data_filters(tb_name, db, schema, filters=None, order_by=None, columns=None,
+                      datasource_id=None, chunksize=None, as_arrow=False):
+    """
+    Streams the filtered table through a server-side cursor, yielding
+    DataFrame chunks (or Arrow record batches when `as_arrow` is set) of at
+    most `chunksize` rows with their dtypes already fixed up.
+    """
+    query = build_data_filters_query(
+        tb_name, schema, filters, order_by=order_by, columns=columns, datasource_id=datasource_id)
+    if chunksize is None:
+        chunksize = int(os.getenv("ANALYTIC_CHUNK_SIZE", 100000))
+
+    for df in db.iter_df(query, schema, chunksize=chunksize):
+        df = fix_tz_columns(df)
+        if as_arrow:
+            yield pa.RecordBatch.from_pandas(df, preserve_index=False)
+        else:
+            yield df
+
+
+def data_filters(tb_name, db, schema, filters=None, order_by=None, columns=None,
+                 datasource_id=None, compact=False):
+    """
+    Loads the filtered table into a single DataFrame, chunk by chunk. With
+    `compact` the frame is also downcast (see `downcast_df`).
+    """
+    chunks = []
+    for chunk in iter_data_filters(
+            tb_name, db, schema, filters, order_by=order_by, columns=columns,
+            datasource_id=datasource_id):
+        if compact:
+            # Categories are only decided on the whole frame, chunks would not
+            # share them
+            chunk = downcast_df(chunk, max_category_ratio=None)
+        chunks.append(chunk)
+
+    df = concat_chunks(chunks)
+    del chunks
+    if compact:
+        df = downcast_df(df)
+    return df
+
+def staged_data_filters(tb_name, db, schema, filters=None, order_by=None, columns=None,
+                        datasource_id=None, compact=False, task_id=None):
+    """
+    Same as `data_filters`, but the frame is staged as Parquet under the id of
+    the celery task and the hash of its query, so a retry of the task reads it
+    back instead of querying again. Returns the frame and its staging key,
+    which the task releases once done. Frames the task did not release are
+    released when it stops being retried.
+    """
+    from superset.utils.staging import get_staged_frame, stage_frame, staging_key
+
+    query = build_data_filters_query(
+        tb_name, schema, filters, order_by=order_by, columns=columns, datasource_id=datasource_id)
+    if task_id is None:
+        # outside of a task there is no retry to stage the frame for
+        return data_filters(
+            tb_name, db, schema, filters, order_by=order_by, columns=columns,
+            datasource_id=datasource_id, compact=compact), None
+    key = staging_key(task_id, db.id, schema, query, compact)
+
+    df = get_staged_frame(key)
+    if df is None:
+        df = data_filters(
+            tb_name, db, schema, filters, order_by=order_by, columns=columns,
+            datasource_id=datasource_id, compact=compact)
+        stage_frame(key, df)
+    return df, key
@@ -23,7 +23,7 @@ import uuid
 from contextlib import closing
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
 
 import numpy
 import pandas as pd
@@ -59,6 +59,7 @@ from superset.models.dashboard import Dashboard
 from superset.models.helpers import AuditMixinNullable, ImportMixin
 from superset.models.tags import DashboardUpdater, FavStarUpdater
 from superset.utils import cache as cache_util, core as utils
+from superset.utils.engine_pool import get_pooled_engine
 from superset.exceptions import SupersetException
 
 config = app.config
@@ -305,7 +306,8 @@ class Database(
         logger.debug("Database.get_sqla_engine(). Masked URL: %s", str(masked_url))
 
         params = extra.get("engine_params", {})
-        if nullpool:
+        pool_options = extra.get("engine_pool")
+        if nullpool and pool_options is None:
             params["poolclass"] = NullPool
 
         connect_args = params.get("connect_args", {})
@@ -339,6 +341,11 @@ class Database(
                 sqlalchemy_url, params, effective_username, security_manager, source
             )
 
+        if nullpool and pool_options is not None:
+            # reuse the bounded pool of this database, schema and user
+            return get_pooled_engine(
+                sqlalchemy_url, params, pool_options, self.id, schema, effective_username
+            )
         return create_engine(sqlalchemy_url, **params)
 
     def get_reserved_words(self) -> Set[str]:
@@ -389,6 +396,51 @@ class Database(
                         df[k] = df[k].apply(utils.json_dumps_w_dates)
                 return df
 
+    def iter_df(
+        self, sql: str, schema: Optional[str] = None, chunksize: int = 10000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yields the result of a single statement as DataFrames of at most
+        `chunksize` rows. Rows are fetched through a server-side cursor when the
+        engine spec provides one, so the full result set is never held in memory.
+        An empty result yields a single empty DataFrame carrying the columns.
+        """
+        engine = self.get_sqla_engine(schema=schema)
+        if log_query:
+            log_query(
+                engine.url, sql, schema, utils.get_username(), __name__, security_manager
+            )
+
+        # through a raw cursor, percent signs of the statement are not taken
+        # for parameters
+        with closing(engine.raw_connection()) as conn:
+            with closing(self.db_engine_spec.get_streaming_cursor(conn)) as cursor:
+                self.db_engine_spec.execute(cursor, str(sql).strip(" ;"))
+                # server-side cursors only describe the result after a fetch
+                rows = cursor.fetchmany(chunksize)
+                columns = (
+                    [col_desc[0] for col_desc in cursor.description]
+                    if cursor.description is not None
+                    else []
+                )
+                while True:
+                    df = pd.DataFrame.from_records(
+                        data=list(rows), columns=columns, coerce_float=True
+                    )
+                    for k, v in df.dtypes.items():
+                        if (
+                            v.type == numpy.object_
+                            and not df[k].empty
+                            and isinstance(df[k][0], (list, dict))
+                        ):
+                            df[k] = df[k].apply(utils.json_dumps_w_dates)
+                    yield df
+                    if not rows:
+                        break
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+
     def compile_sqla_query(self, qry: Select, schema: Optional[str] = None) -> str:
         engine = self.get_sqla_engine(schema=schema)
 
@@ -27,7 +27,8 @@ def bayesian_regression_task(self,
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
     from superset.billing.utils import add_billing_balance_history
@@ -40,7 +41,7 @@ def bayesian_regression_task(self,
     db = datasource.database
     nameTb = datasource.table_name
     schema = datasource.schema
-    pd_table = data_filters(nameTb, db, schema, filters, columns=predictors + [target], datasource_id=datasource_id)
+    pd_table, stage_key = staged_data_filters(nameTb, db, schema, filters, columns=predictors + [target], datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -72,6 +73,7 @@ def bayesian_regression_task(self,
         priors=priors,
     )
 
+    release_staged_frame(stage_key)
     data["table"] = pd_table.head(table_head)
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
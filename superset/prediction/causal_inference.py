@@ -27,7 +27,8 @@ def causal_inference_task(self,
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
 
     from actableai.tasks.causal_inference import infer_causal
     from superset.utils import connect_to_ray
@@ -40,7 +41,7 @@ def causal_inference_task(self,
     nameTb = datasource.table_name
     schema = datasource.schema
     columns = list(set(outcomes + treatments + effect_modifiers + common_causes))
-    pd_table = data_filters(nameTb, db, schema, filters, columns=columns, datasource_id=datasource_id)
+    pd_table, stage_key = staged_data_filters(nameTb, db, schema, filters, columns=columns, datasource_id=datasource_id, task_id=self.request.id)
 
     # Temp fix: somehow XGBoost GPU uses a lot of memory (on CPU) when there is no common causes
     # and effect modifier.
@@ -66,6 +67,7 @@ def causal_inference_task(self,
         )
 
     data = ray.get(result)
+    release_staged_frame(stage_key)
     data["table"] = pd_table.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
@@ -28,7 +28,8 @@ def classification_task(self,
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from actableai.tasks.classification import AAIClassificationTask
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
@@ -47,7 +48,7 @@ def classification_task(self,
     nameTb = datasource.table_name
     schema = datasource.schema
     all_columns = biased_groups + extra_columns + columns + [target]
-    pd_table = data_filters(nameTb, db, schema, filters, columns=all_columns, datasource_id=datasource_id)
+    pd_table, stage_key = staged_data_filters(nameTb, db, schema, filters, columns=all_columns, datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -85,6 +86,7 @@ def classification_task(self,
         num_gpus=0,
     )
 
+    release_staged_frame(stage_key)
     data["table"] = pd_table.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
@@ -24,7 +24,8 @@ def clustering_task(self,
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from actableai.tasks.clustering import AAIClusteringTask
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
@@ -42,7 +43,7 @@ def clustering_task(self,
     all_columns = extra_columns + columns
     if color != "cluster_id" and color not in all_columns:
         all_columns.append(color)
-    df_all = data_filters(tb_name, db, schema, filters=filters, columns=all_columns, datasource_id=datasource_id)
+    df_all, stage_key = staged_data_filters(tb_name, db, schema, filters=filters, columns=all_columns, datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -73,6 +74,7 @@ def clustering_task(self,
         max_train_samples=max_train_samples,
     )
 
+    release_staged_frame(stage_key)
     data["table"] = df_all.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
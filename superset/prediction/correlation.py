@@ -1,4 +1,3 @@
-import random
 from ray.exceptions import RayActorError
 from ray.exceptions import WorkerCrashedError
 from celery.exceptions import WorkerLostError
@@ -21,10 +20,13 @@ def correlation_task(self,
     """
     TODO write documentation
     """
+    import pandas as pd
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
+    from superset.utils.downsampling import grid_sample_indices
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
     from actableai.tasks.correlation import AAICorrelationTask
@@ -35,7 +37,7 @@ def correlation_task(self,
     db = datasource.database
     nameTb = datasource.table_name
     schema = datasource.schema
-    pd_table = data_filters(nameTb, db, schema, filters, columns=set(columns + [target_column]), datasource_id=datasource_id)
+    pd_table, stage_key = staged_data_filters(nameTb, db, schema, filters, columns=set(columns + [target_column]), datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -67,18 +69,24 @@ def correlation_task(self,
     if "data" in data and "charts" in data["data"]:
         for chart in data["data"]["charts"]:
             if chart["type"] == "lr" and len(chart["data"]["x"]) > lr_chart_max_size:
-                xy = list(zip(chart["data"]["x"] , chart["data"]["y"]))
-                random.shuffle(xy)
-                chart["data"]["x"], chart["data"]["y"] = zip(*xy[:lr_chart_max_size])
+                chart_x, chart_y = chart["data"]["x"], chart["data"]["y"]
+                keep = grid_sample_indices(
+                    pd.to_numeric(pd.Series(chart_x), errors="coerce").to_numpy(dtype=float),
+                    pd.to_numeric(pd.Series(chart_y), errors="coerce").to_numpy(dtype=float),
+                    lr_chart_max_size,
+                )
+                chart["data"]["x"] = [chart_x[i] for i in keep]
+                chart["data"]["y"] = [chart_y[i] for i in keep]
                 down_sampled = True
 
     if down_sampled:
         data["validations"].append({
             "name": "SampledOutput",
             "level": "WARNING",
-            "message": "As the data is too large to be rendered, some scatter plots display only randomly sampled data",
+            "message": "As the data is too large to be rendered, some scatter plots display only a sample of the data spread over the plot",
         })
 
+    release_staged_frame(stage_key)
     data["table"] = pd_table.head(table_head).to_dict()
 
     return data
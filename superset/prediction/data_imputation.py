@@ -4,7 +4,8 @@ from ray.exceptions import WorkerCrashedError
 from celery.exceptions import WorkerLostError
 
 from superset.extensions import celery_app
-from superset.filters import data_filters
+from superset.filters import staged_data_filters
+from superset.utils.staging import release_staged_frame
 
 @celery_app.task(bind=True,
                  autoretry_for=(RayActorError, WorkerLostError, WorkerCrashedError),
@@ -30,7 +31,7 @@ def data_imputation_task(self,
     datasource = db.session.query(SqlaTable).filter_by(id=datasource_id).one()
     db = datasource.database
     schema = datasource.schema
-    df_all = data_filters(datasource.table_name, db, schema, filters, datasource_id=datasource_id)
+    df_all, stage_key = staged_data_filters(datasource.table_name, db, schema, filters, datasource_id=datasource_id, task_id=self.request.id)
     columns_all = df_all.columns.tolist()
     if "_tid_" in columns_all:
         columns_all.remove("_tid_")
@@ -58,6 +59,7 @@ def data_imputation_task(self,
         impute_nulls
     )
 
+    release_staged_frame(stage_key)
     data["table"] = df.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
@@ -23,16 +23,17 @@ def forecast_task(self,
     from superset import db
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from actableai.tasks.forecast import AAIForecastTask
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
     from superset.billing.utils import add_billing_balance_history
 
     datasource = db.session.query(SqlaTable).filter_by(id=datasource_id).one()
-    df = data_filters(
+    df, stage_key = staged_data_filters(
         datasource.table_name, datasource.database, datasource.schema, filters,
-        order_by=date_column, columns=predicted_columns + [date_column], datasource_id=datasource_id)
+        order_by=date_column, columns=predicted_columns + [date_column], datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -61,6 +62,7 @@ def forecast_task(self,
         trials=trials
     )
 
+    release_staged_frame(stage_key)
     data["table"] = df.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
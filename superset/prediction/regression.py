@@ -44,7 +44,8 @@ def regression_task(self,
     from superset import app
     from superset.connectors.sqla.models import SqlaTable
     from superset import db
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from actableai.tasks.regression import AAIRegressionTask
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
@@ -63,7 +64,7 @@ def regression_task(self,
     db = datasource.database
     nameTb = datasource.table_name
     schema = datasource.schema
-    df = data_filters(
+    df, stage_key = staged_data_filters(
         nameTb,
         db,
         schema,
@@ -73,7 +74,8 @@ def regression_task(self,
             + biased_groups \
             + ([new_intervention_column] if new_intervention_column is not None else []) \
             + [target],
-        datasource_id=datasource_id
+        datasource_id=datasource_id,
+        task_id=self.request.id
     )
 
     connect_to_ray()
@@ -120,6 +122,7 @@ def regression_task(self,
         num_gpus=0,
     )
 
+    release_staged_frame(stage_key)
     data["table"] = df.head(table_head).to_dict()
     if data["status"] == "SUCCESS":
         add_billing_balance_history(
@@ -14,7 +14,8 @@ def sentiment_task(self, datasource_id, target, filters, user_id=None, table_hea
     from superset import db, app
     from superset.utils import connect_to_ray
     from superset.utils.prediction import get_resources_predictors_actor
-    from superset.filters import data_filters
+    from superset.filters import staged_data_filters
+    from superset.utils.staging import release_staged_frame
     from superset.connectors.sqla.models import SqlaTable
     from actableai.tasks.sentiment_analysis import AAISentimentAnalysisTask
 
@@ -23,7 +24,7 @@ def sentiment_task(self, datasource_id, target, filters, user_id=None, table_hea
     db = datasource.database
     nameTb = datasource.table_name
     schema = datasource.schema
-    pd_table = data_filters(nameTb, db, schema, filters, columns=[target], datasource_id=datasource_id)
+    pd_table, stage_key = staged_data_filters(nameTb, db, schema, filters, columns=[target], datasource_id=datasource_id, task_id=self.request.id)
 
     connect_to_ray()
 
@@ -43,6 +44,7 @@ def sentiment_task(self, datasource_id, target, filters, user_id=None, table_hea
     )
     result = task.run(pd_table[[target]], target)
 
+    release_staged_frame(stage_key)
     if user_id is not None and result["status"] == "SUCCESS":
         add_billing_balance_history(
             user_id, "sentiment_analysis", result["runtime"], datasource)
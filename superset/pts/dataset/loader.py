@@ -13,7 +13,6 @@
 
 
 import itertools
-from collections import defaultdict
 from typing import Any, Dict, Iterable, Iterator, List, Optional  # noqa: F401
 
 import numpy as np
@@ -28,20 +27,93 @@ DataBatch = Dict[str, Any]
 
 
 class BatchBuffer:
+    """
+    Fixed capacity buffer of data entries, from which batches are taken in
+    the order of addition or in a shuffled order.
+
+    Array fields are stored in arrays preallocated from the shape and dtype
+    of the first entry, with floating point fields cast to `dtype` once on
+    addition. Other fields, and arrays whose shape changes between entries,
+    are kept in lists. The entries live in slots addressed through a ring of
+    slot indices, so that shuffling and taking a batch only move indices.
+    The buffer doubles its capacity when it is full.
+
+    Parameters
+    ----------
+    batch_size
+        The size of the batches to emit.
+    device
+        device to use to store data on.
+    dtype
+        Floating point type to use.
+    capacity
+        Number of entries to preallocate, defaults to `batch_size`.
+    """
+
     def __init__(
-        self, batch_size: int, device: torch.device, dtype: np.dtype = np.float32
+        self,
+        batch_size: int,
+        device: torch.device,
+        dtype: np.dtype = np.float32,
+        capacity: Optional[int] = None,
     ) -> None:
-        self._buffers: Dict[Any, List[Any]] = defaultdict(list)
         self.batch_size = batch_size
-        self._size = 0
         self.device = device
         self.dtype = dtype
+        self._capacity = max(capacity or batch_size, 1)
+        self._arrays: Dict[Any, np.ndarray] = {}
+        self._objects: Dict[Any, List[Any]] = {}
+        # slot of each position of the ring, the positions after the
+        # buffered entries hold the free slots
+        self._slots = np.arange(self._capacity)
+        self._head = 0
+        self._size = 0
+
+    def _allocate(self, d: Dict[str, Any]) -> None:
+        for k, v in d.items():
+            if isinstance(v, np.ndarray) and v.dtype.kind != "O":
+                dtype = self.dtype if v.dtype.kind == "f" else v.dtype
+                self._arrays[k] = np.empty((self._capacity,) + v.shape, dtype=dtype)
+            else:
+                self._objects[k] = [None] * self._capacity
 
-    def add(self, d: Dict[str, List[np.ndarray]]):
-        if self._buffers:
-            assert self._buffers.keys() == d.keys()
+    def _to_objects(self, key: Any) -> None:
+        self._objects[key] = list(self._arrays.pop(key))
+
+    def _positions(self, n: int) -> np.ndarray:
+        return (self._head + np.arange(n)) % self._capacity
+
+    def _grow(self) -> None:
+        slots = self._slots[self._positions(self._size)]
+        capacity = self._capacity * 2
+        for k, array in self._arrays.items():
+            grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: self._size] = array[slots]
+            self._arrays[k] = grown
+        for k, objects in self._objects.items():
+            self._objects[k] = [objects[i] for i in slots] + [None] * (
+                capacity - self._size
+            )
+        self._capacity = capacity
+        self._slots = np.arange(capacity)
+        self._head = 0
+
+    def add(self, d: Dict[str, Any]):
+        if self._arrays or self._objects:
+            assert self._arrays.keys() | self._objects.keys() == d.keys()
+        else:
+            self._allocate(d)
+        if self._size == self._capacity:
+            self._grow()
+        slot = self._slots[(self._head + self._size) % self._capacity]
         for k, v in d.items():
-            self._buffers[k].append(v)
+            array = self._arrays.get(k)
+            if array is not None:
+                if isinstance(v, np.ndarray) and v.shape == array.shape[1:]:
+                    array[slot] = v
+                    continue
+                self._to_objects(k)
+            self._objects[k][slot] = v
         self._size += 1
 
     def __len__(self):
@@ -50,9 +122,18 @@ class BatchBuffer:
     def next_batch(self) -> DataBatch:
         assert self._size > 0
         n = min(self._size, self.batch_size)
-        batch = {k: self.stack(v[:n]) for k, v in self._buffers.items()}
-        for key in self._buffers.keys():
-            self._buffers[key] = self._buffers[key][n:]
+        slots = self._slots[self._positions(n)]
+        batch = {
+            k: torch.from_numpy(array.take(slots, axis=0)).to(
+                device=self.device, non_blocking=True
+            )
+            for k, array in self._arrays.items()
+        }
+        for k, objects in self._objects.items():
+            batch[k] = self.stack([objects[i] for i in slots])
+            for i in slots:
+                objects[i] = None
+        self._head = (self._head + n) % self._capacity
         self._size -= n
         return batch
 
@@ -63,15 +144,15 @@ class BatchBuffer:
                 data = data.astype(self.dtype)
             return torch.from_numpy(data).to(device=self.device, non_blocking=True)
         elif isinstance(xs[0], torch.Tensor):
-            return torch.stack(*xs)
+            return torch.stack(xs)
         else:
             return xs  # stack all other types as list
 
     def shuffle(self):
-        perm = np.random.permutation(self._size)
-        for key in self._buffers.keys():
-            li = self._buffers[key]
-            self._buffers[key] = [li[i] for i in perm]
+        positions = self._positions(self._size)
+        self._slots[positions] = self._slots[positions][
+            np.random.permutation(self._size)
+        ]
 
 
 class DataLoader(Iterable[DataEntry]):
@@ -150,7 +231,12 @@ class TrainDataLoader(DataLoader):
             num_batches_for_shuffling if shuffle_for_training else 1
         )
         self._cur_iter: Optional[Iterator] = None
-        self._buffer = BatchBuffer(self.batch_size, device, dtype)
+        self._buffer = BatchBuffer(
+            self.batch_size,
+            device,
+            dtype,
+            capacity=self._num_buffered_batches * self.batch_size,
+        )
 
     def _emit_batches_while_buffer_larger_than(self, thresh) -> Iterator[DataBatch]:
         if self.shuffle_for_training:
@@ -18,19 +18,39 @@ class TransformedIterableDataset(torch.utils.data.IterableDataset):
         self.is_train = is_train
         self._cur_iter: Optional[Iterator] = None
 
+    def _shard(self, collection: Iterable[DataEntry]) -> Iterable[DataEntry]:
+        # each DataLoader worker gets a copy of the dataset, transform every
+        # num_workers-th entry so that the workers do not produce duplicates
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is None or worker_info.num_workers == 1:
+            return collection
+        return itertools.islice(
+            collection, worker_info.id, None, worker_info.num_workers
+        )
+
     def _iterate_forever(self, collection: Iterable[DataEntry]) -> Iterator[DataEntry]:
         # iterate forever over the collection, the collection must be non empty
+        shard = self._shard
         while True:
-            try:
-                first = next(iter(collection))
-            except StopIteration:
+            empty = True
+            for x in shard(collection):
+                empty = False
+                yield x
+            if empty:
+                if shard == self._shard and torch.utils.data.get_worker_info():
+                    # fewer entries than workers, this worker samples from
+                    # the whole collection instead
+                    shard = iter
+                    continue
                 raise Exception("empty dataset")
-            else:
-                for x in itertools.chain([first], collection):
-                    yield x
 
     def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
         if self._cur_iter is None:
+            worker_info = torch.utils.data.get_worker_info()
+            if worker_info is not None:
+                # forked workers share the numpy random state of the parent,
+                # which would make them sample the same training windows
+                np.random.seed(worker_info.seed % 2 ** 32)
             self._cur_iter = self.transform(
                 self._iterate_forever(self.dataset), is_train=self.is_train
             )
@@ -11,6 +11,7 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+from functools import lru_cache
 from typing import List, Callable
 
 import numpy as np
@@ -35,18 +36,48 @@ from pandas.tseries.offsets import DateOffset, Day, Easter
 MAX_WINDOW = 192
 
 
+@lru_cache(maxsize=256)
+def holiday_dates(holiday: Holiday, start_year: int, end_year: int) -> np.ndarray:
+    """
+    Sorted dates of the holiday from the start of `start_year` to the end of
+    `end_year`, as datetime64 values. Cached per holiday and year range.
+    """
+    dates = holiday.dates(
+        pd.Timestamp(year=start_year, month=1, day=1),
+        pd.Timestamp(year=end_year, month=12, day=31),
+    )
+    return np.sort(pd.DatetimeIndex(dates).values)
+
+
+def distances_to_holiday(holiday: Holiday, dates) -> np.ndarray:
+    """
+    Distance in days of each date to the first occurrence of the holiday at
+    most MAX_WINDOW days before it, computed from a holiday table covering
+    all the dates instead of one holiday calendar evaluation per date.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if len(dates) == 0:
+        return np.zeros(0, dtype=np.int64)
+    window = pd.Timedelta(days=MAX_WINDOW)
+    lower = (dates - window).values
+    upper = (dates + window).values
+    table = holiday_dates(
+        holiday, (dates.min() - window).year, (dates.max() + window).year
+    )
+    positions = np.searchsorted(table, lower, side="left")
+    found = positions < len(table)
+    found[found] = table[positions[found]] <= upper[found]
+    assert found.all(), (
+        f"No closest holiday for the date index {dates[~found][0]} found."
+    )
+    # It sometimes finds two dates if it is exactly half a year after the
+    # holiday. In this case, the earlier date is used.
+    return (dates.normalize().values - table[positions]) // np.timedelta64(1, "D")
+
+
 def distance_to_holiday(holiday):
     def distance_to_day(index):
-        holiday_date = holiday.dates(
-            index - pd.Timedelta(days=MAX_WINDOW),
-            index + pd.Timedelta(days=MAX_WINDOW),
-        )
-        assert (
-            len(holiday_date) != 0
-        ), f"No closest holiday for the date index {index} found."
-        # It sometimes returns two dates if it is exactly half a year after the
-        # holiday. In this case, the smaller distance (182 days) is returned.
-        return (index - holiday_date[0]).days
+        return int(distances_to_holiday(holiday, [index])[0])
 
     return distance_to_day
 
@@ -87,40 +118,42 @@ BLACK_FRIDAY = "black_friday"
 CYBER_MONDAY = "cyber_monday"
 
 
+SPECIAL_DATE_HOLIDAYS = {
+    NEW_YEARS_DAY: NewYearsDay,
+    MARTIN_LUTHER_KING_DAY: USMartinLutherKingJr,
+    SUPERBOWL: SuperBowl,
+    PRESIDENTS_DAY: USPresidentsDay,
+    GOOD_FRIDAY: GoodFriday,
+    EASTER_SUNDAY: EasterSunday,
+    EASTER_MONDAY: EasterMonday,
+    MOTHERS_DAY: MothersDay,
+    INDEPENDENCE_DAY: IndependenceDay,
+    LABOR_DAY: USLaborDay,
+    MEMORIAL_DAY: USMemorialDay,
+    COLUMBUS_DAY: USColumbusDay,
+    THANKSGIVING: USThanksgivingDay,
+    CHRISTMAS_EVE: ChristmasEve,
+    CHRISTMAS_DAY: ChristmasDay,
+    NEW_YEARS_EVE: NewYearsEve,
+    BLACK_FRIDAY: BlackFriday,
+    CYBER_MONDAY: CyberMonday,
+}
+
 SPECIAL_DATE_FEATURES = {
-    NEW_YEARS_DAY: distance_to_holiday(NewYearsDay),
-    MARTIN_LUTHER_KING_DAY: distance_to_holiday(USMartinLutherKingJr),
-    SUPERBOWL: distance_to_holiday(SuperBowl),
-    PRESIDENTS_DAY: distance_to_holiday(USPresidentsDay),
-    GOOD_FRIDAY: distance_to_holiday(GoodFriday),
-    EASTER_SUNDAY: distance_to_holiday(EasterSunday),
-    EASTER_MONDAY: distance_to_holiday(EasterMonday),
-    MOTHERS_DAY: distance_to_holiday(MothersDay),
-    INDEPENDENCE_DAY: distance_to_holiday(IndependenceDay),
-    LABOR_DAY: distance_to_holiday(USLaborDay),
-    MEMORIAL_DAY: distance_to_holiday(USMemorialDay),
-    COLUMBUS_DAY: distance_to_holiday(USColumbusDay),
-    THANKSGIVING: distance_to_holiday(USThanksgivingDay),
-    CHRISTMAS_EVE: distance_to_holiday(ChristmasEve),
-    CHRISTMAS_DAY: distance_to_holiday(ChristmasDay),
-    NEW_YEARS_EVE: distance_to_holiday(NewYearsEve),
-    BLACK_FRIDAY: distance_to_holiday(BlackFriday),
-    CYBER_MONDAY: distance_to_holiday(CyberMonday),
+    name: distance_to_holiday(holiday)
+    for name, holiday in SPECIAL_DATE_HOLIDAYS.items()
 }
 
 
-# Kernel functions
+# Kernel functions, applied to scalars or to arrays of distances
 def indicator(distance):
-    return float(distance == 0)
+    return (np.asarray(distance) == 0).astype(float)
 
 
 def exponential_kernel(alpha=1.0, tol=1e-9):
     def kernel(distance):
         kernel_value = np.exp(-alpha * np.abs(distance))
-        if kernel_value > tol:
-            return kernel_value
-        else:
-            return 0.0
+        return np.where(kernel_value > tol, kernel_value, 0.0)
 
     return kernel
 
@@ -128,14 +161,28 @@ def exponential_kernel(alpha=1.0, tol=1e-9):
 def squared_exponential_kernel(alpha=1.0, tol=1e-9):
     def kernel(distance):
         kernel_value = np.exp(-alpha * np.abs(distance) ** 2)
-        if kernel_value > tol:
-            return kernel_value
-        else:
-            return 0.0
+        return np.where(kernel_value > tol, kernel_value, 0.0)
 
     return kernel
 
 
+def apply_kernel(kernel_function, distances: np.ndarray) -> np.ndarray:
+    """
+    Applies the kernel to an array of distances at once, falling back to one
+    call per distance for user defined kernels that only accept scalars.
+    """
+    try:
+        values = np.asarray(kernel_function(distances), dtype=np.float64)
+    except (TypeError, ValueError):
+        values = None
+    if values is None or values.shape != distances.shape:
+        values = np.array(
+            [kernel_function(distance) for distance in distances.ravel()],
+            dtype=np.float64,
+        ).reshape(distances.shape)
+    return values
+
+
 class SpecialDateFeatureSet:
     """
     Implements calculation of holiday features. The SpecialDateFeatureSet is
@@ -207,11 +254,9 @@ class SpecialDateFeatureSet:
         """
         return np.vstack(
             [
-                np.hstack(
-                    [
-                        self.kernel_function(SPECIAL_DATE_FEATURES[feat_name](index))
-                        for index in dates
-                    ]
+                apply_kernel(
+                    self.kernel_function,
+                    distances_to_holiday(SPECIAL_DATE_HOLIDAYS[feat_name], dates),
                 )
                 for feat_name in self.feature_names
             ]
@@ -287,20 +332,13 @@ class CustomDateFeatureSet:
         dates
             Pandas series with Datetimeindex timestamps.
         """
-        return (
-            np.vstack(
-                [
-                    np.hstack(
-                        [
-                            self.kernel_function((index - ref_date).days)
-                            for index in dates
-                        ]
-                    )
-                    for ref_date in self.reference_dates
-                ]
-            )
-            .sum(0, keepdims=True)
-        )
+        dates = pd.DatetimeIndex(dates).values
+        reference_dates = pd.DatetimeIndex(self.reference_dates).values
+        # (len(reference_dates), len(dates))
+        distances = (
+            dates[np.newaxis, :] - reference_dates[:, np.newaxis]
+        ) // np.timedelta64(1, "D")
+        return apply_kernel(self.kernel_function, distances).sum(0, keepdims=True)
 
 
 class CustomHolidayFeatureSet:
@@ -374,11 +412,8 @@ class CustomHolidayFeatureSet:
         """
         return np.vstack(
             [
-                np.hstack(
-                    [
-                        self.kernel_function(distance_to_holiday(custom_holiday)(index))
-                        for index in dates
-                    ]
+                apply_kernel(
+                    self.kernel_function, distances_to_holiday(custom_holiday, dates)
                 )
                 for custom_holiday in self.custom_holidays
             ]
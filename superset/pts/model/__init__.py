@@ -2,4 +2,9 @@ from .estimator import Estimator, PTSEstimator
 from .forecast import Forecast, SampleForecast, QuantileForecast, DistributionForecast
 from .predictor import Predictor, PTSPredictor
 from .quantile import Quantile
-from .utils import get_module_forward_input_names, copy_parameters, weighted_average
+from .utils import (
+    get_module_forward_input_names,
+    copy_parameters,
+    weighted_average,
+    SampleHistory,
+)
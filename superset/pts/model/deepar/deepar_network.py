@@ -6,7 +6,7 @@ import torch.nn as nn
 from torch.distributions import Distribution
 
 from pts.core.component import validated
-from pts.model import weighted_average
+from pts.model import weighted_average, SampleHistory
 from pts.modules import DistributionOutput, MeanScaler, NOPScaler, FeatureEmbedder
 
 
@@ -355,17 +355,14 @@ class DeepARPredictionNetwork(DeepARNetwork):
                 repeats=self.num_parallel_samples, dim=1
             )
 
-        future_samples = []
+        history = SampleHistory(
+            repeated_past_target, self.prediction_length, self.shifted_lags
+        )
 
         # for each future time-units we draw new samples for this time-unit and update the state
         for k in range(self.prediction_length):
             # (batch_size * num_samples, 1, *target_shape, num_lags)
-            lags = self.get_lagged_subsequences(
-                sequence=repeated_past_target,
-                sequence_length=self.history_length + k,
-                indices=self.shifted_lags,
-                subsequences_length=1,
-            )
+            lags = history.lags()
 
             # (batch_size * num_samples, 1, *target_shape, num_lags)
             lags_scaled = lags / repeated_scale.unsqueeze(-1)
@@ -394,12 +391,10 @@ class DeepARPredictionNetwork(DeepARNetwork):
             # (batch_size * num_samples, 1, *target_shape)
             new_samples = distr.sample()
 
-            # (batch_size * num_samples, seq_len, *target_shape)
-            repeated_past_target = torch.cat((repeated_past_target, new_samples), dim=1)
-            future_samples.append(new_samples)
+            history.append(new_samples)
 
         # (batch_size * num_samples, prediction_length, *target_shape)
-        samples = torch.cat(future_samples, dim=1)
+        samples = history.samples
 
         # (batch_size, num_samples, prediction_length, *target_shape)
         return samples.reshape(
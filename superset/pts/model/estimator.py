@@ -120,11 +120,19 @@ class PTSEstimator(Estimator):
             transform=train_transformation
         )
 
+        # the workers each transform their own shard of the training data and
+        # keep prefetch_factor batches ready
+        worker_kwargs = (
+            {"prefetch_factor": self.trainer.prefetch_factor}
+            if self.trainer.num_workers > 0
+            else {}
+        )
         training_data_loader = DataLoader(
             training_iter_dataset,
             batch_size=self.trainer.batch_size,
             num_workers=self.trainer.num_workers,
-            pin_memory=self.trainer.pin_memory
+            pin_memory=self.trainer.pin_memory,
+            **worker_kwargs,
         )
 
         # ensure that the training network is created on the same device
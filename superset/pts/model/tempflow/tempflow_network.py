@@ -4,7 +4,7 @@ import torch
 import torch.nn as nn
 
 from pts.core.component import validated
-from pts.model import weighted_average
+from pts.model import weighted_average, SampleHistory
 from pts.modules import RealNVP, MAF, FlowOutput, MeanScaler, NOPScaler
 
 
@@ -486,17 +486,14 @@ class TempFlowPredictionNetwork(TempFlowTrainingNetwork):
         else:
             repeated_states = repeat(begin_states, dim=1)
 
-        future_samples = []
+        history = SampleHistory(
+            repeated_past_target_cdf, self.prediction_length, self.shifted_lags
+        )
 
         # for each future time-units we draw new samples for this time-unit
         # and update the state
         for k in range(self.prediction_length):
-            lags = self.get_lagged_subsequences(
-                sequence=repeated_past_target_cdf,
-                sequence_length=self.history_length + k,
-                indices=self.shifted_lags,
-                subsequences_length=1,
-            )
+            lags = history.lags()
 
             rnn_outputs, repeated_states, _, _ = self.unroll(
                 begin_state=repeated_states,
@@ -512,14 +509,10 @@ class TempFlowPredictionNetwork(TempFlowTrainingNetwork):
             # (batch_size, 1, target_dim)
             new_samples = self.flow.sample(cond=distr_args)
 
-            # (batch_size, seq_len, target_dim)
-            future_samples.append(new_samples)
-            repeated_past_target_cdf = torch.cat(
-                (repeated_past_target_cdf, new_samples), dim=1
-            )
+            history.append(new_samples)
 
         # (batch_size * num_samples, prediction_length, target_dim)
-        samples = torch.cat(future_samples, dim=1)
+        samples = history.samples
 
         # (batch_size, num_samples, prediction_length, target_dim)
         return samples.reshape(
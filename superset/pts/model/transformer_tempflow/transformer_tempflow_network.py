@@ -5,6 +5,7 @@ import torch.nn as nn
 
 from ...core.component import validated
 from ...modules import RealNVP, MAF, FlowOutput, MeanScaler, NOPScaler
+from ..utils import SampleHistory
 
 
 class TransformerTempFlowTrainingNetwork(nn.Module):
@@ -476,17 +477,14 @@ class TransformerTempFlowPredictionNetwork(TransformerTempFlowTrainingNetwork):
         repeated_target_dimension_indicator = repeat(target_dimension_indicator)
         repeated_enc_out = repeat(enc_out, dim=1)
 
-        future_samples = []
+        history = SampleHistory(
+            repeated_past_target_cdf, self.prediction_length, self.shifted_lags
+        )
 
         # for each future time-units we draw new samples for this time-unit
         # and update the state
         for k in range(self.prediction_length):
-            lags = self.get_lagged_subsequences(
-                sequence=repeated_past_target_cdf,
-                sequence_length=self.history_length + k,
-                indices=self.shifted_lags,
-                subsequences_length=1,
-            )
+            lags = history.lags()
 
             lags_scaled = lags / repeated_scale.unsqueeze(-1)
 
@@ -524,14 +522,10 @@ class TransformerTempFlowPredictionNetwork(TransformerTempFlowTrainingNetwork):
             # (batch_size, 1, target_dim)
             new_samples = self.flow.sample(cond=distr_args)
 
-            # (batch_size, seq_len, target_dim)
-            future_samples.append(new_samples)
-            repeated_past_target_cdf = torch.cat(
-                (repeated_past_target_cdf, new_samples), dim=1
-            )
+            history.append(new_samples)
 
         # (batch_size * num_samples, prediction_length, target_dim)
-        samples = torch.cat(future_samples, dim=1)
+        samples = history.samples
 
         # (batch_size, num_samples, prediction_length, target_dim)
         return samples.reshape(
@@ -1,5 +1,5 @@
 import inspect
-from typing import Optional
+from typing import List, Optional
 
 import torch
 import torch.nn as nn
@@ -34,3 +34,61 @@ def weighted_average(
             return torch.mean(tensor, dim=dim)
         else:
             return tensor.mean()
+
+
+class SampleHistory:
+    """
+    Target history of an autoregressive sampling decoder.
+
+    The last values needed by the lags are kept in a circular buffer that the
+    new samples overwrite in place, and the lags of the next step are gathered
+    with a single `index_select`, instead of concatenating every new sample
+    to the whole history and slicing each lag out of it. The samples are
+    written to a tensor preallocated for the whole prediction range.
+
+    Parameters
+    ----------
+    past_target
+        target history. Shape: (batch_size, history_length, *target_shape).
+    prediction_length
+        number of samples that will be appended.
+    lags
+        lags of the next step, a lag of zero being the last value.
+    """
+
+    def __init__(
+        self, past_target: torch.Tensor, prediction_length: int, lags: List[int]
+    ) -> None:
+        history_length = past_target.shape[1]
+        self.window = max(lags) + 1
+        assert self.window <= history_length, (
+            f"lags cannot go further than history length, found lag {max(lags)} "
+            f"while history length is only {history_length}"
+        )
+        self.buffer = past_target[:, -self.window :].clone()
+        self.samples = past_target.new_empty(
+            (past_target.shape[0], prediction_length) + past_target.shape[2:]
+        )
+        # buffer position of each lag when the next value goes to position 0
+        self.offsets = torch.tensor(
+            [self.window - 1 - lag for lag in lags],
+            dtype=torch.long,
+            device=past_target.device,
+        )
+        self.step = 0
+
+    def lags(self) -> torch.Tensor:
+        """
+        The lagged values of the next step, same as
+        `get_lagged_subsequences(history, ..., lags, subsequences_length=1)`.
+        Shape: (batch_size, 1, *target_shape, num_lags).
+        """
+        index = (self.offsets + self.step) % self.window
+        return self.buffer.index_select(1, index).movedim(1, -1).unsqueeze(1)
+
+    def append(self, samples: torch.Tensor) -> None:
+        """Appends the samples of the next step, (batch_size, 1, *target_shape)"""
+        position = self.step % self.window
+        self.buffer[:, position : position + 1] = samples
+        self.samples[:, self.step : self.step + 1] = samples
+        self.step += 1
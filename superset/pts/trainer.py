@@ -1,11 +1,76 @@
+import logging
 import time
-from typing import List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional
 
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader
 from tqdm import tqdm
 
+
+class DevicePrefetcher:
+    """
+    Yields the network inputs of the batches of a data loader. A background
+    thread takes the next batch from the data loader and copies it to the
+    device while the current one is being used.
+
+    On CUDA devices the copy runs on a side stream, which only overlaps with
+    the computation when the data loader pins its batches. `wait_time`
+    accumulates the time the consumer spent blocked on the next batch.
+    """
+
+    def __init__(
+        self,
+        data_loader: DataLoader,
+        input_names: List[str],
+        device: Optional[torch.device] = None,
+    ) -> None:
+        self.batches = iter(data_loader)
+        self.input_names = input_names
+        self.device = torch.device(device) if device is not None else None
+        self.stream = (
+            torch.cuda.Stream(self.device)
+            if self.device is not None and self.device.type == "cuda"
+            else None
+        )
+        self.wait_time = 0.0
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.next_inputs: Future = self.executor.submit(self._load)
+
+    def _load(self) -> Optional[List[torch.Tensor]]:
+        data_entry = next(self.batches, None)
+        if data_entry is None:
+            return None
+        if self.stream is None:
+            return [data_entry[k].to(self.device) for k in self.input_names]
+        with torch.cuda.stream(self.stream):
+            return [
+                data_entry[k].to(self.device, non_blocking=True)
+                for k in self.input_names
+            ]
+
+    def __iter__(self) -> Iterator[List[torch.Tensor]]:
+        return self
+
+    def __next__(self) -> List[torch.Tensor]:
+        tic = time.time()
+        inputs = self.next_inputs.result()
+        self.wait_time += time.time() - tic
+        if inputs is None:
+            raise StopIteration
+        if self.stream is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            for tensor in inputs:
+                tensor.record_stream(current_stream)
+        self.next_inputs = self.executor.submit(self._load)
+        return inputs
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
 class Trainer:
     def __init__(
         self,
@@ -14,6 +79,7 @@ class Trainer:
         num_batches_per_epoch: int = 50,
         num_workers: int = 4,
         pin_memory: bool = False,
+        prefetch_factor: int = 2,
         learning_rate: float = 1e-3,
         weight_decay: float = 1e-6,
         device: Optional[torch.device] = None,
@@ -26,6 +92,7 @@ class Trainer:
         self.device = device
         self.num_workers = num_workers
         self.pin_memory = pin_memory
+        self.prefetch_factor = prefetch_factor
 
     def __call__(
         self, net: nn.Module, input_names: List[str], data_loader: DataLoader
@@ -34,37 +101,46 @@ class Trainer:
             net.parameters(), lr=self.learning_rate, weight_decay=self.weight_decay
         )
 
-        for epoch_no in range(self.epochs):
-            # mark epoch start time
-            tic = time.time()
-            avg_epoch_loss = 0.0
-
-            with tqdm(data_loader) as it:
-                for batch_no, data_entry in enumerate(it, start=1):
-                    optimizer.zero_grad()
-                    inputs = [data_entry[k].to(self.device) for k in input_names]
-
-                    output = net(*inputs)
-                    if isinstance(output, (list, tuple)):
-                        loss = output[0]
-                    else:
-                        loss = output
-
-                    avg_epoch_loss += loss.item()
-                    it.set_postfix(
-                        ordered_dict={
-                            "avg_epoch_loss": avg_epoch_loss / batch_no,
-                            "epoch": epoch_no,
-                        },
-                        refresh=False,
-                    )
-                    n_iter = epoch_no*self.num_batches_per_epoch + batch_no
-
-                    loss.backward()
-                    optimizer.step()
-
-                    if self.num_batches_per_epoch == batch_no:
-                        break
-
-            # mark epoch end time and log time cost of current epoch
-            toc = time.time()
+        # a single iterator is kept across epochs so that the data loader
+        # workers and their transformation state outlive each epoch
+        batches = DevicePrefetcher(data_loader, input_names, self.device)
+
+        try:
+            for epoch_no in range(self.epochs):
+                # mark epoch start time
+                tic = time.time()
+                batches.wait_time = 0.0
+                avg_epoch_loss = 0.0
+
+                with tqdm(range(self.num_batches_per_epoch)) as it:
+                    for batch_no, (_, inputs) in enumerate(zip(it, batches), start=1):
+                        optimizer.zero_grad()
+
+                        output = net(*inputs)
+                        if isinstance(output, (list, tuple)):
+                            loss = output[0]
+                        else:
+                            loss = output
+
+                        avg_epoch_loss += loss.item()
+                        it.set_postfix(
+                            ordered_dict={
+                                "avg_epoch_loss": avg_epoch_loss / batch_no,
+                                "epoch": epoch_no,
+                            },
+                            refresh=False,
+                        )
+                        n_iter = epoch_no*self.num_batches_per_epoch + batch_no
+
+                        loss.backward()
+                        optimizer.step()
+
+                # mark epoch end time and log time cost of current epoch
+                toc = time.time()
+                logging.info(
+                    f"Epoch {epoch_no}: {toc - tic:.2f}s, "
+                    f"data wait {batches.wait_time:.2f}s, "
+                    f"compute {toc - tic - batches.wait_time:.2f}s"
+                )
+        finally:
+            batches.close()
@@ -11,10 +11,13 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from pandas.tseries.offsets import Tick
 
 from ..core.component import validated
 from ..dataset import DataEntry
@@ -126,6 +129,148 @@ class AddConstFeature(MapTransformation):
         return data
 
 
+class TimeFeatureTable:
+    """
+    Time features of a contiguous range of time stamps at one frequency.
+
+    The range grows geometrically, at least by `min_padding` steps, whenever
+    a requested window falls outside of it. Offsets of time stamps in the
+    range are computed arithmetically for fixed frequencies and by a binary
+    search of the range otherwise.
+    """
+
+    min_padding = 50
+
+    def __init__(self, freq, time_features: List[TimeFeature]) -> None:
+        self.freq = freq
+        self.time_features = time_features
+        self.start: Optional[pd.Timestamp] = None
+        self.end: Optional[pd.Timestamp] = None
+        self.dates: Optional[np.ndarray] = None
+        self.features: Optional[np.ndarray] = None
+
+    def _padded(self, ts: pd.Timestamp, steps: int) -> pd.Timestamp:
+        try:
+            return shift_timestamp(ts, steps)
+        except Exception:  # out of bounds time stamps
+            sign = 1 if steps > 0 else -1
+            return shift_timestamp(ts, sign * self.min_padding)
+
+    def _grow(self, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        if self.start is None:
+            new_start = self._padded(start, -self.min_padding)
+            new_end = self._padded(end, self.min_padding)
+        else:
+            padding = max(len(self.dates), self.min_padding)
+            new_start = (
+                min(self._padded(start, -padding), self.start)
+                if start < self.start
+                else self.start
+            )
+            new_end = (
+                max(self._padded(end, padding), self.end)
+                if end > self.end
+                else self.end
+            )
+        date_range = pd.date_range(new_start, new_end, freq=self.freq)
+        self.features = (
+            np.vstack([feat(date_range) for feat in self.time_features])
+            if self.time_features
+            else None
+        )
+        self.dates = date_range.values
+        self.start = date_range[0]
+        self.end = date_range[-1]
+
+    def _offset(self, ts: pd.Timestamp) -> int:
+        if isinstance(self.freq, Tick):
+            offset, remainder = divmod(ts.value - self.start.value, self.freq.nanos)
+        else:
+            date = ts.to_datetime64()
+            offset = int(np.searchsorted(self.dates, date))
+            remainder = offset == len(self.dates) or self.dates[offset] != date
+        if remainder:
+            raise KeyError(ts)
+        return offset
+
+    @property
+    def nbytes(self) -> int:
+        if self.dates is None:
+            return 0
+        features_nbytes = self.features.nbytes if self.features is not None else 0
+        return self.dates.nbytes + features_nbytes
+
+    def get(self, start: pd.Timestamp, length: int) -> Optional[np.ndarray]:
+        """
+        Features of the `length` time stamps from `start`, as a view of
+        the table.
+        """
+        end = shift_timestamp(start, length)
+        if self.start is None or start < self.start or end > self.end:
+            self._grow(start, end)
+        if self.features is None:
+            return None
+        i0 = self._offset(start)
+        return self.features[..., i0 : i0 + length]
+
+
+# the least recently used tables are dropped once all the tables together
+# take more than this many bytes
+TIME_FEATURE_TABLES_MAX_BYTES = 256 * 2 ** 20
+
+_time_feature_tables: "OrderedDict[Tuple, TimeFeatureTable]" = OrderedDict()
+_time_feature_tables_lock = threading.Lock()
+
+
+def _time_features_key(time_features: List[TimeFeature]) -> Tuple:
+    # the init args of validated subclasses miss their own parameters, e.g.
+    # the `freq` of FourierDateFeatures, so the instance attributes are used
+    return tuple(
+        (
+            type(feat).__module__,
+            type(feat).__qualname__,
+            tuple(
+                sorted(
+                    (name, repr(value))
+                    for name, value in vars(feat).items()
+                    if name != "__init_args__"
+                )
+            ),
+        )
+        for feat in time_features
+    )
+
+
+def get_time_features(
+    time_features: List[TimeFeature], start: pd.Timestamp, length: int
+) -> Optional[np.ndarray]:
+    """
+    Time features of the `length` time stamps from `start`, looked up in a
+    table shared by all the transformations of the process that use the same
+    frequency and time features. The tables are kept up to
+    TIME_FEATURE_TABLES_MAX_BYTES, least recently used first out.
+    """
+    freq = start.freq
+    # fixed frequencies are also keyed by the phase of the time stamps so
+    # that the tables only contain time stamps on the grid of the series
+    phase = start.value % freq.nanos if isinstance(freq, Tick) else None
+    key = (freq.freqstr, phase, _time_features_key(time_features))
+    with _time_feature_tables_lock:
+        table = _time_feature_tables.pop(key, None)
+        if table is None:
+            table = TimeFeatureTable(freq, time_features)
+        features = table.get(start, length)
+        _time_feature_tables[key] = table
+
+        total_nbytes = sum(t.nbytes for t in _time_feature_tables.values())
+        while total_nbytes > TIME_FEATURE_TABLES_MAX_BYTES and _time_feature_tables:
+            # a table larger than the limit on its own is dropped as well, the
+            # returned features are a view that keeps its data alive meanwhile
+            _, evicted = _time_feature_tables.popitem(last=False)
+            total_nbytes -= evicted.nbytes
+        return features
+
+
 class AddTimeFeatures(MapTransformation):
     """
     Adds a set of time features.
@@ -133,6 +278,9 @@ class AddTimeFeatures(MapTransformation):
     If `is_train=True` the feature matrix has the same length as the `target` field.
     If `is_train=False` the feature matrix has length len(target) + pred_length
 
+    The features are looked up in time feature tables shared by the whole
+    process, see `get_time_features`.
+
     Parameters
     ----------
     start_field
@@ -160,46 +308,15 @@ class AddTimeFeatures(MapTransformation):
         self.start_field = start_field
         self.target_field = target_field
         self.output_field = output_field
-        self._min_time_point: pd.Timestamp = None
-        self._max_time_point: pd.Timestamp = None
-        self._full_range_date_features: np.ndarray = None
-        self._date_index: pd.DatetimeIndex = None
-
-    def _update_cache(self, start: pd.Timestamp, length: int) -> None:
-        end = shift_timestamp(start, length)
-        if self._min_time_point is not None:
-            if self._min_time_point <= start and end <= self._max_time_point:
-                return
-        if self._min_time_point is None:
-            self._min_time_point = start
-            self._max_time_point = end
-        self._min_time_point = min(shift_timestamp(start, -50), self._min_time_point)
-        self._max_time_point = max(shift_timestamp(end, 50), self._max_time_point)
-        self.full_date_range = pd.date_range(
-            self._min_time_point, self._max_time_point, freq=start.freq
-        )
-        self._full_range_date_features = (
-            np.vstack([feat(self.full_date_range) for feat in self.date_features])
-            if self.date_features
-            else None
-        )
-        self._date_index = pd.Series(
-            index=self.full_date_range, data=np.arange(len(self.full_date_range)),
-        )
 
     def map_transform(self, data: DataEntry, is_train: bool) -> DataEntry:
         start = data[self.start_field]
         length = target_transformation_length(
             data[self.target_field], self.pred_length, is_train=is_train
         )
-        self._update_cache(start, length)
-        i0 = self._date_index[start]
-        features = (
-            self._full_range_date_features[..., i0 : i0 + length]
-            if self.date_features
-            else None
+        data[self.output_field] = get_time_features(
+            self.date_features, start, length
         )
-        data[self.output_field] = features
         return data
 
 
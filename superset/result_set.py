@@ -20,7 +20,10 @@
 import datetime
 import json
 import logging
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple, Type
 
 import numpy as np
 import pandas as pd
@@ -63,9 +66,91 @@ def stringify(obj: Any) -> str:
     return json.dumps(obj, default=utils.json_iso_dttm_ser)
 
 
-def stringify_values(array: np.ndarray) -> np.ndarray:
-    vstringify: Callable = np.vectorize(stringify)
-    return vstringify(array)
+def stringify_values(array: Sequence[Any]) -> np.ndarray:
+    """JSON encodes every value, reusing a single encoder for the batch"""
+    encoder = json.JSONEncoder(default=utils.json_iso_dttm_ser)
+    return np.array([encoder.encode(value) for value in array], dtype=object)
+
+
+# Arrow types picked from the generic type of a cursor column, before falling
+# back to letting pyarrow infer the type from the values
+ARROW_TYPE_HINTS: List[Tuple[Pattern[str], pa.DataType]] = [
+    (
+        re.compile(
+            r"^(TINYINT|SMALLINT|INT|INTEGER|BIGINT|INT2|INT4|INT8|"
+            r"TINY|SHORT|LONG|LONGLONG|INT24)$"
+        ),
+        pa.int64(),
+    ),
+    (re.compile(r"^(FLOAT|DOUBLE|DOUBLE PRECISION|REAL|FLOAT4|FLOAT8)$"), pa.float64()),
+    (re.compile(r"^(BOOL|BOOLEAN)$"), pa.bool_()),
+    (
+        re.compile(r"^(CHAR|VARCHAR|NVARCHAR|TEXT|STRING|VAR_STRING)(\(\d+\))?$"),
+        pa.string(),
+    ),
+]
+
+# results with at least this many cells convert their columns in a thread pool
+PARALLEL_MIN_CELLS = 1000000
+PARALLEL_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+ARROW_CONVERSION_ERRORS = (
+    pa.lib.ArrowInvalid,
+    pa.lib.ArrowTypeError,
+    pa.lib.ArrowNotImplementedError,
+    TypeError,  # this is super hackey, https://issues.apache.org/jira/browse/ARROW-7855
+)
+
+
+def arrow_type_hint(db_type_str: Optional[str]) -> Optional[pa.DataType]:
+    if not db_type_str:
+        return None
+    for pattern, pa_type in ARROW_TYPE_HINTS:
+        if pattern.match(db_type_str):
+            return pa_type
+    return None
+
+
+def first_nonempty(items: Sequence[Any]) -> Any:
+    return next((i for i in items if i), None)
+
+
+def values_to_array(values: Sequence[Any], type_hint: Optional[pa.DataType]) -> pa.Array:
+    """
+    Builds the Arrow array of a column: with the hinted type first, then with
+    the inferred type, then as JSON strings
+    """
+    if type_hint is not None:
+        try:
+            return pa.array(values, type=type_hint)
+        except ARROW_CONVERSION_ERRORS:
+            pass
+    try:
+        pa_array = pa.array(values)
+    except ARROW_CONVERSION_ERRORS:
+        # attempt serialization of values as strings
+        return pa.array(stringify_values(values))
+
+    if pa.types.is_nested(pa_array.type):
+        # TODO: revisit nested column serialization once PyArrow updated with:
+        # https://github.com/apache/arrow/pull/6199
+        # Related issue: https://github.com/apache/incubator-superset/issues/8978
+        return pa.array(stringify_values(values))
+
+    if pa.types.is_temporal(pa_array.type):
+        # workaround for bug converting `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
+        # related: https://issues.apache.org/jira/browse/ARROW-5248
+        sample = first_nonempty(values)
+        if sample and isinstance(sample, datetime.datetime):
+            try:
+                if sample.tzinfo:
+                    tz = sample.tzinfo
+                    series = pd.Series(list(values), dtype="datetime64[ns]")
+                    series = pd.to_datetime(series).dt.tz_localize(tz)
+                    return pa.Array.from_pandas(series, type=pa.timestamp("ns", tz=tz))
+            except Exception as e:
+                logger.exception(e)
+    return pa_array
 
 
 class SupersetResultSet:
@@ -80,8 +165,6 @@ class SupersetResultSet:
         column_names: List[str] = []
         pa_data: List[pa.Array] = []
         deduped_cursor_desc: List[Tuple[Any, ...]] = []
-        numpy_dtype: List[Tuple[str, ...]] = []
-        stringified_arr: np.ndarray
 
         if cursor_description:
             # get deduped list of column names
@@ -93,55 +176,6 @@ class SupersetResultSet:
                 for column_name, description in zip(column_names, cursor_description)
             ]
 
-            # generate numpy structured array dtype
-            numpy_dtype = [(column_name, "object") for column_name in column_names]
-
-        # only do expensive recasting if datatype is not standard list of tuples
-        if data and (not isinstance(data, list) or not isinstance(data[0], tuple)):
-            data = [tuple(row) for row in data]
-        array = np.array(data, dtype=numpy_dtype)
-        if array.size > 0:
-            for column in column_names:
-                try:
-                    pa_data.append(pa.array(array[column].tolist()))
-                except (
-                    pa.lib.ArrowInvalid,
-                    pa.lib.ArrowTypeError,
-                    pa.lib.ArrowNotImplementedError,
-                    TypeError,  # this is super hackey, https://issues.apache.org/jira/browse/ARROW-7855
-                ):
-                    # attempt serialization of values as strings
-                    stringified_arr = stringify_values(array[column])
-                    pa_data.append(pa.array(stringified_arr.tolist()))
-
-        if pa_data:
-            for i, column in enumerate(column_names):
-                if pa.types.is_nested(pa_data[i].type):
-                    # TODO: revisit nested column serialization once PyArrow updated with:
-                    # https://github.com/apache/arrow/pull/6199
-                    # Related issue: https://github.com/apache/incubator-superset/issues/8978
-                    stringified_arr = stringify_values(array[column])
-                    pa_data[i] = pa.array(stringified_arr.tolist())
-
-                elif pa.types.is_temporal(pa_data[i].type):
-                    # workaround for bug converting `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
-                    # related: https://issues.apache.org/jira/browse/ARROW-5248
-                    sample = self.first_nonempty(array[column])
-                    if sample and isinstance(sample, datetime.datetime):
-                        try:
-                            if sample.tzinfo:
-                                tz = sample.tzinfo
-                                series = pd.Series(
-                                    array[column], dtype="datetime64[ns]"
-                                )
-                                series = pd.to_datetime(series).dt.tz_localize(tz)
-                                pa_data[i] = pa.Array.from_pandas(
-                                    series, type=pa.timestamp("ns", tz=tz)
-                                )
-                        except Exception as e:
-                            logger.exception(e)
-
-        self.table = pa.Table.from_arrays(pa_data, names=column_names)
         self._type_dict: Dict[str, Any] = {}
         try:
             # The driver may not be passing a cursor.description
@@ -153,6 +187,24 @@ class SupersetResultSet:
         except Exception as e:
             logger.exception(e)
 
+        if data and column_names:
+            # transpose the rows straight into columns, without going through
+            # an intermediate object array
+            columns = list(zip(*data))
+            type_hints = [
+                arrow_type_hint(self._type_dict.get(column)) for column in column_names
+            ]
+            if len(data) * len(column_names) >= PARALLEL_MIN_CELLS:
+                with ThreadPoolExecutor(max_workers=PARALLEL_MAX_WORKERS) as executor:
+                    pa_data = list(executor.map(values_to_array, columns, type_hints))
+            else:
+                pa_data = [
+                    values_to_array(values, type_hint)
+                    for values, type_hint in zip(columns, type_hints)
+                ]
+
+        self.table = pa.Table.from_arrays(pa_data, names=column_names)
+
     @staticmethod
     def convert_pa_dtype(pa_dtype: pa.DataType) -> Optional[str]:
         if pa.types.is_boolean(pa_dtype):
@@ -171,9 +223,39 @@ class SupersetResultSet:
     def convert_table_to_df(table: pa.Table) -> pd.DataFrame:
         return table.to_pandas(integer_object_nulls=True)
 
+    @staticmethod
+    def serialize_table(table: pa.Table) -> bytes:
+        """Encodes a table in the Arrow IPC streaming format"""
+        sink = pa.BufferOutputStream()
+        writer = pa.ipc.new_stream(sink, table.schema)
+        writer.write_table(table)
+        writer.close()
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def deserialize_table(data: bytes) -> pa.Table:
+        return pa.ipc.open_stream(data).read_all()
+
+    @staticmethod
+    def slice_table(
+        table: pa.Table,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pa.Table:
+        """Selects a window of rows of some columns, without copying them"""
+        if columns is not None:
+            columns = [column for column in columns if column in table.column_names]
+            table = pa.Table.from_arrays(
+                [table.column(column) for column in columns], names=columns
+            )
+        if limit is None:
+            return table.slice(offset)
+        return table.slice(offset, limit)
+
     @staticmethod
     def first_nonempty(items: List) -> Any:
-        return next((i for i in items if i), None)
+        return first_nonempty(items)
 
     def is_temporal(self, db_type_str: Optional[str]) -> bool:
         return self.db_engine_spec.is_db_column_type_match(
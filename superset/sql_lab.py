@@ -23,7 +23,6 @@ from typing import Optional, Tuple, Union
 
 import backoff
 import msgpack
-import pyarrow as pa
 import simplejson as json
 import sqlalchemy
 from celery.exceptions import SoftTimeLimitExceeded
@@ -39,10 +38,11 @@ from superset import (
     results_backend_use_msgpack,
     security_manager,
 )
-from superset.dataframe import SupersetDataFrame
+from superset.dataframe import df_to_records
 from superset.db_engine_specs import BaseEngineSpec
 from superset.extensions import celery_app
 from superset.models.sql_lab import Query
+from superset.result_set import SupersetResultSet
 from superset.sql_parse import ParsedQuery
 from superset.utils.core import (
     json_iso_dttm_ser,
@@ -266,7 +266,8 @@ def execute_sql_statement(sql_statement, query, user_name, session, cursor, log_
 
     logger.debug("Query %d: Fetching cursor description", query.id)
     cursor_description = cursor.description
-    return SupersetDataFrame(data, cursor_description, db_engine_spec)
+    with stats_timing("sqllab.query.time_building_result_set", stats_logger):
+        return SupersetResultSet(data, cursor_description, db_engine_spec)
 
 
 def _serialize_payload(
@@ -280,28 +281,24 @@ def _serialize_payload(
 
 
 def _serialize_and_expand_data(
-    cdf: SupersetDataFrame,
+    result_set: SupersetResultSet,
     db_engine_spec: BaseEngineSpec,
     use_msgpack: Optional[bool] = False,
     expand_data: bool = False,
 ) -> Tuple[Union[bytes, str], list, list, list]:
-    selected_columns: list = cdf.columns or []
+    selected_columns: list = result_set.columns
     expanded_columns: list
 
     if use_msgpack:
         with stats_timing(
             "sqllab.query.results_backend_pa_serialization", stats_logger
         ):
-            data = (
-                pa.default_serialization_context()
-                .serialize(cdf.raw_df)
-                .to_buffer()
-                .to_pybytes()
-            )
+            data = SupersetResultSet.serialize_table(result_set.pa_table)
         # expand when loading data from results backend
         all_columns, expanded_columns = (selected_columns, [])
     else:
-        data = cdf.data or []
+        df = result_set.to_pandas_df()
+        data = df_to_records(df) or []
         if expand_data:
             all_columns, data, expanded_columns = db_engine_spec.expand_data(
                 selected_columns, data
@@ -371,7 +368,7 @@ def execute_sql_statements(
                 query.set_extra_json_key("progress", msg)
                 session.commit()
                 try:
-                    cdf = execute_sql_statement(
+                    result_set = execute_sql_statement(
                         statement, query, user_name, session, cursor, log_params
                     )
                 except Exception as e:  # pylint: disable=broad-except
@@ -385,7 +382,7 @@ def execute_sql_statements(
         conn.commit()
 
     # Success, updating the query entry in database
-    query.rows = cdf.size
+    query.rows = result_set.size
     query.progress = 100
     query.set_extra_json_key("progress", None)
     if query.select_as_cta:
@@ -400,7 +397,10 @@ def execute_sql_statements(
 
     use_arrow_data = store_results and results_backend_use_msgpack
     data, selected_columns, all_columns, expanded_columns = _serialize_and_expand_data(
-        cdf, db_engine_spec, store_results and results_backend_use_msgpack, expand_data
+        result_set,
+        db_engine_spec,
+        store_results and results_backend_use_msgpack,
+        expand_data,
     )
 
     payload.update(
@@ -18,7 +18,11 @@
 
 import json
 import logging
-from typing import Any, Dict, Optional
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from urllib import request
 from urllib.error import URLError
 
@@ -31,11 +35,13 @@ from superset.models.core import Log
 from superset.models.dashboard import Dashboard
 from superset.models.slice import Slice
 from superset.models.tags import Tag, TaggedObject
-from superset.utils.core import parse_human_datetime
+from superset.utils.core import parse_human_datetime, QueryStatus
+from superset.utils.dates import now_as_float
 from superset.views.utils import build_extra_filters
 
 logger = get_task_logger(__name__)
 logger.setLevel(logging.INFO)
+stats_logger = app.config["STATS_LOGGER"]
 
 
 def get_form_data(chart_id, dashboard=None):
@@ -87,8 +93,10 @@ class Strategy:
     """
     A cache warm up strategy.
 
-    Each strategy defines a `get_urls` method that returns a list of URLs to
-    be fetched from the `/superset/warm_up_cache/` endpoint.
+    Each strategy defines a `get_charts` method that returns the charts to
+    warm up, along with the form data overriding theirs. They are either
+    computed in the worker, see `warm_up_charts`, or fetched from the URLs
+    returned by `get_urls`.
 
     Strategies can be configured in `superset/config.py`:
 
@@ -109,8 +117,12 @@ class Strategy:
     def __init__(self):
         pass
 
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
+        """The charts to warm up, with the form data overriding theirs"""
+        raise NotImplementedError("Subclasses must implement get_charts!")
+
     def get_urls(self):
-        raise NotImplementedError("Subclasses must implement get_urls!")
+        return [get_url(chart, overrides) for chart, overrides in self.get_charts()]
 
 
 class DummyStrategy(Strategy):
@@ -131,11 +143,11 @@ class DummyStrategy(Strategy):
 
     name = "dummy"
 
-    def get_urls(self):
+    def get_charts(self):
         session = db.create_scoped_session()
         charts = session.query(Slice).all()
 
-        return [get_url(chart) for chart in charts]
+        return [(chart, None) for chart in charts]
 
 
 class TopNDashboardsStrategy(Strategy):
@@ -163,8 +175,8 @@ class TopNDashboardsStrategy(Strategy):
         self.top_n = top_n
         self.since = parse_human_datetime(since)
 
-    def get_urls(self):
-        urls = []
+    def get_charts(self):
+        charts = []
         session = db.create_scoped_session()
 
         records = (
@@ -180,9 +192,9 @@ class TopNDashboardsStrategy(Strategy):
         for dashboard in dashboards:
             for chart in dashboard.slices:
                 form_data_with_filters = get_form_data(chart.id, dashboard)
-                urls.append(get_url(chart, form_data_with_filters))
+                charts.append((chart, form_data_with_filters))
 
-        return urls
+        return charts
 
 
 class DashboardTagsStrategy(Strategy):
@@ -207,8 +219,8 @@ class DashboardTagsStrategy(Strategy):
         super(DashboardTagsStrategy, self).__init__()
         self.tags = tags or []
 
-    def get_urls(self):
-        urls = []
+    def get_charts(self):
+        charts = []
         session = db.create_scoped_session()
 
         tags = session.query(Tag).filter(Tag.name.in_(self.tags)).all()
@@ -229,7 +241,7 @@ class DashboardTagsStrategy(Strategy):
         tagged_dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids))
         for dashboard in tagged_dashboards:
             for chart in dashboard.slices:
-                urls.append(get_url(chart))
+                charts.append((chart, None))
 
         # add charts that are tagged
         tagged_objects = (
@@ -245,20 +257,152 @@ class DashboardTagsStrategy(Strategy):
         chart_ids = [tagged_object.object_id for tagged_object in tagged_objects]
         tagged_charts = session.query(Slice).filter(Slice.id.in_(chart_ids))
         for chart in tagged_charts:
-            urls.append(get_url(chart))
+            charts.append((chart, None))
 
-        return urls
+        return charts
 
 
 strategies = [DummyStrategy, TopNDashboardsStrategy, DashboardTagsStrategy]
 
 
+def _warm_up_key(chart: Slice, form_data: Dict[str, Any]) -> Optional[str]:
+    """
+    The key charts sharing their cached data have in common, None for the
+    charts without a cached dataframe
+    """
+    from superset.viz import task_types, viz_types
+
+    # analytics charts cache the results of their celery tasks
+    if chart.viz_type in task_types or chart.datasource is None:
+        return None
+    viz_obj = viz_types[chart.viz_type](chart.datasource, form_data=form_data)
+    query_obj = viz_obj.query_obj()
+    if not query_obj:
+        return None
+    # time comparisons are extra queries, outside of the main cache key
+    return json.dumps(
+        [viz_obj.cache_key(query_obj), form_data.get("time_compare")],
+        default=str,
+    )
+
+
+def _warm_up_chart(
+    chart_id: int,
+    form_data: Dict[str, Any],
+    semaphore: threading.Semaphore,
+    deadline: float,
+) -> Dict[str, Any]:
+    """Computes and caches the payload of a chart, unless past the deadline"""
+    from superset.viz import viz_types
+
+    result: Dict[str, Any] = {"chart_id": chart_id, "status": "skipped"}
+    with semaphore, app.test_request_context():
+        if time.time() > deadline:
+            return result
+        start = now_as_float()
+        try:
+            chart = db.session.query(Slice).get(chart_id)
+            viz_obj = viz_types[chart.viz_type](
+                chart.datasource, form_data=form_data, force=True
+            )
+            payload = viz_obj.get_payload()
+            failed = payload.get("status") == QueryStatus.FAILED
+            result["status"] = "error" if failed else "success"
+            if failed:
+                result["error"] = payload.get("error")
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.exception("Error warming up chart %s", chart_id)
+            result["status"] = "error"
+            result["error"] = str(ex)
+        result["duration_ms"] = now_as_float() - start
+    stats_logger.timing("cache_warmup.chart", result["duration_ms"])
+    return result
+
+
+def warm_up_charts(
+    charts: List[Tuple[Slice, Optional[Dict[str, Any]]]],
+    workers: int = 4,
+    per_database: int = 2,
+    time_budget: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Computes the payloads of charts in the worker, on a pool of `workers`
+    threads running at most `per_database` queries on each database. Charts
+    sharing their cached data are computed once, the charts not started
+    within `time_budget` seconds are skipped.
+    """
+    deadline = time.time() + time_budget if time_budget else float("inf")
+    semaphores: Dict[Any, threading.Semaphore] = defaultdict(
+        lambda: threading.BoundedSemaphore(per_database)
+    )
+    jobs = {}
+    shared: Dict[str, List[int]] = defaultdict(list)
+    errors, skipped = [], []
+    with app.test_request_context():
+        for chart, overrides in charts:
+            form_data = dict(chart.form_data, **(overrides or {}))
+            try:
+                key = _warm_up_key(chart, form_data)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error loading chart %s", chart.id)
+                errors.append(chart.id)
+                continue
+            if key is None:
+                skipped.append(chart.id)
+            elif key in jobs:
+                shared[key].append(chart.id)
+            else:
+                datasource = chart.datasource
+                database_id = getattr(datasource, "database_id", datasource.uid)
+                jobs[key] = (chart.id, form_data, database_id)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            key: executor.submit(
+                _warm_up_chart,
+                chart_id,
+                form_data,
+                semaphores[database_id],
+                deadline,
+            )
+            for key, (chart_id, form_data, database_id) in jobs.items()
+        }
+        results = {key: future.result() for key, future in futures.items()}
+
+    report: Dict[str, Any] = {
+        "success": [],
+        "errors": errors,
+        "skipped": skipped,
+        "charts": [],
+    }
+    for key, result in results.items():
+        result["shared_with"] = shared[key]
+        report["charts"].append(result)
+        chart_ids = [result["chart_id"]] + shared[key]
+        if result["status"] == "success":
+            report["success"].extend(chart_ids)
+        elif result["status"] == "error":
+            report["errors"].extend(chart_ids)
+        else:
+            report["skipped"].extend(chart_ids)
+    logger.info(
+        "Warmed up %d charts, %d errors, %d skipped",
+        len(report["success"]),
+        len(report["errors"]),
+        len(report["skipped"]),
+    )
+    return report
+
+
 @celery_app.task(name="cache-warmup")
-def cache_warmup(strategy_name, *args, **kwargs):
+def cache_warmup(strategy_name, *args, executor=None, **kwargs):
     """
     Warm up cache.
 
-    This task periodically hits charts to warm up the cache.
+    This task periodically warms up the cache of the charts of a strategy.
+    Unless CACHE_WARMUP_EXECUTOR, or the `executor` argument, sets
+    `in_process` to false, the charts are computed in the worker by
+    `warm_up_charts`, otherwise their URLs are fetched one by one.
 
     """
     logger.info("Loading strategy")
@@ -280,6 +424,10 @@ def cache_warmup(strategy_name, *args, **kwargs):
         logger.exception(message)
         return message
 
+    options = dict(app.config["CACHE_WARMUP_EXECUTOR"], **(executor or {}))
+    if options.pop("in_process", True):
+        return warm_up_charts(strategy.get_charts(), **options)
+
     results = {"success": [], "errors": []}
     for url in strategy.get_urls():
         try:
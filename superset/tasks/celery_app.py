@@ -20,6 +20,11 @@ This is the main entrypoint used by Celery workers. As such,
 it needs to call create_app() in order to initialize things properly
 """
 
+import logging
+
+from celery import states
+from celery.signals import task_postrun, worker_process_init
+
 # Superset framework imports
 from superset import create_app
 from superset.extensions import celery_app
@@ -29,7 +34,30 @@ create_app()
 
 # Need to import late, as the celery_app will have been setup by "create_app()"
 # pylint: disable=wrong-import-position, unused-import
-from . import cache, schedules  # isort:skip
+from . import cache, clone, save_table, schedules  # isort:skip
 
 # Export the celery app globally for Celery (as run on the cmd line) to find
 app = celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@worker_process_init.connect
+def init_ray_connection(**kwargs):  # pylint: disable=unused-argument
+    """Opens the Ray client connection shared by the tasks of this worker process"""
+    from superset.utils import connect_to_ray
+
+    try:
+        connect_to_ray()
+    except Exception:  # pylint: disable=broad-except
+        # Tasks connect lazily, a cluster that is down must not kill the worker
+        logger.exception("Could not connect to Ray on worker start")
+
+
+@task_postrun.connect
+def release_staged_frames(task_id=None, state=None, **kwargs):  # pylint: disable=unused-argument
+    """Releases the frames staged by a task, unless it is going to be retried"""
+    from superset.utils.staging import release_task_frames
+
+    if task_id and state != states.RETRY:
+        release_task_frames(task_id)
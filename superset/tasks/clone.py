@@ -0,0 +1,56 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+from celery.utils.log import get_task_logger
+
+from superset import db
+from superset.connectors.sqla.models import SqlaTable
+from superset.datasets.dao import DatasetDAO
+from superset.extensions import celery_app
+from superset.models.core import Database
+
+logger = get_task_logger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@celery_app.task(name="dataset.clone", bind=True)
+def clone_dataset(self, table_id, database_id, table_name, schema=None):
+    """
+    Copies the physical table behind a dataset into another database, then
+    creates the dataset of the copy. The number of rows copied so far is
+    reported in the task meta while it runs.
+    """
+    cloned_table = db.session.query(SqlaTable).get(table_id)
+    database = db.session.query(Database).get(database_id)
+    self.update_state(state="PROCESSING", meta={"rows": 0})
+
+    def progress(rows):
+        self.update_state(state="PROCESSING", meta={"rows": rows})
+
+    logger.info("Cloning dataset %s into %s", table_id, table_name)
+    database.db_engine_spec.clone_table(
+        database,
+        cloned_table.schema,
+        cloned_table.table_name,
+        schema,
+        table_name,
+        src_database=cloned_table.database,
+        progress=progress,
+    )
+    new_table = DatasetDAO.create_clone(cloned_table, database, table_name, schema)
+    return {"status": "SUCCESS", "id": new_table.id}
@@ -0,0 +1,59 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import io
+import logging
+
+import pandas as pd
+from celery.utils.log import get_task_logger
+
+from superset import app, db, results_backend
+from superset.datasets.dao import DatasetDAO
+from superset.extensions import celery_app
+from superset.models.core import Database
+
+logger = get_task_logger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def stage_table_frame(key: str, df: pd.DataFrame) -> None:
+    """Hands a frame to `save_table` through the results backend, as Parquet"""
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine="pyarrow", index=False)
+    results_backend.set(key, buf.getvalue(), app.config["CACHE_DEFAULT_TIMEOUT"])
+
+
+@celery_app.task(name="dataset.save_table", bind=True)
+def save_table(self, results_key, table_name, database_id, schema=None):
+    """
+    Writes a frame staged with `stage_table_frame` to a physical table, then
+    creates or refreshes its dataset
+    """
+    # pylint: disable=import-outside-toplevel
+    from superset.viz import BaseViz
+
+    blob = results_backend.get(results_key)
+    if blob is None:
+        raise Exception("Staged frame {} expired".format(results_key))
+    df = pd.read_parquet(io.BytesIO(blob), engine="pyarrow")
+    database = db.session.query(Database).get(database_id)
+
+    logger.info("Saving %s rows to %s", len(df), table_name)
+    self.update_state(state="PROCESSING", meta={"rows": len(df)})
+    BaseViz.create_table_from_df(table_name, database, schema, df)
+    table = DatasetDAO.get_or_create_physical(database, table_name, schema)
+    results_backend.delete(results_key)
+    return {"status": "SUCCESS", "id": table.id}
@@ -18,6 +18,7 @@
 import ray
 import ray.util.client
 import logging
+import threading
 import simplejson
 import numpy as np
 import pandas as pd
@@ -29,15 +30,37 @@ from hubspot.crm.contacts import SimplePublicObjectInput, ApiException
 import os
 
 
-def connect_to_ray():
-    import os
-    ray.util.client.ray.disconnect()
-    try:
-        ray.init(os.getenv("RAY_CLIENT"), namespace="aai")
-    except RuntimeError as err:
-        if "Ray Client is already connected" not in str(err):
-            raise
-                    
+_ray_connection_lock = threading.Lock()
+
+
+def connect_to_ray(force=False):
+    """
+    Makes sure this process holds a live Ray client connection.
+
+    The connection is opened once per process (celery workers open it on
+    `worker_process_init`) and shared by every task running in it. It is
+    only re-established when it was lost, or when `force` is set, so
+    concurrent tasks no longer tear down each other's connection.
+    """
+    from superset import app
+    from superset.utils.dates import now_as_float
+
+    stats_logger = app.config["STATS_LOGGER"]
+    with _ray_connection_lock:
+        if not force and ray.util.client.ray.is_connected():
+            stats_logger.incr("ray_connection_reused")
+            return
+
+        start = now_as_float()
+        ray.util.client.ray.disconnect()
+        try:
+            ray.init(os.getenv("RAY_CLIENT"), namespace="aai")
+        except RuntimeError as err:
+            if "Ray Client is already connected" not in str(err):
+                raise
+        stats_logger.incr("ray_connection_opened")
+        stats_logger.timing("ray_connection.time_connecting", now_as_float() - start)
+
 
 def print_type(map, indent=""):
     print(indent + "{")
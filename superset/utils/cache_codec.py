@@ -0,0 +1,177 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Encoding of the dataframes kept in the chart data cache
+
+With the "arrow" codec a cached payload is a small header followed by the
+dataframe as a compressed Arrow IPC stream:
+
+    MAGIC | header length (4 bytes, big endian) | JSON header | Arrow IPC body
+
+The header holds the other keys of the payload (dttm, query, ...), the codec
+and the schema version. Bodies larger than CACHE_CODEC_DISK_THRESHOLD bytes are
+written to CACHE_CODEC_DISK_DIR and only the header, with the file name, goes
+to the cache backend. The disk tier is local to each server, a missing file is
+a cache miss. Payloads without the magic prefix are legacy pickles.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle as pkl
+import struct
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from superset import app
+from superset.utils.dates import now_as_float
+
+config = app.config
+stats_logger = config["STATS_LOGGER"]
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SSDF"
+SCHEMA_VERSION = 1
+_HEADER_LENGTH = struct.Struct(">I")
+
+# the disk tier is swept at most this often, in seconds
+SWEEP_INTERVAL = 60
+_last_sweep = 0.0
+
+
+def _disk_dir() -> str:
+    return config["CACHE_CODEC_DISK_DIR"]
+
+
+def sweep_disk_tier() -> None:
+    """Removes the bodies that outlived CACHE_CODEC_DISK_TTL"""
+    global _last_sweep  # pylint: disable=global-statement
+    now = time.time()
+    if now - _last_sweep < SWEEP_INTERVAL or not os.path.isdir(_disk_dir()):
+        return
+    _last_sweep = now
+    expire_before = now - config["CACHE_CODEC_DISK_TTL"]
+    for filename in os.listdir(_disk_dir()):
+        path = os.path.join(_disk_dir(), filename)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def _write_body(body: bytes) -> str:
+    """Writes a body to the disk tier, named after its content"""
+    sweep_disk_tier()
+    os.makedirs(_disk_dir(), exist_ok=True)
+    filename = "{}.arrow".format(hashlib.sha1(body).hexdigest())
+    path = os.path.join(_disk_dir(), filename)
+    tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return filename
+
+
+def _encode_arrow(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df)
+    options = pa.ipc.IpcWriteOptions(
+        compression=config["CACHE_CODEC_COMPRESSION"] or None
+    )
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_stream(sink, table.schema, options=options)
+    writer.write_table(table)
+    writer.close()
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_arrow(source: Any) -> pd.DataFrame:
+    table = pa.ipc.open_stream(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def dumps_df_payload(payload: Dict[str, Any], codec: Optional[str] = None) -> bytes:
+    """
+    Encodes a payload holding a dataframe under "df" with the configured
+    DATA_CACHE_CODEC, falling back to pickle for frames Arrow can't hold
+    """
+    codec = codec or config["DATA_CACHE_CODEC"]
+    start = now_as_float()
+    data = None
+    if codec == "arrow":
+        try:
+            data = _dumps_arrow(payload)
+        except (pa.ArrowException, TypeError, ValueError) as ex:
+            logger.info("Caching the dataframe as a pickle: %s", ex)
+    if data is None:
+        codec = "pickle"
+        data = pkl.dumps(payload, protocol=pkl.HIGHEST_PROTOCOL)
+    stats_logger.timing("cache_codec.{}.encode".format(codec), now_as_float() - start)
+    stats_logger.timing("cache_codec.{}.bytes".format(codec), len(data))
+    return data
+
+
+def _dumps_arrow(payload: Dict[str, Any]) -> bytes:
+    header = {k: v for k, v in payload.items() if k != "df"}
+    header["codec"] = "arrow"
+    header["version"] = SCHEMA_VERSION
+    body = _encode_arrow(payload["df"])
+    threshold = config["CACHE_CODEC_DISK_THRESHOLD"]
+    if threshold is not None and len(body) > threshold:
+        header["path"] = _write_body(body)
+        body = b""
+    header_bytes = json.dumps(header).encode("utf-8")
+    return b"".join(
+        [MAGIC, _HEADER_LENGTH.pack(len(header_bytes)), header_bytes, body]
+    )
+
+
+def loads_df_payload(data: bytes) -> Dict[str, Any]:
+    """
+    Decodes a payload of `dumps_df_payload`, or a legacy pickle. The Arrow
+    body is read in place, without copying it out of `data` or of the file of
+    the disk tier. Raises when the payload can't be read.
+    """
+    start = now_as_float()
+    if data[: len(MAGIC)] != MAGIC:
+        payload = pkl.loads(data)
+        stats_logger.timing("cache_codec.pickle.decode", now_as_float() - start)
+        return payload
+
+    view = memoryview(data)
+    offset = len(MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack(view[len(MAGIC) : offset])
+    header = json.loads(bytes(view[offset : offset + header_length]))
+    if header.get("version") != SCHEMA_VERSION:
+        raise ValueError("Unknown cache schema version {}".format(header["version"]))
+
+    if "path" in header:
+        # the mapping stays open as long as the frame uses its buffers
+        path = os.path.join(_disk_dir(), header.pop("path"))
+        df = _decode_arrow(pa.memory_map(path))
+    else:
+        df = _decode_arrow(pa.py_buffer(view[offset + header_length :]))
+    del header["codec"], header["version"]
+    stats_logger.timing("cache_codec.arrow.decode", now_as_float() - start)
+    return dict(header, df=df)
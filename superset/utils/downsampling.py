@@ -0,0 +1,200 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Server-side downsampling of chart data
+
+Time series keep their shape with Largest-Triangle-Three-Buckets or min/max
+bucketing, scatter points are sampled per cell of a grid over the plot or per
+group, so sparse regions and small groups survive. Sampling is seeded, the
+same frame always yields the same points.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TIMESERIES_METHODS = ("lttb", "minmax")
+SCATTER_METHODS = ("grid", "stratified")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of the `n_out` points picked by Largest-Triangle-Three-Buckets,
+    `x` being sorted and `y` free of NaN
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the first and the last point, which are kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < n_out - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of `n_out // 2` equal buckets, plus
+    the first and last points, `y` being free of NaN
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    buckets = (np.arange(n) * (n_out // 2 - 1)) // n
+    grouped = pd.Series(y).groupby(buckets)
+    return np.union1d(
+        np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()),
+        [0, n - 1],
+    ).astype(int)
+
+
+def _bins(values: np.ndarray, side: int) -> np.ndarray:
+    """Bins `values` into `side` equal bins of their range, NaN in bin `side`"""
+    finite = np.isfinite(values)
+    bins = np.full(len(values), side)
+    if finite.any():
+        low, high = values[finite].min(), values[finite].max()
+        span = (high - low) or 1.0
+        bins[finite] = np.minimum(
+            ((values[finite] - low) / span * side).astype(int), side - 1
+        )
+    return bins
+
+
+def _rank_in_group(codes: np.ndarray) -> np.ndarray:
+    return pd.Series(codes).groupby(codes).cumcount().to_numpy()
+
+
+def grid_sample_indices(
+    x: np.ndarray, y: np.ndarray, n_out: int, seed: int = 0
+) -> np.ndarray:
+    """
+    Positions of `n_out` points spread over a grid of about `n_out` cells:
+    every occupied cell gets a random point before any cell gets a second one
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    side = max(int(np.sqrt(n_out)), 1)
+    cells = _bins(x, side) * (side + 1) + _bins(y, side)
+
+    perm = np.random.RandomState(seed).permutation(n)
+    rank = _rank_in_group(cells[perm])
+    order = np.lexsort((np.arange(n), rank))
+    return np.sort(perm[order[:n_out]])
+
+
+def stratified_sample_indices(
+    groups: Iterable, n_out: int, seed: int = 0
+) -> np.ndarray:
+    """
+    Positions of about `n_out` random points, every group keeping its share of
+    the points and at least one of them
+    """
+    codes, _ = pd.factorize(np.asarray(groups, dtype=object))
+    n = len(codes)
+    if n_out >= n:
+        return np.arange(n)
+    codes = codes + 1  # NaN groups are coded -1
+    quotas = np.maximum(np.bincount(codes) * n_out // n, 1)
+
+    perm = np.random.RandomState(seed).permutation(n)
+    rank = _rank_in_group(codes[perm])
+    return np.sort(perm[rank < quotas[codes[perm]]])
+
+
+def _index_positions(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(float)
+    if not isinstance(index, pd.MultiIndex):
+        x = pd.to_numeric(pd.Series(index), errors="coerce").to_numpy(dtype=float)
+        if not np.isnan(x).any():
+            return x
+    return np.arange(len(index), dtype=float)
+
+
+def downsample_series(
+    df: pd.DataFrame, method: str, max_points: int
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Downsamples a frame of series indexed by their x values to at most
+    `max_points` rows, each numeric column picking its share of the rows.
+    Returns the frame and whether it was downsampled.
+    """
+    if method not in TIMESERIES_METHODS:
+        raise ValueError("Invalid time series downsampling method: {}".format(method))
+    n = len(df.index)
+    if n <= max_points:
+        return df, False
+
+    columns = [i for i, dtype in enumerate(df.dtypes) if dtype.kind in "biuf"]
+    budget = max(max_points // max(len(columns), 1), 4)
+    x = _index_positions(df.index)
+    keep = [np.array([0, n - 1])]
+    for i in columns:
+        y = df.iloc[:, i].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(y))
+        if method == "lttb":
+            picked = lttb_indices(x[valid], y[valid], budget)
+        else:
+            picked = minmax_indices(y[valid], budget)
+        keep.append(valid[picked])
+    return df.iloc[np.unique(np.concatenate(keep))], True
+
+
+def sample_points(
+    df: pd.DataFrame,
+    method: str,
+    max_points: int,
+    x: Optional[str] = None,
+    y: Optional[str] = None,
+    group: Optional[str] = None,
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Samples the rows of a scatter frame down to about `max_points`, on the grid
+    of its `x` and `y` columns or stratified by its `group` column. Returns the
+    frame and whether it was sampled.
+    """
+    if method not in SCATTER_METHODS:
+        raise ValueError("Invalid scatter downsampling method: {}".format(method))
+    if len(df.index) <= max_points:
+        return df, False
+
+    if method == "stratified" and group is not None:
+        keep = stratified_sample_indices(df[group], max_points)
+    else:
+        keep = grid_sample_indices(
+            pd.to_numeric(df[x], errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(df[y], errors="coerce").to_numpy(dtype=float),
+            max_points,
+        )
+    return df.iloc[keep], True
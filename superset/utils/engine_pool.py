@@ -0,0 +1,128 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Process wide registry of pooled SQLAlchemy engines
+
+Engines are shared per (process, database, url, schema, effective user), so
+repeated analytic reads reuse open connections instead of connecting and
+tearing down a connection per query. Connections idle for longer than the
+pool's `idle_timeout` are discarded on checkout, and the pool activity is
+exported through the STATS_LOGGER.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from superset import app
+from superset.utils.dates import now_as_float
+
+logger = logging.getLogger(__name__)
+stats_logger = app.config["STATS_LOGGER"]
+
+DEFAULT_POOL_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+    "idle_timeout": 300,
+}
+
+_engines: "OrderedDict[str, Engine]" = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool reporting checkouts, waits and overflow to the STATS_LOGGER"""
+
+    def _do_get(self) -> Any:
+        full = self._max_overflow > -1 and self.checkedout() >= (
+            self.size() + self._max_overflow
+        )
+        start = now_as_float()
+        conn = super()._do_get()
+        stats_logger.incr("db_pool.checkout")
+        if full:
+            stats_logger.incr("db_pool.wait")
+            stats_logger.timing("db_pool.time_waiting", now_as_float() - start)
+        if self.overflow() > 0:
+            stats_logger.incr("db_pool.overflow")
+        stats_logger.gauge("db_pool.checked_out", self.checkedout())
+        return conn
+
+
+def _evict_idle_connections(engine: Engine, idle_timeout: int) -> None:
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):  # pylint: disable=unused-variable
+        connection_record.info["checked_in_at"] = time.time()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(  # pylint: disable=unused-variable
+        dbapi_connection, connection_record, connection_proxy
+    ):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is not None and time.time() - checked_in_at > idle_timeout:
+            stats_logger.incr("db_pool.idle_eviction")
+            # makes the pool discard this connection and open a fresh one
+            raise exc.DisconnectionError("Connection idle for too long")
+
+
+def _engine_key(*parts: Any) -> str:
+    return hashlib.md5(repr((os.getpid(),) + parts).encode("utf-8")).hexdigest()
+
+
+def get_pooled_engine(
+    url: Any, params: Dict[str, Any], pool_options: Dict[str, Any], *key_parts: Any
+) -> Engine:
+    """
+    Returns the shared engine of `url` and `params`, creating it with a
+    bounded pool the first time. The least recently used engines are disposed
+    of past DB_ENGINE_POOL_MAX_ENGINES engines.
+    """
+    options = dict(DEFAULT_POOL_OPTIONS, **pool_options)
+    key = _engine_key(str(url), repr(sorted(params.items())), *key_parts)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+            return engine
+
+        idle_timeout = options.pop("idle_timeout")
+        engine = create_engine(
+            url,
+            **dict(
+                params,
+                poolclass=InstrumentedQueuePool,
+                pool_pre_ping=True,
+                **options,
+            ),
+        )
+        if idle_timeout:
+            _evict_idle_connections(engine, idle_timeout)
+        _engines[key] = engine
+        stats_logger.incr("db_pool.engine_created")
+
+        while len(_engines) > app.config["DB_ENGINE_POOL_MAX_ENGINES"]:
+            _, evicted = _engines.popitem(last=False)
+            evicted.dispose()
+        return engine
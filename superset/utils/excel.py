@@ -0,0 +1,152 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Row-streaming Excel export of analytics results
+
+Sheets are written row by row with xlsxwriter's constant memory mode, so a
+large table never holds more than one row of cells in memory. Exports of task
+results never change, they are materialized once per task id under
+EXCEL_EXPORT_DIR and served from there afterwards.
+"""
+import datetime
+import hashlib
+import logging
+import math
+import os
+import time
+import uuid
+from typing import Any, BinaryIO, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from superset import app
+
+logger = logging.getLogger(__name__)
+
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    "remove_timezone": True,
+}
+
+
+def _excel_value(value: Any) -> Any:
+    """Converts a frame cell to a value xlsxwriter can write"""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (str, bool, int, float, datetime.date, datetime.time)):
+        return value
+    return str(value)
+
+
+def _header(values: Iterable[Any]) -> list:
+    return ["" if value is None else str(value) for value in values]
+
+
+def write_sheet(workbook: xlsxwriter.Workbook, name: str, df: pd.DataFrame) -> None:
+    """
+    Writes the index and columns of a frame like `DataFrame.to_excel` lays
+    them out: one header row per column level, the index on the left.
+    """
+    worksheet = workbook.add_worksheet(name[:31])
+    header_format = workbook.add_format({"bold": True})
+    index_width = df.index.nlevels
+    column_levels = df.columns.nlevels
+    for level in range(column_levels):
+        index_header = (
+            _header(df.index.names) if level == column_levels - 1 else [""] * index_width
+        )
+        worksheet.write_row(
+            level,
+            0,
+            index_header + _header(df.columns.get_level_values(level)),
+            header_format,
+        )
+    for row_number, row in enumerate(df.itertuples(name=None), start=column_levels):
+        index = row[0] if isinstance(row[0], tuple) else (row[0],)
+        worksheet.write_row(
+            row_number, 0, [_excel_value(value) for value in index + row[1:]]
+        )
+
+
+def write_excel(
+    output: Union[str, BinaryIO], sheets: Iterable[Tuple[str, pd.DataFrame]]
+) -> None:
+    """Writes the sheets one after the other, never holding two frames at once"""
+    workbook = xlsxwriter.Workbook(output, WORKBOOK_OPTIONS)
+    try:
+        for name, df in sheets:
+            write_sheet(workbook, name, df)
+    finally:
+        workbook.close()
+
+
+def _export_dir() -> str:
+    return app.config["EXCEL_EXPORT_DIR"]
+
+
+def excel_export_path(*parts: Any) -> str:
+    key = hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+    return os.path.join(_export_dir(), "{}.xlsx".format(key))
+
+
+def sweep_excel_exports() -> None:
+    """Removes the exports that outlived EXCEL_EXPORT_TTL"""
+    export_dir = _export_dir()
+    if not os.path.isdir(export_dir):
+        return
+    expire_before = time.time() - app.config["EXCEL_EXPORT_TTL"]
+    for filename in os.listdir(export_dir):
+        path = os.path.join(export_dir, filename)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def open_excel_export(path: str) -> Optional[BinaryIO]:
+    try:
+        if time.time() - os.path.getmtime(path) > app.config["EXCEL_EXPORT_TTL"]:
+            return None
+        return open(path, "rb")
+    except OSError:
+        return None
+
+
+def materialize_excel_export(
+    path: str, sheets: Iterable[Tuple[str, pd.DataFrame]]
+) -> BinaryIO:
+    """
+    Writes the export next to `path` and renames it, so concurrent downloads
+    of the same task never read a partial workbook.
+    """
+    sweep_excel_exports()
+    os.makedirs(_export_dir(), exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        write_excel(tmp_path, sheets)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return open(path, "rb")
@@ -0,0 +1,255 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Incremental cache of time series query results
+
+The time range of a time series query is cut into blocks of a fixed number of
+time grains, aligned on the epoch so that the same blocks come back as a
+relative range ("Last week") moves. Blocks that ended long enough ago are
+cached on their own, only the missing blocks and the ranges around them,
+including the recent, still changing, data are queried.
+
+Splitting the range on time grain boundaries does not change the aggregates,
+every row of the result belongs to a single time grain.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from superset import app, cache
+from superset.utils import cache_codec
+from superset.utils.core import DTTM_ALIAS
+
+config = app.config
+stats_logger = config["STATS_LOGGER"]
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# time grains of a fixed width, queries without a time grain keep the raw
+# timestamps and are not cached incrementally
+GRAIN_WIDTHS = {
+    "PT1S": timedelta(seconds=1),
+    "PT1M": timedelta(minutes=1),
+    "PT5M": timedelta(minutes=5),
+    "PT10M": timedelta(minutes=10),
+    "PT15M": timedelta(minutes=15),
+    "PT0.5H": timedelta(minutes=30),
+    "PT1H": timedelta(hours=1),
+    "P1D": timedelta(days=1),
+}
+
+DEFAULT_RULE = {
+    # blocks ending less than this many seconds ago are always queried
+    "volatile_window": 60 * 60,
+    # number of time grains per cached block
+    "block_buckets": 24,
+    # cache timeout of the blocks, the chart cache timeout when None
+    "timeout": None,
+    # blocks are widened by powers of two to cover a range with at most this
+    # many blocks
+    "max_blocks": 256,
+}
+
+QueryRange = Callable[[datetime, datetime], Optional[pd.DataFrame]]
+
+
+def get_rule(datasource: Any, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The staleness rule of INCREMENTAL_CACHE_RULES for the datasource, with the
+    width of the time grain of the query, None when the query can't be cached
+    incrementally
+    """
+    rules = config["INCREMENTAL_CACHE_RULES"]
+    if not cache or not rules or datasource.type != "table":
+        return None
+    rule = rules.get(datasource.full_name, rules.get("*"))
+    if not rule:
+        return None
+    if rule is True:
+        rule = {}
+
+    grain = (query.get("extras") or {}).get("time_grain_sqla")
+    if (
+        not query.get("is_timeseries")
+        or not query.get("granularity")
+        or not query.get("from_dttm")
+        or not query.get("to_dttm")
+        # the series limit is computed over the whole range
+        or query.get("timeseries_limit")
+        # the blocks are put together in time order
+        or query.get("orderby")
+        or grain not in GRAIN_WIDTHS
+    ):
+        return None
+    return dict(DEFAULT_RULE, **rule, grain_width=GRAIN_WIDTHS[grain])
+
+
+def _floor(dttm: datetime, width: timedelta) -> datetime:
+    return EPOCH + (dttm - EPOCH) // width * width
+
+
+def _ceil(dttm: datetime, width: timedelta) -> datetime:
+    floor = _floor(dttm, width)
+    return floor if floor == dttm else floor + width
+
+
+def block_width(
+    rule: Dict[str, Any], from_dttm: datetime, to_dttm: datetime
+) -> timedelta:
+    """
+    The width of the blocks of the rule, doubled until [from_dttm, to_dttm)
+    spans at most `max_blocks` of them
+    """
+    block = rule["grain_width"] * int(rule["block_buckets"])
+    max_blocks = int(rule["max_blocks"])
+    while (to_dttm - from_dttm) // block > max_blocks:
+        block *= 2
+    return block
+
+
+def plan_blocks(
+    from_dttm: datetime, to_dttm: datetime, block: timedelta, stable_until: datetime
+) -> Tuple[List[datetime], List[Tuple[datetime, datetime]]]:
+    """
+    Splits [from_dttm, to_dttm) into the starts of the whole blocks ending
+    before `stable_until` and the ranges left around them
+    """
+    first = _ceil(from_dttm, block)
+    last = _floor(min(to_dttm, stable_until), block)
+    if first >= last:
+        return [], [(from_dttm, to_dttm)]
+
+    starts = []
+    start = first
+    while start < last:
+        starts.append(start)
+        start += block
+
+    ranges = []
+    if from_dttm < first:
+        ranges.append((from_dttm, first))
+    if last < to_dttm:
+        ranges.append((last, to_dttm))
+    return starts, ranges
+
+
+def _block_key(key_prefix: str, start: datetime, block: timedelta) -> str:
+    return "incremental/{}/{}/{}".format(
+        key_prefix, int(block.total_seconds()), start.isoformat()
+    )
+
+
+def _split_blocks(
+    df: pd.DataFrame, starts: List[datetime], block: timedelta, shift: timedelta
+) -> Dict[datetime, pd.DataFrame]:
+    """Splits the result of a query over consecutive blocks by block"""
+    # the blocks are on the time grains of the database, before any offset
+    dttm = df[DTTM_ALIAS] - shift if DTTM_ALIAS in df and not df.empty else None
+    frames = {}
+    for start in starts:
+        if dttm is None:
+            frames[start] = df.iloc[0:0]
+        else:
+            in_block = (dttm >= start) & (dttm < start + block)
+            frames[start] = df[in_block.to_numpy()]
+    return frames
+
+
+def get_incremental_df(  # pylint: disable=too-many-locals
+    rule: Dict[str, Any],
+    key_prefix: str,
+    query: Dict[str, Any],
+    query_range: QueryRange,
+    shift: timedelta,
+    timeout: Optional[int],
+) -> Optional[pd.DataFrame]:
+    """
+    Loads the result of a time series query from its cached blocks, calling
+    `query_range(start, end)` for the missing blocks and the ranges around
+    them. Returns None when a range can't be queried or the result may have
+    been truncated by the row limit, the query should then run as a whole.
+    """
+    block = block_width(rule, query["from_dttm"], query["to_dttm"])
+    stable_until = datetime.now() - timedelta(seconds=rule["volatile_window"])
+    starts, ranges = plan_blocks(
+        query["from_dttm"], query["to_dttm"], block, stable_until
+    )
+    if not starts:
+        return None
+
+    keys = [_block_key(key_prefix, start, block) for start in starts]
+    frames: Dict[datetime, pd.DataFrame] = {}
+    for start, value in zip(starts, cache.get_many(*keys)):
+        if value is None:
+            continue
+        try:
+            frames[start] = cache_codec.loads_df_payload(value)["df"]
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not read cached block %s: %s", start, ex)
+    stats_logger.incr(
+        "incremental_cache_hit"
+        if len(frames) == len(starts)
+        else "incremental_cache_miss"
+    )
+
+    row_limit = query.get("row_limit")
+
+    def run(start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+        df = query_range(start, end)
+        if df is not None and row_limit and len(df.index) >= row_limit:
+            return None
+        return df
+
+    # consecutive missing blocks are queried together
+    runs: List[List[datetime]] = []
+    for start in starts:
+        if start in frames:
+            continue
+        if runs and runs[-1][-1] + block == start:
+            runs[-1].append(start)
+        else:
+            runs.append([start])
+    to_cache = {}
+    for run_starts in runs:
+        df = run(run_starts[0], run_starts[-1] + block)
+        if df is None:
+            return None
+        for start, frame in _split_blocks(df, run_starts, block, shift).items():
+            frames[start] = frame
+            key = _block_key(key_prefix, start, block)
+            to_cache[key] = cache_codec.dumps_df_payload({"df": frame})
+
+    around = []
+    for start, end in ranges:
+        df = run(start, end)
+        if df is None:
+            return None
+        around.append((start, df))
+
+    if to_cache:
+        try:
+            cache.set_many(to_cache, timeout=rule["timeout"] or timeout)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not cache %d blocks: %s", len(to_cache), ex)
+
+    parts = sorted(list(frames.items()) + around, key=lambda part: part[0])
+    df = pd.concat([frame for _, frame in parts], ignore_index=True, sort=False)
+    if row_limit and len(df.index) > row_limit:
+        return None
+    return df
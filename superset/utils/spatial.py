@@ -0,0 +1,130 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Vectorized decoding of the spatial columns of deck.gl visualizations"""
+import base64
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# "lat, lon", "lat;lon" or "lat lon", anything else goes through `fallback`
+DELIMITED_PATTERN = r"^\s*({0})\s*(?:[,;]\s*|\s+)({0})\s*$".format(_NUMBER)
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_LOOKUP = np.full(128, -1, dtype=np.int64)
+for _i, _c in enumerate(GEOHASH_ALPHABET):
+    _GEOHASH_LOOKUP[ord(_c)] = _i
+
+Coordinates = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def parse_delimited(
+    values: pd.Series, fallback: Callable[[Any], Optional[Tuple[float, float]]]
+) -> Coordinates:
+    """
+    Parses "first, second" coordinate strings with a single regex pass.
+    Returns the first values, the second values and the mask of empty entries.
+    Entries the regex does not handle, or out of the latitude and longitude
+    ranges, are parsed one at a time by `fallback`.
+    """
+    values = values.reset_index(drop=True)
+    empty = ~values.astype(bool) | values.isna()
+    parts = values.where(~empty, "").astype(str).str.extract(DELIMITED_PATTERN)
+    first = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=float)
+    second = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype=float)
+
+    unparsed = ~empty.to_numpy() & (
+        np.isnan(first)
+        | np.isnan(second)
+        | (np.abs(first) > 90)
+        | (np.abs(second) > 180)
+    )
+    for i in np.flatnonzero(unparsed):
+        point = fallback(values[i])
+        if point is None:
+            first[i], second[i] = np.nan, np.nan
+        else:
+            first[i], second[i] = point
+    return first, second, empty.to_numpy()
+
+
+def decode_geohashes(values: pd.Series) -> Coordinates:
+    """
+    Decodes geohashes to the latitudes and longitudes of the center of their
+    cells, bisecting all of them at once. Every distinct geohash is only
+    decoded once. Raises ValueError on invalid geohashes.
+    """
+    codes, uniques = pd.factorize(values.reset_index(drop=True))
+    empty = codes == -1
+    uniques = np.asarray(uniques, dtype=str)
+    if not len(uniques):
+        nans = np.full(len(codes), np.nan)
+        return nans, nans.copy(), empty
+
+    width = max(uniques.dtype.itemsize // 4, 1)
+    chars = uniques.astype("<U{}".format(width)).view(np.uint32).reshape(-1, width)
+    used = chars != 0
+    digits = _GEOHASH_LOOKUP[np.minimum(chars, 127)]
+    if ((digits == -1) & used).any() or (chars > 127).any():
+        raise ValueError("Invalid geohash")
+
+    lat_min, lat_max = np.full(len(uniques), -90.0), np.full(len(uniques), 90.0)
+    lon_min, lon_max = np.full(len(uniques), -180.0), np.full(len(uniques), 180.0)
+    is_lon = True
+    for position in range(width):
+        active = used[:, position]
+        for shift in range(4, -1, -1):
+            bit = ((digits[:, position] >> shift) & 1).astype(bool)
+            if is_lon:
+                mid = (lon_min + lon_max) / 2
+                lon_min = np.where(active & bit, mid, lon_min)
+                lon_max = np.where(active & ~bit, mid, lon_max)
+            else:
+                mid = (lat_min + lat_max) / 2
+                lat_min = np.where(active & bit, mid, lat_min)
+                lat_max = np.where(active & ~bit, mid, lat_max)
+            is_lon = not is_lon
+
+    lat = ((lat_min + lat_max) / 2)[codes]
+    lon = ((lon_min + lon_max) / 2)[codes]
+    lat[empty], lon[empty] = np.nan, np.nan
+    return lat, lon, empty
+
+
+def to_tuples(first: np.ndarray, second: np.ndarray, empty: np.ndarray) -> list:
+    """The coordinates as a list of (first, second) tuples, None when empty"""
+    pairs = list(zip(first.tolist(), second.tolist()))
+    if empty.any():
+        for i in np.flatnonzero(empty):
+            pairs[i] = None
+    return pairs
+
+
+def to_binary_positions(first: np.ndarray, second: np.ndarray) -> Dict[str, Any]:
+    """
+    Interleaves the coordinates into a typed array for the frontend: base64 of
+    little-endian float64 values, `size` values per position
+    """
+    positions = np.empty(len(first) * 2, dtype="<f8")
+    positions[0::2] = first
+    positions[1::2] = second
+    return {
+        "dtype": "float64",
+        "size": 2,
+        "data": base64.b64encode(positions.tobytes()).decode("ascii"),
+    }
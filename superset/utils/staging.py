@@ -0,0 +1,128 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Parquet staging of the input frames of analytics tasks
+
+A celery task retried through `autoretry_for` runs again from scratch. Staging
+its filtered input frame lets the retry read it back from the local spill
+directory instead of querying the database and rebuilding the frame. The frames
+are keyed on the task id and released once the task stops being retried.
+"""
+import hashlib
+import logging
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+import pandas as pd
+import simplejson as json
+
+from superset import app
+from superset.utils.core import json_int_dttm_ser
+
+logger = logging.getLogger(__name__)
+
+
+def _staging_dir() -> str:
+    return app.config["ANALYTIC_STAGING_DIR"]
+
+
+def _staging_path(key: str) -> str:
+    return os.path.join(_staging_dir(), "{}.parquet".format(key))
+
+
+def staging_key(task_id: str, *parts: Any) -> str:
+    """
+    Key of a frame staged by the task `task_id`. Retries of a task keep its
+    id, new submissions get a new one and never read a frame left behind by
+    another task.
+    """
+    json_data = json.dumps(parts, default=json_int_dttm_ser, sort_keys=True)
+    return "{}-{}".format(task_id, hashlib.md5(json_data.encode("utf-8")).hexdigest())
+
+
+def sweep_staged_frames() -> None:
+    """Removes the staged frames that outlived ANALYTIC_STAGING_TTL"""
+    staging_dir = _staging_dir()
+    if not os.path.isdir(staging_dir):
+        return
+    expire_before = time.time() - app.config["ANALYTIC_STAGING_TTL"]
+    for filename in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, filename)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def get_staged_frame(key: str) -> Optional[pd.DataFrame]:
+    path = _staging_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > app.config["ANALYTIC_STAGING_TTL"]:
+            return None
+        df = pd.read_parquet(path, engine="pyarrow")
+    except (OSError, ValueError) as ex:
+        if os.path.exists(path):
+            logger.warning("Could not read staged frame %s", key)
+            logger.exception(ex)
+        return None
+    logger.info("Read staged frame %s", key)
+    return df
+
+
+def stage_frame(key: str, df: pd.DataFrame) -> None:
+    """
+    Writes the frame as Parquet under `key`. The file is written next to its
+    final path and renamed, so concurrent readers never see a partial file.
+    Frames pyarrow cannot encode are simply not staged.
+    """
+    sweep_staged_frames()
+    os.makedirs(_staging_dir(), exist_ok=True)
+    path = _staging_path(key)
+    tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.warning("Could not stage frame %s", key)
+        logger.exception(ex)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def release_staged_frame(key: Optional[str]) -> None:
+    if key is None:
+        return
+    try:
+        os.remove(_staging_path(key))
+    except OSError:
+        pass
+
+
+def release_task_frames(task_id: str) -> None:
+    """Removes all the frames staged by the task `task_id`"""
+    staging_dir = _staging_dir()
+    if not os.path.isdir(staging_dir):
+        return
+    prefix = "{}-".format(task_id)
+    for filename in os.listdir(staging_dir):
+        if filename.startswith(prefix):
+            try:
+                os.remove(os.path.join(staging_dir, filename))
+            except OSError:
+                continue
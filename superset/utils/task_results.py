@@ -0,0 +1,114 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Compact msgpack envelope of analytics task results
+
+Successful task results never change. The polling endpoint packs each one
+once into an envelope kept in the cache, and serves later polls, sub-paths and
+msgpack clients from it instead of fetching and decoding the celery result
+again.
+
+Long homogeneous numeric lists are packed as typed arrays: msgpack extension
+type TYPED_ARRAY_EXT, whose payload is one dtype character ("d" for float64,
+"q" for int64) followed by the little-endian array bytes.
+"""
+import logging
+from typing import Any, List, Optional
+
+import msgpack
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TYPED_ARRAY_EXT = 1
+MIN_TYPED_ARRAY_LENGTH = 16
+_TYPED_ARRAY_DTYPES = {float: (b"d", "<f8"), int: (b"q", "<i8")}
+_DTYPES_BY_CODE = {code: dtype for code, dtype in _TYPED_ARRAY_DTYPES.values()}
+
+
+def _typed_array(values: List[Any]) -> Optional[msgpack.ExtType]:
+    if len(values) < MIN_TYPED_ARRAY_LENGTH:
+        return None
+    value_type = type(values[0])
+    if value_type not in _TYPED_ARRAY_DTYPES:
+        return None
+    if any(type(value) is not value_type for value in values):
+        return None
+    code, dtype = _TYPED_ARRAY_DTYPES[value_type]
+    try:
+        array = np.array(values, dtype=dtype)
+    except OverflowError:
+        return None
+    return msgpack.ExtType(TYPED_ARRAY_EXT, code + array.tobytes())
+
+
+def _compact(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {key: _compact(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return _typed_array(obj) or [_compact(value) for value in obj]
+    return obj
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return _compact(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("Cannot pack {}".format(type(obj)))
+
+
+def _decode_typed_array(code: int, data: bytes) -> Any:
+    if code != TYPED_ARRAY_EXT:
+        return msgpack.ExtType(code, data)
+    return np.frombuffer(data[1:], dtype=_DTYPES_BY_CODE[data[:1]]).tolist()
+
+
+def pack_result(result: Any) -> bytes:
+    return msgpack.packb(_compact(result), default=_default, use_bin_type=True)
+
+
+def unpack_result(blob: bytes, typed_arrays: bool = False) -> Any:
+    """
+    Unpacks an envelope to plain Python values, or keeps the typed arrays as
+    `msgpack.ExtType` to pack them again untouched
+    """
+    return msgpack.unpackb(
+        blob,
+        raw=False,
+        strict_map_key=False,
+        ext_hook=msgpack.ExtType if typed_arrays else _decode_typed_array,
+    )
+
+
+def select_path(result: Any, path: Optional[str]) -> Any:
+    """
+    Returns the part of a result under a dotted path such as "data.predict",
+    list items are addressed by position. Raises KeyError when missing.
+    """
+    if not path:
+        return result
+    for key in path.split("."):
+        if isinstance(result, list):
+            try:
+                result = result[int(key)]
+            except (ValueError, IndexError):
+                raise KeyError(key)
+        elif isinstance(result, dict):
+            result = result[key]
+        else:
+            raise KeyError(key)
+    return result
@@ -78,6 +78,7 @@ class BaseSupersetModelRestApi(ModelRestApi):
         "refresh": "edit",
         "upload_csv": "edit",
         "clone": "edit",
+        "clone_status": "edit",
         "download": "show",
         "list_datasource": "list",
         "check_result": "show",
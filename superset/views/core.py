@@ -22,6 +22,7 @@ from collections import defaultdict
 from contextlib import closing
 from datetime import datetime, timedelta
 import traceback
+import uuid
 from typing import Any, Callable, cast, Dict, List, Optional, Union
 from urllib import parse
 
@@ -80,6 +81,7 @@ from superset import (
 from superset.connectors.connector_registry import ConnectorRegistry
 from superset.connectors.sqla.models import AnnotationDatasource, TableColumn
 from superset.constants import RouteMethod
+from superset.datasets.dao import DatasetDAO
 from superset.exceptions import (
     CertificateException,
     DatabaseNotFound,
@@ -94,12 +96,14 @@ from superset.models.datasource_access_request import DatasourceAccessRequest
 from superset.models.slice import Slice
 from superset.models.sql_lab import Query, TabState
 from superset.models.user_attributes import UserAttribute
+from superset.result_set import SupersetResultSet
 from superset.security.analytics_db_safety import (
     check_sqlalchemy_uri,
     DBSecurityException,
 )
 from superset.sql_parse import ParsedQuery
 from superset.sql_validators import get_validator_by_name
+from superset.tasks.save_table import save_table, stage_table_frame
 from superset.utils import core as utils, dashboard_import_export
 from superset.utils.dashboard_filter_scopes_converter import copy_filter_scopes
 from superset.utils.dates import now_as_float
@@ -130,7 +134,6 @@ from .utils import (
     get_form_data,
     get_viz,
 )
-import io
 from superset.models import custom as modelsCustom
 from superset.billing.utils import (
     is_enabled_billing,
@@ -220,9 +223,27 @@ def check_slice_perms(self, slice_id):
     security_manager.assert_viz_permission(viz_obj)
 
 
+def _select_payload_columns(payload: dict, columns: Optional[List[str]]) -> None:
+    if columns is None:
+        return
+    for key in ("columns", "selected_columns"):
+        if key in payload:
+            payload[key] = [col for col in payload[key] if col["name"] in columns]
+
+
 def _deserialize_results_payload(
-    payload: Union[bytes, str], query, use_msgpack: Optional[bool] = False
+    payload: Union[bytes, str],
+    query,
+    use_msgpack: Optional[bool] = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
 ) -> dict:
+    """Deserializes a results payload, keeping a window of rows of some columns
+
+    Arrow payloads are sliced before being converted to records, so a page of a
+    large result only costs the rows and columns it returns.
+    """
     logger.debug(f"Deserializing from msgpack: {use_msgpack}")
     if use_msgpack:
         with stats_timing(
@@ -231,10 +252,22 @@ def _deserialize_results_payload(
             ds_payload = msgpack.loads(payload, raw=False)
 
         with stats_timing("sqllab.query.results_backend_pa_deserialize", stats_logger):
-            df = pa.deserialize(ds_payload["data"])
+            try:
+                pa_table = SupersetResultSet.deserialize_table(ds_payload["data"])
+            except pa.ArrowInvalid:
+                # payloads stored before results were written as Arrow IPC
+                df = pa.deserialize(ds_payload["data"])
+                if columns is not None:
+                    df = df[[col for col in df.columns if col in columns]]
+                df = df.iloc[offset : None if limit is None else offset + limit]
+            else:
+                pa_table = SupersetResultSet.slice_table(
+                    pa_table, offset, limit, columns
+                )
+                df = SupersetResultSet.convert_table_to_df(pa_table)
 
-        # TODO: optimize this, perhaps via df.to_dict, then traversing
-        ds_payload["data"] = dataframe.SupersetDataFrame.format_data(df) or []
+        ds_payload["data"] = dataframe.df_to_records(df) or []
+        _select_payload_columns(ds_payload, columns)
 
         db_engine_spec = query.database.db_engine_spec
         all_columns, data, expanded_columns = db_engine_spec.expand_data(
@@ -249,7 +282,18 @@ def _deserialize_results_payload(
         with stats_timing(
             "sqllab.query.results_backend_json_deserialize", stats_logger
         ):
-            return json.loads(payload)  # type: ignore
+            ds_payload = json.loads(payload)
+        if offset or limit is not None:
+            ds_payload["data"] = ds_payload["data"][
+                offset : None if limit is None else offset + limit
+            ]
+        if columns is not None:
+            ds_payload["data"] = [
+                {key: value for key, value in row.items() if key in columns}
+                for row in ds_payload["data"]
+            ]
+            _select_payload_columns(ds_payload, columns)
+        return ds_payload  # type: ignore
 
 
 class AccessRequestsModelView(SupersetModelView, DeleteMixin):
@@ -726,28 +770,26 @@ class Superset(BaseSupersetView):
                 db_name = viz_obj.form_data["database_name"]
                 schema_name = viz_obj.form_data["schema_name"]
                 database = utils.get_db_by_name(db_name)
-                if "taskId" in viz_obj.form_data and viz_obj.form_data["taskId"] is not None:
-                    data_string = viz_obj.get_csv_custom()
-                else:
-                    data_string = viz_obj.get_csv()
-                data = io.StringIO(data_string)
-                df = pd.read_csv(data, sep=",")
-                viz_obj.create_table_from_df(tbl_name, database, schema_name, df)
-                TBL = ConnectorRegistry.sources["table"]
-
-                tbl = db.session.query(TBL).filter_by(table_name=tbl_name).first()
-                if not tbl:
-                    tbl = TBL(table_name=tbl_name)
                 if not security_manager.can_access_database(database):
                     raise Exception('User can not access database')
-                tbl.database = database
                 schemas = security_manager.get_access_schemas(database.id)
                 if schema_name not in schemas:
                     raise  Exception('User can not access schema')
-                tbl.schema = schema_name
-                db.session.merge(tbl)
-                db.session.commit()
-                tbl.fetch_metadata()
+                df = viz_obj.get_table_df()
+                if df is None:
+                    raise Exception('No results to save')
+                if results_backend and len(df) > config["SAVE_TABLE_ASYNC_ROW_LIMIT"]:
+                    key = str(uuid.uuid4())
+                    stage_table_frame(key, df)
+                    save_table.delay(key, tbl_name, database.id, schema_name)
+                    flash(
+                        __("Saving %(rows)s rows to %(table)s in the background",
+                           rows=len(df), table=tbl_name),
+                        "info",
+                    )
+                    return redirect("/tablemodelview/list/")
+                viz_obj.create_table_from_df(tbl_name, database, schema_name, df)
+                tbl = DatasetDAO.get_or_create_physical(database, tbl_name, schema_name)
                 return redirect(f'/superset/explore/table/{tbl.id}')
 
             payload = viz_obj.get_payload()
@@ -936,11 +978,18 @@ class Superset(BaseSupersetView):
 
         columnsData = []
         columns = datasource.data['columns']
+        columns_values = datasource.values_for_columns(
+            [
+                column['column_name']
+                for column in columns
+                if column['type'] is not None
+                and (column['type'].find('VARCHAR') != -1 or column['type'].find('TEXT') != -1)
+            ]
+        )
         for column in columns:
             if column['type'] is not None:
                 if column['type'].find('VARCHAR') != -1 or column['type'].find('TEXT') != -1:
-                    data = datasource.values_for_column(
-                        column['column_name'])
+                    data = columns_values[column['column_name']]
                     for value in data:
                         columnsData.append(column['column_name'] + ":" + value.replace(' ', '_'))
                 elif column['type'].find('INT') != -1 or column['type'].find('FLOAT') != -1 or column['type'].find(
@@ -1108,8 +1157,11 @@ class Superset(BaseSupersetView):
         columnsValues = []
         groupValues = {}
         columns = datasource.data['columns']
+        columns_values = datasource.values_for_columns(
+            [column['column_name'] for column in columns]
+        )
         for column in columns:
-            data = datasource.values_for_column(column['column_name'])
+            data = columns_values[column['column_name']]
             inValue = []
             for value in data:
                 if value is not None:
@@ -1120,8 +1172,7 @@ class Superset(BaseSupersetView):
                         column['type'].find('TEXT') != -1 or
                         column['type'].find('STRING') != -1):
                     columnsName.append(column['column_name'])
-                    data = datasource.values_for_column(
-                        column['column_name'])
+                    data = columns_values[column['column_name']]
                     for value in data:
                         if value is not None:
                             columnsData.append(column['column_name'] + ":" + value.replace(' ', '_'))
@@ -1213,19 +1264,50 @@ class Superset(BaseSupersetView):
         :param column: Column name to retrieve values for
         :return:
         """
-        # TODO: Cache endpoint by user, datasource and column
         datasource = ConnectorRegistry.get_datasource(
             datasource_type, datasource_id, db.session
         )
         if not datasource:
             return json_error_response(DATASOURCE_MISSING_ERR)
         security_manager.assert_datasource_permission(datasource)
-        payload = json.dumps(
-            datasource.values_for_column(column, config["FILTER_SELECT_ROW_LIMIT"]),
-            default=utils.json_int_dttm_ser,
+        values = datasource.values_for_columns(
+            [column], self._filter_values_limit(), request.args.get("prefix")
         )
+        payload = json.dumps(values[column], default=utils.json_int_dttm_ser)
         return json_success(payload)
 
+    @api
+    @handle_api_exception
+    @has_access_api
+    @expose("/filter_values/<datasource_type>/<datasource_id>/")
+    def filter_values(self, datasource_type, datasource_id):
+        """
+        Endpoint to retrieve the values of several columns at once.
+
+        :param datasource_type: Type of datasource e.g. table
+        :param datasource_id: Datasource id
+        :return: the values of each of the `column` arguments, limited to the
+            `limit` argument and starting with the `prefix` argument if any
+        """
+        datasource = ConnectorRegistry.get_datasource(
+            datasource_type, datasource_id, db.session
+        )
+        if not datasource:
+            return json_error_response(DATASOURCE_MISSING_ERR)
+        security_manager.assert_datasource_permission(datasource)
+        values = datasource.values_for_columns(
+            request.args.getlist("column"),
+            self._filter_values_limit(),
+            request.args.get("prefix"),
+        )
+        return json_success(json.dumps(values, default=utils.json_int_dttm_ser))
+
+    @staticmethod
+    def _filter_values_limit() -> int:
+        """The `limit` argument, capped by FILTER_SELECT_ROW_LIMIT"""
+        limit = config["FILTER_SELECT_ROW_LIMIT"]
+        return max(min(request.args.get("limit", limit, type=int), limit), 1)
+
     @staticmethod
     def remove_extra_filters(filters):
         """Extra filters are ones inherited from the dashboard's temporary context
@@ -2438,7 +2520,9 @@ class Superset(BaseSupersetView):
         """Serves a key off of the results backend
 
         It is possible to pass the `rows` query argument to limit the number
-        of rows returned.
+        of rows returned. Pages of the result are read with the `offset` and
+        `limit` arguments, and a subset of columns with a comma separated
+        `columns` argument.
         """
         if not results_backend:
             return json_error_response("Results backend isn't configured")
@@ -2470,9 +2554,25 @@ class Superset(BaseSupersetView):
                 security_manager.get_table_access_error_msg(rejected_tables), status=403
             )
 
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = int(request.args["limit"]) if "limit" in request.args else None
+        except ValueError:
+            return json_error_response(
+                "Invalid `offset` or `limit` argument", status=400
+            )
+        columns = (
+            request.args["columns"].split(",") if "columns" in request.args else None
+        )
+
         payload = utils.zlib_decompress(blob, decode=not results_backend_use_msgpack)
         obj: dict = _deserialize_results_payload(
-            payload, query, cast(bool, results_backend_use_msgpack)
+            payload,
+            query,
+            cast(bool, results_backend_use_msgpack),
+            offset=offset,
+            limit=limit,
+            columns=columns,
         )
 
         if "rows" in request.args:
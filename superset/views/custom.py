@@ -20,6 +20,7 @@ import dialogflow_v2 as dialogflow
 import datetime
 import os
 import re
+import msgpack
 import simplejson as json
 import uuid
 from flask import request, g, flash, session, redirect, abort, Response
@@ -35,6 +36,7 @@ from superset.utils import hubspot_registration
 
 from superset import (
     appbuilder,
+    cache,
     db,
     security_manager,
     google,
@@ -44,6 +46,7 @@ from superset import (
 from sqlalchemy.exc import IntegrityError
 from superset.connectors.sqla.models import TableColumn, SqlaTable
 from superset.connectors.connector_registry import ConnectorRegistry
+from superset.utils.task_results import pack_result, select_path, unpack_result
 from superset.utils.token import get_token, verify_token
 from superset.utils.mailgun import MailGun
 from superset.billing.utils import activate_trial
@@ -84,6 +87,8 @@ from sqlalchemy import or_
 from flask_appbuilder.api import BaseApi, expose, protect, safe
 from superset.utils.stripe import Stripe
 
+stats_logger = app.config["STATS_LOGGER"]
+
 class ForgotPassword(FlaskForm):
     email = StringField("Email", validators=[DataRequired(), Email()])
 
@@ -913,7 +918,33 @@ class TaskPolling(BaseSupersetView):
 
             return data.get(type_viz)
 
-        return task.get()
+        # a successful result never changes, it is only fetched and packed once
+        cache_key = f"task_result/{task_id}"
+        envelope = cache.get(cache_key)
+        if envelope is None:
+            envelope = pack_result(task.get())
+            cache.set(cache_key, envelope, timeout=app.config["CACHE_DEFAULT_TIMEOUT"])
+        else:
+            stats_logger.incr("task_result_envelope_cache_hit")
+
+        use_msgpack = request.accept_mimetypes.best_match(
+            ["application/json", "application/x-msgpack"]
+        ) == "application/x-msgpack"
+        try:
+            result = select_path(
+                unpack_result(envelope, typed_arrays=use_msgpack),
+                request.args.get("path"),
+            )
+        except KeyError:
+            abort(404)
+        if use_msgpack:
+            return Response(
+                msgpack.packb(result, use_bin_type=True),
+                mimetype="application/x-msgpack",
+            )
+        return json_success(
+            json.dumps(result, default=utils.json_iso_dttm_ser, ignore_nan=True)
+        )
 
 
 class TaskApi(BaseApi):
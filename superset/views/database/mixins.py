@@ -161,7 +161,13 @@ class DatabaseMixin:
             "If database flavor does not support schema or any schema is allowed "
             "to be accessed, just leave the list empty"
             "4. the ``version`` field is a string specifying the this db's version. "
-            "This should be used with Presto DBs so that the syntax is correct",
+            "This should be used with Presto DBs so that the syntax is correct<br/>"
+            "5. The ``engine_pool`` object makes this database share pooled "
+            "connections per schema and user instead of connecting for each "
+            'query. Specify it as **"engine_pool": {"pool_size": 5, '
+            '"max_overflow": 10, "pool_timeout": 30, '
+            '"pool_recycle": 3600, "idle_timeout": 300}**, '
+            "any key left out takes its default value",
             True,
         ),
         "encrypted_extra": utils.markdown(
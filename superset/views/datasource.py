@@ -94,8 +94,11 @@ class Datasource(BaseSupersetView):
         columnsValues = []
         groupValues = {}
         columns = orm_datasource.data['columns']
+        columns_values = orm_datasource.values_for_columns(
+            [column['column_name'] for column in columns]
+        )
         for column in columns:
-            data = orm_datasource.values_for_column(column['column_name'])
+            data = columns_values[column['column_name']]
             inValue = []
             for value in data:
                 if value is not None:
@@ -106,8 +109,7 @@ class Datasource(BaseSupersetView):
                     column['type'].find('TEXT') != -1 or
                     column['type'].find('STRING') != -1):
                     columnsName.append(column['column_name'])
-                    data = orm_datasource.values_for_column(
-                        column['column_name'])
+                    data = columns_values[column['column_name']]
                     for value in data:
                         if value is not None:
                             columnsData.append(column['column_name'] + ":" + value.replace(' ', '_'))
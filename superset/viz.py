@@ -26,7 +26,6 @@ import inspect
 
 import logging
 import math
-import pickle as pkl
 import re
 import uuid
 from collections import defaultdict, OrderedDict
@@ -53,13 +52,32 @@ from superset.exceptions import NullValueException, SpatialException
 from superset.models.helpers import QueryResult
 from superset.prediction.stats_models import anova_task
 from superset.typing import VizData
-from superset.utils import aai_dumps, aai_loads, core as utils
+from superset.utils import (
+    aai_dumps,
+    aai_loads,
+    cache_codec,
+    core as utils,
+    downsampling,
+    incremental_cache,
+)
 from superset.utils.core import (
     DTTM_ALIAS,
     JS_MAX_INTEGER,
     merge_extra_filters,
     to_adhoc,
 )
+from superset.utils.excel import (
+    excel_export_path,
+    materialize_excel_export,
+    open_excel_export,
+    write_excel,
+)
+from superset.utils.spatial import (
+    decode_geohashes,
+    parse_delimited,
+    to_binary_positions,
+    to_tuples,
+)
 from superset.prediction.causal_inference import causal_inference_task
 from superset.prediction.forecast import forecast_task
 from superset.prediction.regression import regression_task
@@ -116,6 +134,8 @@ class BaseViz:
     is_timeseries = False
     cache_type = "df"
     enforce_numerical_metrics = True
+    # default downsampling method of the chart data, None when not supported
+    downsample_method: Optional[str] = None
 
     def __init__(
         self,
@@ -150,6 +170,7 @@ class BaseViz:
         self._any_cache_key: Optional[str] = None
         self._any_cached_dttm: Optional[str] = None
         self._extra_chart_data: List[Tuple[str, pd.DataFrame]] = []
+        self.is_downsampled = False
 
         self.process_metrics()
 
@@ -301,6 +322,46 @@ class BaseViz:
             df.replace([np.inf, -np.inf], np.nan, inplace=True)
         return df
 
+    def get_incremental_df(
+        self, query_obj: Dict[str, Any], **kwargs: Any
+    ) -> Optional[pd.DataFrame]:
+        """
+        Returns the dataframe of a time series query from the blocks of the
+        incremental cache, None when the datasource doesn't use it
+        """
+        rule = incremental_cache.get_rule(self.datasource, query_obj)
+        if rule is None or self.force:
+            return None
+
+        queries = []
+
+        def query_range(start, end):
+            df = self.get_df(dict(query_obj, from_dttm=start, to_dttm=end))
+            if self.status == utils.QueryStatus.FAILED:
+                return None
+            queries.append(self.query)
+            return df
+
+        # the time bounds are left out, blocks are keyed on their own range
+        key_obj = {
+            k: v
+            for k, v in query_obj.items()
+            if k not in ("inner_from_dttm", "inner_to_dttm")
+        }
+        df = incremental_cache.get_incremental_df(
+            rule,
+            self.cache_key(key_obj, time_range=None, **kwargs),
+            query_obj,
+            query_range,
+            shift=timedelta(hours=self.datasource.offset or 0) + self.time_shift,
+            timeout=self.cache_timeout,
+        )
+        if df is not None:
+            self.query = ";\n\n".join(queries)
+            self.status = utils.QueryStatus.SUCCESS
+            self.error_message = None
+        return df
+
     def df_metrics_to_num(self, df):
         """Converting metrics to numeric when pandas.read_sql cannot"""
         metrics = self.metric_labels
@@ -412,12 +473,12 @@ class BaseViz:
         values which are stripped.
         """
         cache_dict = copy.copy(query_obj)
-        cache_dict.update(extra)
 
         for k in ["from_dttm", "to_dttm"]:
             del cache_dict[k]
 
         cache_dict["time_range"] = self.form_data.get("time_range")
+        cache_dict.update(extra)
         cache_dict["datasource"] = self.datasource.uid
         cache_dict["extra_cache_keys"] = self.datasource.get_extra_cache_keys(query_obj)
         cache_dict["rls"] = security_manager.get_rls_ids(self.datasource)
@@ -425,6 +486,65 @@ class BaseViz:
         json_data = self.json_dumps(cache_dict, sort_keys=True)
         return hashlib.md5(json_data.encode("utf-8")).hexdigest()
 
+    def task_cache_key(self, task, *args, **kwargs):
+        """
+        The task cache key is made out of the task name and the arguments it is
+        submitted with, plus the datasource identity, its `changed_on` and the
+        row level security ids, the same way `cache_key` is built for queries.
+
+        `user_id` is part of the arguments, so users only attach to their own
+        submissions: the tasks bill the runtime to the user they were
+        submitted for.
+        """
+        cache_dict = {
+            "task": task.name,
+            "args": list(args),
+            "kwargs": kwargs,
+        }
+        cache_dict["datasource"] = self.datasource.uid
+        cache_dict["rls"] = security_manager.get_rls_ids(self.datasource)
+        cache_dict["changed_on"] = self.datasource.changed_on
+        json_data = self.json_dumps(cache_dict, sort_keys=True)
+        return "task/{}".format(hashlib.md5(json_data.encode("utf-8")).hexdigest())
+
+    def submit_task(self, task, *args, **kwargs) -> str:
+        """
+        Submits an analytics celery task and returns its id.
+
+        If an identical submission is already running, or has already
+        completed, its task id is returned instead of running the whole
+        job again. Failed and revoked tasks are resubmitted, and so is
+        everything when the viz is forced.
+
+        Celery reports unknown task ids as pending, so the task id is cached
+        for no longer than the result backend keeps the task results.
+        """
+        cache_key = self.task_cache_key(task, *args, **kwargs)
+        if cache and not self.force:
+            task_id = cache.get(cache_key)
+            if task_id:
+                state = task.AsyncResult(task_id).state
+                if state not in ("FAILURE", "REVOKED"):
+                    logger.info("Attaching to task {} ({})".format(task_id, state))
+                    stats_logger.incr("task_cache_hit")
+                    return task_id
+
+        task_id = task.delay(*args, **kwargs).id
+        stats_logger.incr("task_cache_miss")
+        if cache:
+            try:
+                result_expires = task.app.conf.result_expires
+                if isinstance(result_expires, timedelta):
+                    result_expires = int(result_expires.total_seconds())
+                timeout = self.cache_timeout
+                if result_expires and (not timeout or timeout > result_expires):
+                    timeout = result_expires
+                cache.set(cache_key, task_id, timeout=timeout)
+            except Exception as e:
+                logger.warning("Could not cache task key {}".format(cache_key))
+                logger.exception(e)
+        return task_id
+
     def get_payload(self, query_obj=None):
         """Returns a payload of metadata and data"""
         self.run_extra_queries()
@@ -433,10 +553,59 @@ class BaseViz:
         df = payload.get("df")
         if self.status != utils.QueryStatus.FAILED:
             payload["data"] = self.get_data(df)
+        payload["is_downsampled"] = self.is_downsampled
         if "df" in payload:
             del payload["df"]
         return payload
 
+    def get_downsampling(self, methods: Tuple[str, ...]) -> Optional[str]:
+        """
+        The downsampling method picked by the `downsample` form data, which
+        is either one of `methods`, true for the viz default or false. Charts
+        are only downsampled when they opt in.
+        """
+        method = self.form_data.get("downsample", False)
+        if method is True:
+            method = self.downsample_method
+        if not method or method == "none":
+            return None
+        if method not in methods:
+            raise Exception(
+                _("Invalid `downsample` method: %(method)s", method=method)
+            )
+        return method
+
+    @property
+    def downsample_max_points(self) -> int:
+        return int(
+            self.form_data.get("downsample_max_points")
+            or config["VIZ_DOWNSAMPLE_MAX_POINTS"]
+        )
+
+    def downsample_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downsamples a frame of series indexed by their x values"""
+        method = self.get_downsampling(downsampling.TIMESERIES_METHODS)
+        if method is None:
+            return df
+        df, downsampled = downsampling.downsample_series(
+            df, method, self.downsample_max_points
+        )
+        self.is_downsampled |= downsampled
+        return df
+
+    def downsample_points(
+        self, df: pd.DataFrame, x: str, y: str, group: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Samples the rows of a frame of scatter points"""
+        method = self.get_downsampling(downsampling.SCATTER_METHODS)
+        if method is None:
+            return df
+        df, downsampled = downsampling.sample_points(
+            df, method, self.downsample_max_points, x=x, y=y, group=group
+        )
+        self.is_downsampled |= downsampled
+        return df
+
     def get_df_payload(self, query_obj=None, **kwargs):
         """Handles caching around the df payload retrieval"""
         if not query_obj:
@@ -452,7 +621,7 @@ class BaseViz:
             if cache_value:
                 stats_logger.incr("loading_from_cache")
                 try:
-                    cache_value = pkl.loads(cache_value)
+                    cache_value = cache_codec.loads_df_payload(cache_value)
                     df = cache_value["df"]
                     self.query = cache_value["query"]
                     self._any_cached_dttm = cache_value["dttm"]
@@ -469,7 +638,9 @@ class BaseViz:
 
         if query_obj and not is_loaded:
             try:
-                df = self.get_df(query_obj)
+                df = self.get_incremental_df(query_obj, **kwargs)
+                if df is None:
+                    df = self.get_df(query_obj)
                 if self.status != utils.QueryStatus.FAILED:
                     stats_logger.incr("loaded_from_source")
                     if not self.force:
@@ -490,7 +661,7 @@ class BaseViz:
             ):
                 try:
                     cache_value = dict(dttm=cached_dttm, df=df, query=self.query)
-                    cache_value = pkl.dumps(cache_value, protocol=pkl.HIGHEST_PROTOCOL)
+                    cache_value = cache_codec.dumps_df_payload(cache_value)
 
                     logger.info(
                         "Caching {} chars at key {}".format(len(cache_value), cache_key)
@@ -541,54 +712,67 @@ class BaseViz:
         }
         return content
 
+    def get_excel_sheets(self, data):
+        """Yields the (name, DataFrame) sheets of `get_excel_output`, one at a time"""
+        for sheet in self.get_excel_output():
+            try:
+                df_input = data
+                for next_loc in sheet['location']:
+                    df_input = df_input[next_loc]
+
+                df = sheet['get_data'](df_input)
+            except Exception as e:
+                logger.warning(e)
+                continue
+            if df is not None:
+                yield sheet['name'], df
+
     def get_excel(self):
         get_excel_output = getattr(self, "get_excel_output", None)
         if not callable(get_excel_output):
             raise NameError('get_excel should only be called by viz that have get_excel_output method')
-        excel_output = self.get_excel_output()
-
 
         taskId = self.form_data["taskId"]
 
-        if (taskId is not None):
-            viz_type = self.form_data["viz_type"]
-            data = aai_loads(aai_dumps(task_types[viz_type].AsyncResult(taskId).get()))
-        else:
-            data = self.get_payload()
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            for sheet in excel_output:
-                try:
-                    data_loc = sheet['location']
-                    get_data = sheet['get_data']
+        if (taskId is None):
+            output = BytesIO()
+            write_excel(output, self.get_excel_sheets(self.get_payload()))
+            output.seek(0)
+            return output
 
-                    df_input = data
-                    for next_loc in data_loc:
-                        df_input = df_input[next_loc]
-
-                    df = get_data(df_input)
-                    if df is not None:
-                        df.to_excel(writer, sheet_name=sheet['name'])
-                except Exception as e:
-                    logger.warning(e)
-                    continue
-        output.seek(0)
-
-        return output
+        # task results never change, the workbook is only built once per task
+        viz_type = self.form_data["viz_type"]
+        path = excel_export_path(viz_type, taskId)
+        output = open_excel_export(path)
+        if output is not None:
+            stats_logger.incr("excel_export_cache_hit")
+            return output
+        stats_logger.incr("excel_export_cache_miss")
+        data = aai_loads(aai_dumps(task_types[viz_type].AsyncResult(taskId).get()))
+        return materialize_excel_export(path, self.get_excel_sheets(data))
 
     def get_csv(self):
         df = self.get_df()
         include_index = not isinstance(df.index, pd.RangeIndex)
         return df.to_csv(index=include_index, **config.get("CSV_EXPORT"))
 
-    def create_table_from_df(self, tbl_name, database, schema, df):
-        return df.to_sql(tbl_name,
-                         database.get_sqla_engine(),
-                         if_exists="replace",
-                         chunksize=500,
-                         index=False,
-                         schema=schema)
+    @staticmethod
+    def create_table_from_df(tbl_name, database, schema, df):
+        """
+        Writes the frame as-is, keeping its dtypes, with the bulk insert
+        method of the database engine spec
+        """
+        engine_spec = database.db_engine_spec
+        engine_spec.df_to_sql(
+            df,
+            name=tbl_name,
+            con=database.get_sqla_engine(schema=schema),
+            schema=schema,
+            if_exists="replace",
+            chunksize=config["SAVE_TABLE_CHUNK_SIZE"],
+            index=False,
+            method=engine_spec.get_bulk_insert_method(),
+        )
 
     def get_data(self, df: pd.DataFrame) -> VizData:
         return df.to_dict(orient="records")
@@ -597,58 +781,70 @@ class BaseViz:
     def json_data(self):
         return json.dumps(self.data)
 
-    def get_csv_custom(self):
+    def get_task_result(self) -> Optional[Dict[str, Any]]:
+        """The result of the analytics task behind `taskId`, once it succeeded"""
         viz_type = self.form_data["viz_type"]
-        taskId = self.form_data["taskId"]
-        csv = ""
+        task = task_types.get(viz_type)
+        if task is None:
+            return None
+        task = task.AsyncResult(self.form_data["taskId"])
+        if task.state != "SUCCESS":
+            return None
+        result = task.get()
+        if viz_type in ("classification_prediction", "regression_prediction"):
+            result = aai_loads(aai_dumps(result))
+        return result
+
+    def get_df_custom(self) -> Optional[pd.DataFrame]:
+        """The result of the analytics task behind `taskId` as a DataFrame"""
+        viz_type = self.form_data["viz_type"]
+        result = self.get_task_result()
+        if result is None:
+            return None
         if viz_type == "plotly_prediction":
-            task = forecast_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()["data"]
-                csv = self.time_series_csv(data)
-        elif viz_type == "classification_prediction":
-            task = classification_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                taskResult = task.get()
-                data = aai_loads(aai_dumps(taskResult["data"]))
-                csv = self.prediction_csv(data)
-        elif viz_type == "regression_prediction":
-            task = regression_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                taskResult = task.get()
-                data = aai_loads(aai_dumps(taskResult["data"]))
-                csv = self.prediction_csv(data)
-        elif viz_type == "plotly_tsne":
-            task = clustering_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()
-                csv = self.segmentation_csv(data["data"])
-        elif viz_type == "clean_data":
-            task = data_imputation_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                csv = self.data_clean_csv(task.get())
-        elif viz_type == "plotly_correlation":
-            task = correlation_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()
-                csv = self.correlation_csv(data["data"])
-        elif viz_type == "sentiment_analysis":
-            task = sentiment_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()
-                csv = self.sentiment_csv(data["data"])
-        elif viz_type == "causal_inference":
-            task = causal_inference_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()
-                csv = pd.DataFrame(data["data"]["effect"]).to_csv(index=False)
-        elif viz_type == "bayesian_regression":
-            task = bayesian_regression_task.AsyncResult(taskId)
-            if task.state == "SUCCESS":
-                data = task.get()
-                csv = pd.DataFrame(data["data"]["prediction_table"]).to_csv(index=False)
+            df = self.time_series_df(result["data"])
+            return df.rename_axis("date").reset_index()
+        if viz_type in ("classification_prediction", "regression_prediction"):
+            return self.prediction_df(result["data"])
+        if viz_type == "plotly_tsne":
+            return self.segmentation_df(result["data"])
+        if viz_type == "clean_data":
+            return self.data_clean_df(result)
+        if viz_type == "plotly_correlation":
+            return pd.DataFrame(result["data"]["corr"])
+        if viz_type == "sentiment_analysis":
+            return pd.DataFrame(result["data"])
+        if viz_type == "causal_inference":
+            return pd.DataFrame(result["data"]["effect"])
+        if viz_type == "bayesian_regression":
+            return pd.DataFrame(result["data"]["prediction_table"])
+        return None
 
-        return csv
+    def get_csv_custom(self):
+        viz_type = self.form_data["viz_type"]
+        result = self.get_task_result()
+        if result is None:
+            return ""
+        if viz_type == "plotly_prediction":
+            return self.time_series_csv(result["data"])
+        if viz_type == "plotly_tsne":
+            return self.segmentation_csv(result["data"])
+        if viz_type == "clean_data":
+            return self.data_clean_csv(result)
+        df = self.get_df_custom()
+        return df.to_csv(index=False) if df is not None else ""
+
+    def get_table_df(self) -> Optional[pd.DataFrame]:
+        """
+        The frame "save results as table" writes: the analytics task result
+        when the chart has one, the chart query result otherwise.
+        """
+        if self.form_data.get("taskId") is not None:
+            return self.get_df_custom()
+        df = self.get_df()
+        if not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
+        return df
 
     def correlation_csv(self, data):
         return pd.DataFrame(data["corr"]).to_csv(index=False)
@@ -686,19 +882,23 @@ class BaseViz:
 
         security_manager.raise_for_access(viz=self)
 
-    def prediction_csv(self,data):
+    def prediction_df(self, data):
         if "prediction_table" in data:
             return pd.DataFrame({c: data["prediction_table"]["data"][c] \
-                                    for c in data["prediction_table"]["columns"]}).to_csv(index=False)
+                                    for c in data["prediction_table"]["columns"]})
 
         elif "predictData" in data:
             return pd.concat([
                 pd.DataFrame(data["exdata"]),
                 pd.DataFrame(data["predictData"])
-            ], axis=0).to_csv(index=False)
+            ], axis=0)
 
+    def prediction_csv(self,data):
+        df = self.prediction_df(data)
+        if df is not None:
+            return df.to_csv(index=False)
 
-    def time_series_csv(self, data):
+    def time_series_df(self, data):
         series = {}
         for batch in data["predict"]:
             for p in batch:
@@ -711,7 +911,10 @@ class BaseViz:
                 series[p["name"]] = pd.Series(values, index=dates)
                 series[p["name"] + "_low"] = pd.Series(lows, index=dates)
                 series[p["name"] + "_high"] = pd.Series(highs, index=dates)
-        return pd.DataFrame(series).to_csv(index=True)
+        return pd.DataFrame(series)
+
+    def time_series_csv(self, data):
+        return self.time_series_df(data).to_csv(index=True)
 
     def segmentation_csv(self, data):
         csv = ""
@@ -730,6 +933,24 @@ class BaseViz:
                     csv += "\n"
         return csv
 
+    def segmentation_df(self, data):
+        rows = []
+        for cluster in data:
+            for point in cluster["value"]:
+                row = {
+                    "cluster_id": cluster["cluster_id"],
+                    "train_x": point["train"]["x"],
+                    "train_y": point["train"]["y"],
+                }
+                row.update(point["column"])
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def data_clean_df(self, data):
+        return pd.DataFrame(
+            [r["text"] for r in data["records"]], columns=data["columns"]
+        )
+
     def data_clean_csv(self, data):
         csv = ""
         columns = data["columns"]
@@ -1091,9 +1312,9 @@ class SentimentViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = sentiment_task.delay(
-                datasource_id, series, filters, user_id=g.user.get_id())
-            taskId = task.id
+            taskId = self.submit_task(
+                sentiment_task, datasource_id, series, filters,
+                user_id=g.user.get_id())
 
         return {
             "messenger": "",
@@ -1306,6 +1527,7 @@ class BubbleViz(NVD3Viz):
     viz_type = "bubble"
     verbose_name = _("Bubble Chart")
     is_timeseries = False
+    downsample_method = "grid"
 
     def query_obj(self):
         form_data = self.form_data
@@ -1340,6 +1562,7 @@ class BubbleViz(NVD3Viz):
         df["size"] = df[[utils.get_metric_name(self.z_metric)]]
         df["shape"] = "circle"
         df["group"] = df[[self.series]]
+        df = self.downsample_points(df, "x", "y", "group")
 
         series: Dict[Any, List[Any]] = defaultdict(list)
         for row in df.to_dict(orient="records"):
@@ -1356,6 +1579,8 @@ class PlotlyBubbleViz(BaseViz):
     viz_type = "plotly_bubble"
     verbose_name = _("Timeline Bubble")
     is_timeseries = False
+    # every frame of the timeline keeps its share of the bubbles
+    downsample_method = "stratified"
 
     def query_obj(self):
         form_data = self.form_data
@@ -1383,6 +1608,7 @@ class PlotlyBubbleViz(BaseViz):
         df["size"] = df[[utils.get_metric_name(self.z_metric)]]
         df["shape"] = "circle"
         df["group"] = df[[self.timeline]]
+        df = self.downsample_points(df, "x", "y", "group")
 
         timeline = defaultdict(list)
         for row in df.to_dict(orient="records"):
@@ -1512,8 +1738,10 @@ class NVD3TimeSeriesViz(NVD3Viz):
     sort_series = False
     is_timeseries = True
     pivot_fill_value: Optional[int] = None
+    downsample_method = "lttb"
 
-    def to_series(self, df, classed="", title_suffix=""):
+    @staticmethod
+    def clean_series_columns(df):
         cols = []
         for col in df.columns:
             if col == "":
@@ -1523,52 +1751,69 @@ class NVD3TimeSeriesViz(NVD3Viz):
             else:
                 cols.append(col)
         df.columns = cols
-        series = df.to_dict("series")
+        return df
 
-        chart_data = []
-        for name in df.T.index.tolist():
-            ys = series[name]
-            if df[name].dtype.kind not in "biufc":
+    def series_title(self, name, title_suffix=""):
+        if isinstance(name, list):
+            series_title = [str(title) for title in name]
+        elif isinstance(name, tuple):
+            series_title = tuple(str(title) for title in name)
+        else:
+            series_title = str(name)
+        if (
+            isinstance(series_title, (list, tuple))
+            and len(series_title) > 1
+            and len(self.metric_labels) == 1
+        ):
+            # Removing metric from series name if only one metric
+            series_title = series_title[1:]
+        if title_suffix:
+            if isinstance(series_title, str):
+                series_title = (series_title, title_suffix)
+            elif isinstance(series_title, (list, tuple)):
+                series_title = series_title + (title_suffix,)
+        return series_title
+
+    def iter_numeric_series(self, df, title_suffix=""):
+        """
+        Yields the (title, values) of the numeric columns that have at least
+        one non null value, values being a numpy array aligned on the index
+        """
+        df = self.clean_series_columns(df)
+        for i, name in enumerate(df.columns):
+            column = df.iloc[:, i]
+            if column.dtype.kind not in "biufc":
                 continue
-            if isinstance(name, list):
-                series_title = [str(title) for title in name]
-            elif isinstance(name, tuple):
-                series_title = tuple(str(title) for title in name)
-            else:
-                series_title = str(name)
-            if (
-                isinstance(series_title, (list, tuple))
-                and len(series_title) > 1
-                and len(self.metric_labels) == 1
-            ):
-                # Removing metric from series name if only one metric
-                series_title = series_title[1:]
-            if title_suffix:
-                if isinstance(series_title, str):
-                    series_title = (series_title, title_suffix)
-                elif isinstance(series_title, (list, tuple)):
-                    series_title = series_title + (title_suffix,)
-
-            values = []
-            non_nan_cnt = 0
-            for ds in df.index:
-                if ds in ys:
-                    d = {"x": ds, "y": ys[ds]}
-                    if not np.isnan(ys[ds]):
-                        non_nan_cnt += 1
-                else:
-                    d = {}
-                values.append(d)
-
-            if non_nan_cnt == 0:
+            ys = column.to_numpy()
+            if not pd.notna(ys).any():
                 continue
+            yield self.series_title(name, title_suffix), ys
 
+    def to_series(self, df, classed="", title_suffix=""):
+        xs = df.index.tolist()
+        chart_data = []
+        for series_title, ys in self.iter_numeric_series(df, title_suffix):
+            values = [{"x": x, "y": y} for x, y in zip(xs, ys.tolist())]
             d = {"key": series_title, "values": values}
             if classed:
                 d["classed"] = classed
             chart_data.append(d)
         return chart_data
 
+    def to_columnar_series(self, df, index, classed="", title_suffix=""):
+        """
+        Same series as `to_series`, with the y values aligned on a shared
+        `index` instead of repeating the timestamps in every point
+        """
+        df = df.reindex(index)
+        chart_data = []
+        for series_title, ys in self.iter_numeric_series(df, title_suffix):
+            d = {"key": series_title, "y": ys.tolist()}
+            if classed:
+                d["classed"] = classed
+            chart_data.append(d)
+        return chart_data
+
     def process_data(self, df: pd.DataFrame, aggregate: bool = False) -> VizData:
         fd = self.form_data
         if fd.get("granularity") == "all":
@@ -1648,16 +1893,12 @@ class NVD3TimeSeriesViz(NVD3Viz):
         df = self.process_data(df)
         if comparison_type == "values":
             # Filter out series with all NaN
-            chart_data = self.to_series(df.dropna(axis=1, how="all"))
+            frames = [(df.dropna(axis=1, how="all"), "", "")]
 
             for i, (label, df2) in enumerate(self._extra_chart_data):
-                chart_data.extend(
-                    self.to_series(
-                        df2, classed="time-shift-{}".format(i), title_suffix=label
-                    )
-                )
+                frames.append((df2, "time-shift-{}".format(i), label))
         else:
-            chart_data = []
+            frames = []
             for i, (label, df2) in enumerate(self._extra_chart_data):
                 # reindex df2 into the df2 index
                 combined_index = df.index.union(df2.index)
@@ -1681,11 +1922,30 @@ class NVD3TimeSeriesViz(NVD3Viz):
                 # remove leading/trailing NaNs from the time shift difference
                 diff = diff[diff.first_valid_index() : diff.last_valid_index()]
 
+                frames.append((diff, "time-shift-{}".format(i), label))
+
+        frames = [
+            (self.downsample_series(frame), classed, title_suffix)
+            for frame, classed, title_suffix in frames
+        ]
+
+        if fd.get("columnar_payload"):
+            # one shared x array, every series only carries its y values
+            index = frames[0][0].index if frames else pd.Index([])
+            for other in frames[1:]:
+                index = index.union(other[0].index)
+            chart_data = []
+            for frame, classed, title_suffix in frames:
                 chart_data.extend(
-                    self.to_series(
-                        diff, classed="time-shift-{}".format(i), title_suffix=label
-                    )
+                    self.to_columnar_series(frame, index, classed, title_suffix)
                 )
+            if not self.sort_series:
+                chart_data = sorted(chart_data, key=lambda x: tuple(x["key"]))
+            return {"x": index.tolist(), "series": chart_data}
+
+        chart_data = []
+        for frame, classed, title_suffix in frames:
+            chart_data.extend(self.to_series(frame, classed, title_suffix))
 
         if not self.sort_series:
             chart_data = sorted(chart_data, key=lambda x: tuple(x["key"]))
@@ -2128,12 +2388,12 @@ class PlotlyCorrelation(DistributionPieViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = correlation_task.delay(
+            taskId = self.submit_task(
+                correlation_task,
                 datasource_id, target_column, columns, filters, target_value,
                 control_columns=control_columns, control_values=control_values,
                 top_k=int(num_factors),
                 )
-            taskId = task.id
         return {
             "data": [
                 {
@@ -2708,6 +2968,13 @@ class BaseDeckGLViz(BaseViz):
     is_timeseries = False
     credits = '<a href="https://uber.github.io/deck.gl/">deck.gl</a>'
     spatial_control_keys = []
+    # whether get_properties puts the "spatial" coordinates under "position"
+    supports_binary_positions = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # per spatial key, the (first, second) coordinate arrays
+        self.spatial_arrays = {}
 
     def get_metrics(self):
         self.metric = self.form_data.get("size")
@@ -2738,37 +3005,40 @@ class BaseDeckGLViz(BaseViz):
         except Exception:
             raise SpatialException(_("Invalid spatial point encountered: %s" % s))
 
-    @staticmethod
-    def reverse_geohash_decode(geohash_code):
-        lat, lng = geohash.decode(geohash_code)
-        return (lng, lat)
-
-    @staticmethod
-    def reverse_latlong(df, key):
-        df[key] = [tuple(reversed(o)) for o in df[key] if isinstance(o, (list, tuple))]
-
     def process_spatial_data_obj(self, key, df):
         spatial = self.form_data.get(key)
         if spatial is None:
             raise ValueError(_("Bad spatial key"))
 
         if spatial.get("type") == "latlong":
-            df[key] = list(
-                zip(
-                    pd.to_numeric(df[spatial.get("lonCol")], errors="coerce"),
-                    pd.to_numeric(df[spatial.get("latCol")], errors="coerce"),
-                )
+            first = pd.to_numeric(df[spatial.get("lonCol")], errors="coerce").to_numpy(
+                dtype=float
             )
+            second = pd.to_numeric(
+                df[spatial.get("latCol")], errors="coerce"
+            ).to_numpy(dtype=float)
+            empty = np.zeros(len(df), dtype=bool)
         elif spatial.get("type") == "delimited":
             lon_lat_col = spatial.get("lonlatCol")
-            df[key] = df[lon_lat_col].apply(self.parse_coordinates)
+            first, second, empty = parse_delimited(
+                df[lon_lat_col], self.parse_coordinates
+            )
             del df[lon_lat_col]
         elif spatial.get("type") == "geohash":
-            df[key] = df[spatial.get("geohashCol")].map(self.reverse_geohash_decode)
+            try:
+                lat, lon, empty = decode_geohashes(df[spatial.get("geohashCol")])
+            except ValueError:
+                raise SpatialException(_("Invalid geohash encountered"))
+            first, second = lon, lat
             del df[spatial.get("geohashCol")]
+        else:
+            first = None
 
-        if spatial.get("reverseCheckbox"):
-            self.reverse_latlong(df, key)
+        if first is not None:
+            if spatial.get("reverseCheckbox"):
+                first, second = second, first
+            self.spatial_arrays[key] = (first, second)
+            df[key] = to_tuples(first, second, empty)
 
         if df.get(key) is None:
             raise NullValueException(
@@ -2837,19 +3107,31 @@ class BaseDeckGLViz(BaseViz):
         for key in self.spatial_control_keys:
             df = self.process_spatial_data_obj(key, df)
 
+        # positions are sent once as a typed array instead of in every feature
+        binary_positions = (
+            self.supports_binary_positions
+            and self.form_data.get("binary_positions")
+            and "spatial" in self.spatial_arrays
+        )
+
         features = []
         for d in df.to_dict(orient="records"):
             feature = self.get_properties(d)
             extra_props = self.get_js_columns(d)
             if extra_props:
                 feature["extraProps"] = extra_props
+            if binary_positions:
+                del feature["position"]
             features.append(feature)
 
-        return {
+        data = {
             "features": features,
             "mapboxApiKey": config.get("MAPBOX_API_KEY"),
             "metricLabels": self.metric_labels,
         }
+        if binary_positions:
+            data["positions"] = to_binary_positions(*self.spatial_arrays["spatial"])
+        return data
 
     def get_properties(self, d):
         raise NotImplementedError()
@@ -2862,6 +3144,7 @@ class DeckScatterViz(BaseDeckGLViz):
     viz_type = "deck_scatter"
     verbose_name = _("Deck.gl - Scatter plot")
     spatial_control_keys = ["spatial"]
+    supports_binary_positions = True
     is_timeseries = True
 
     def query_obj(self):
@@ -2909,6 +3192,7 @@ class DeckScreengrid(BaseDeckGLViz):
     viz_type = "deck_screengrid"
     verbose_name = _("Deck.gl - Screen Grid")
     spatial_control_keys = ["spatial"]
+    supports_binary_positions = True
     is_timeseries = True
 
     def query_obj(self):
@@ -2935,6 +3219,7 @@ class DeckGrid(BaseDeckGLViz):
     viz_type = "deck_grid"
     verbose_name = _("Deck.gl - 3D Grid")
     spatial_control_keys = ["spatial"]
+    supports_binary_positions = True
 
     def get_properties(self, d):
         return {"position": d.get("spatial"), "weight": d.get(self.metric_label) or 1}
@@ -3039,6 +3324,7 @@ class DeckHex(BaseDeckGLViz):
     viz_type = "deck_hex"
     verbose_name = _("Deck.gl - 3D HEX")
     spatial_control_keys = ["spatial"]
+    supports_binary_positions = True
 
     def get_properties(self, d):
         return {"position": d.get("spatial"), "weight": d.get(self.metric_label) or 1}
@@ -3420,8 +3706,9 @@ class PlotlyPredictionViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = forecast_task.delay(datasource_id, date_time, columns, int(periods), filters, g.user.get_id(), trials=int(num_trials))
-            taskId = task.id
+            taskId = self.submit_task(
+                forecast_task, datasource_id, date_time, columns, int(periods), filters,
+                user_id=g.user.get_id(), trials=int(num_trials))
 
         return {
             "data": [
@@ -3511,8 +3798,10 @@ class ClassificationPredictionViz(BaseViz):
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
             presets = "best_quality" if optimization_presets else "medium_quality_faster_train"
-            task = classification_task.delay(
-                datasource_id, target, columns, filters, g.user.get_id(),
+            taskId = self.submit_task(
+                classification_task,
+                datasource_id, target, columns, filters,
+                user_id=g.user.get_id(),
                 biased_groups=biased_groups,
                 debiased_features=debiased_features,
                 validation_ratio=.2 if ratio is None else ratio/100.,
@@ -3520,7 +3809,6 @@ class ClassificationPredictionViz(BaseViz):
                 presets=presets,
                 explain_samples=explain_predictions,
                 kfolds=1 if not cross_validation or kfolds is None else kfolds)
-            taskId = task.id
 
         return {
             "messenger": "",
@@ -3586,8 +3874,10 @@ class RegressionPredictionViz(BaseViz):
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
             presets = "best_quality" if optimization_presets else "medium_quality_faster_train"
-            task = regression_task.delay(
-                datasource_id, nameValue, columns, filters, g.user.get_id(),
+            taskId = self.submit_task(
+                regression_task,
+                datasource_id, nameValue, columns, filters,
+                user_id=g.user.get_id(),
                 validation_ratio=validation_percent/100. if validation_percent is not None else 0.,
                 prediction_quantile_low=float(quantile_low) if quantile_mode else None,
                 prediction_quantile_high=float(quantile_high) if quantile_mode else None,
@@ -3601,7 +3891,6 @@ class RegressionPredictionViz(BaseViz):
                 new_intervention_column=new_intervention,
                 common_causes=common_causes,
             )
-            taskId = task.id
 
         return {
             "fields": [],
@@ -3669,11 +3958,13 @@ class BayesianRegressionViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = bayesian_regression_task.delay(
+            taskId = self.submit_task(
+                bayesian_regression_task,
                 datasource_id,
                 nameValue,
                 columns,
-                filters, g.user.get_id(),
+                filters,
+                user_id=g.user.get_id(),
                 validation_split=ratio,
                 polynomial_degree=int(polynomial_degree),
                 prediction_quantile_low=float(quantile_low),
@@ -3681,7 +3972,6 @@ class BayesianRegressionViz(BaseViz):
                 trials=trials,
                 priors=priorslist,
             )
-            taskId = task.id
 
         return {
             "status": "PROCESSING",
@@ -3729,20 +4019,20 @@ class CausalInferenceViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = causal_inference_task.delay(
-                datasource_id, 
+            taskId = self.submit_task(
+                causal_inference_task,
+                datasource_id,
                 [outcome],
                 positive_outcome_value,
                 [treatment],
                 filters,
-                userId,
+                user_id=userId,
                 effect_modifiers=[effect_modifier] if effect_modifier is not None else [],
                 controls={treatment: treatment_control} if treatment_control is not None else None,
                 common_causes=common_causes,
                 log_treatment=log_treatment,
                 log_outcome=log_outcome,
             )
-            taskId = task.id
 
         return {
             "data": {},
@@ -3795,17 +4085,17 @@ class PlotlyTsneViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = clustering_task.delay(
+            taskId = self.submit_task(
+                clustering_task,
                 datasource_id,
                 group,
                 columns,
                 "auto" if number_clusters == "auto" else int(number_clusters),
                 filters,
-                g.user.get_id(),
+                user_id=g.user.get_id(),
                 extra_columns=extra_columns,
                 max_train_samples=None if max_train_samples is None else int(max_train_samples),
                 explain_samples=explain_predictions)
-            taskId = task.id
 
         return {
             "data": [
@@ -3855,8 +4145,9 @@ class CleanDataViz(BaseViz):
             security_manager.can_create_task()
             m = re.match(r"(\d+)__.+", datasource_id_type)
             datasource_id = m.group(1)
-            task = data_imputation_task.delay(datasource_id, rules, filters, g.user.get_id(), show_empty)
-            taskId = task.id
+            taskId = self.submit_task(
+                data_imputation_task, datasource_id, rules, filters,
+                user_id=g.user.get_id(), impute_nulls=show_empty)
         return {
             "data": [
                 {
@@ -4030,32 +4321,31 @@ def timeseries_performance_to_dataframe(data):
     ])
 
 def timeseries_validation_to_dataframe(data):
-    df = pd.DataFrame()
     dates = data['evaluate']['dates']
+    columns = {}
 
     for (column_index, column) in enumerate(data['predict'][0]):
-        df[(column['name'], 'Actual')] = data['predict'][0][column_index]['value']['data']['value'][-(len(dates)):]
-        df[(column['name'], 'Q5')] = data['evaluate']['values'][0][column_index]['q5']
-        df[(column['name'], 'Q50')] = data['evaluate']['values'][0][column_index]['q50']
-        df[(column['name'], 'Q95')] = data['evaluate']['values'][0][column_index]['q95']
+        values = data['evaluate']['values'][0][column_index]
+        columns[(column['name'], 'Actual')] = column['value']['data']['value'][-(len(dates)):]
+        columns[(column['name'], 'Q5')] = values['q5']
+        columns[(column['name'], 'Q50')] = values['q50']
+        columns[(column['name'], 'Q95')] = values['q95']
 
-    df.index = dates
-    df.index.name = 'Dates'
+    df = pd.DataFrame(columns, index=pd.Index(dates, name='Dates'))
     df.columns = pd.MultiIndex.from_tuples(df.columns)
 
     return df
 
 def timeseries_prediction_to_dataframe(data):
-    df = pd.DataFrame()
     dates = data['predict'][0][0]['value']['prediction']['date']
+    columns = {}
 
     for column in data['predict'][0]:
-        df[(column['name'], 'MAX')] = column['value']['prediction']['max']
-        df[(column['name'], 'MEDIAN')] = column['value']['prediction']['median']
-        df[(column['name'], 'MIN')] = column['value']['prediction']['min']
+        columns[(column['name'], 'MAX')] = column['value']['prediction']['max']
+        columns[(column['name'], 'MEDIAN')] = column['value']['prediction']['median']
+        columns[(column['name'], 'MIN')] = column['value']['prediction']['min']
 
-    df.index = dates
-    df.index.name = 'Dates'
+    df = pd.DataFrame(columns, index=pd.Index(dates, name='Dates'))
     df.columns = pd.MultiIndex.from_tuples(df.columns)
 
     return df
@@ -16,9 +16,17 @@
 # under the License.
 """Unit tests for Superset with caching"""
 import json
+import os
+import pickle as pkl
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
 
-from superset import cache, db
-from superset.utils.core import QueryStatus
+import pandas as pd
+
+from superset import app, cache, db
+from superset.utils import cache_codec, incremental_cache
+from superset.utils.core import DTTM_ALIAS, QueryStatus
 
 from .base_tests import SupersetTestCase
 
@@ -51,3 +59,150 @@ class CacheTests(SupersetTestCase):
         self.assertEqual(resp_from_cache["status"], QueryStatus.SUCCESS)
         self.assertEqual(resp["data"], resp_from_cache["data"])
         self.assertEqual(resp["query"], resp_from_cache["query"])
+
+    def test_incremental_cache_plan_blocks(self):
+        day = timedelta(days=1)
+        starts, ranges = incremental_cache.plan_blocks(
+            datetime(2020, 1, 1, 12), datetime(2020, 1, 5, 6), day, datetime(2020, 1, 4)
+        )
+        self.assertEqual(starts, [datetime(2020, 1, 2), datetime(2020, 1, 3)])
+        self.assertEqual(
+            ranges,
+            [
+                (datetime(2020, 1, 1, 12), datetime(2020, 1, 2)),
+                (datetime(2020, 1, 4), datetime(2020, 1, 5, 6)),
+            ],
+        )
+
+    def test_incremental_cache_df(self):
+        calls = []
+
+        def query_range(start, end):
+            calls.append((start, end))
+            hours = pd.date_range(start, end, freq="H", closed="left")
+            return pd.DataFrame({DTTM_ALIAS: hours, "count": 1})
+
+        rule = dict(incremental_cache.DEFAULT_RULE, grain_width=timedelta(hours=1))
+        query = {
+            "from_dttm": datetime(2020, 1, 1, 12),
+            "to_dttm": datetime(2020, 1, 4, 12),
+            "row_limit": 10000,
+        }
+        df = incremental_cache.get_incremental_df(
+            rule, "key", query, query_range, timedelta(), None
+        )
+        self.assertEqual(len(df), 72)
+        self.assertTrue(df[DTTM_ALIAS].is_monotonic_increasing)
+        # the two whole days are queried at once, around the leading and
+        # trailing half days
+        self.assertEqual(len(calls), 3)
+
+        # the window moved by a day, only the new ranges are queried
+        calls.clear()
+        query["from_dttm"] += timedelta(days=1)
+        query["to_dttm"] += timedelta(days=1)
+        df = incremental_cache.get_incremental_df(
+            rule, "key", query, query_range, timedelta(), None
+        )
+        self.assertEqual(len(df), 72)
+        self.assertEqual(
+            calls,
+            [
+                (datetime(2020, 1, 4), datetime(2020, 1, 5)),
+                (datetime(2020, 1, 2, 12), datetime(2020, 1, 3)),
+                (datetime(2020, 1, 5), datetime(2020, 1, 5, 12)),
+            ],
+        )
+
+        # the result might have been truncated by the row limit
+        query["row_limit"] = 10
+        self.assertIsNone(
+            incremental_cache.get_incremental_df(
+                rule, "other", query, query_range, timedelta(), None
+            )
+        )
+
+    def test_incremental_cache_block_width(self):
+        rule = dict(incremental_cache.DEFAULT_RULE, grain_width=timedelta(minutes=1))
+        from_dttm = datetime(2020, 1, 1)
+        self.assertEqual(
+            incremental_cache.block_width(rule, from_dttm, datetime(2020, 1, 2)),
+            timedelta(minutes=24),
+        )
+        # a year of minutes is not split into tens of thousands of blocks
+        block = incremental_cache.block_width(rule, from_dttm, datetime(2021, 1, 1))
+        self.assertLessEqual(
+            (datetime(2021, 1, 1) - from_dttm) // block, rule["max_blocks"]
+        )
+
+    @patch.dict(
+        "superset.utils.incremental_cache.config",
+        {"INCREMENTAL_CACHE_RULES": {"*": True}},
+    )
+    def test_incremental_cache_get_rule(self):
+        datasource = self.get_table_by_name("birth_names")
+        query = {
+            "is_timeseries": True,
+            "granularity": "ds",
+            "from_dttm": datetime(2020, 1, 1),
+            "to_dttm": datetime(2020, 2, 1),
+            "extras": {"time_grain_sqla": "P1D"},
+        }
+        rule = incremental_cache.get_rule(datasource, query)
+        self.assertEqual(rule["grain_width"], timedelta(days=1))
+
+        # raw timestamps are not cached per block
+        raw_query = dict(query, extras={"time_grain_sqla": None})
+        self.assertIsNone(incremental_cache.get_rule(datasource, raw_query))
+
+        # the blocks would lose the order of the whole query, e.g. of a table
+        # sorted on a metric
+        ordered_query = dict(query, orderby=[("count", False)])
+        self.assertIsNone(incremental_cache.get_rule(datasource, ordered_query))
+
+    def test_cache_codec(self):
+        df = pd.DataFrame(
+            {
+                DTTM_ALIAS: pd.date_range("2020-01-01", periods=3),
+                "name": ["a", None, "c"],
+                "count": [1.0, None, 3.0],
+            }
+        )
+        payload = {"dttm": "2020-01-01T00:00:00", "query": "SELECT 1", "df": df}
+
+        data = cache_codec.dumps_df_payload(payload)
+        self.assertTrue(data.startswith(cache_codec.MAGIC))
+        loaded = cache_codec.loads_df_payload(data)
+        pd.testing.assert_frame_equal(loaded.pop("df"), df)
+        self.assertEqual(loaded, {"dttm": payload["dttm"], "query": "SELECT 1"})
+
+        # entries cached before the codec are still readable
+        legacy = cache_codec.loads_df_payload(pkl.dumps(payload))
+        pd.testing.assert_frame_equal(legacy["df"], df)
+
+        # mixed object columns don't fit in Arrow and are pickled
+        mixed = dict(payload, df=pd.DataFrame({"mixed": [1, "a", b"b"]}))
+        data = cache_codec.dumps_df_payload(mixed)
+        self.assertFalse(data.startswith(cache_codec.MAGIC))
+        self.assertEqual(
+            cache_codec.loads_df_payload(data)["df"]["mixed"].tolist(), [1, "a", b"b"]
+        )
+
+    def test_cache_codec_disk_tier(self):
+        df = pd.DataFrame({"count": range(1000)})
+        with tempfile.TemporaryDirectory() as disk_dir, patch.dict(
+            app.config,
+            {"CACHE_CODEC_DISK_THRESHOLD": 10, "CACHE_CODEC_DISK_DIR": disk_dir},
+        ):
+            data = cache_codec.dumps_df_payload({"query": "", "df": df})
+            self.assertLess(len(data), 200)
+            self.assertEqual(len(os.listdir(disk_dir)), 1)
+            pd.testing.assert_frame_equal(
+                cache_codec.loads_df_payload(data)["df"], df
+            )
+
+            # a server without the file misses the cache
+            for filename in os.listdir(disk_dir):
+                os.remove(os.path.join(disk_dir, filename))
+            with self.assertRaises(Exception):
+                cache_codec.loads_df_payload(data)
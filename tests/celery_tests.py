@@ -34,11 +34,11 @@ from sqlalchemy.pool import NullPool
 
 from tests.test_app import app
 from superset import db, sql_lab
-from superset.dataframe import SupersetDataFrame
 from superset.db_engine_specs.base import BaseEngineSpec
 from superset.extensions import celery_app
 from superset.models.helpers import QueryStatus
 from superset.models.sql_lab import Query
+from superset.result_set import SupersetResultSet
 from superset.sql_parse import ParsedQuery
 from superset.utils.core import get_example_database
 
@@ -359,13 +359,13 @@ class CeleryTestCase(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
 
         with mock.patch.object(
             db_engine_spec, "expand_data", wraps=db_engine_spec.expand_data
         ) as expand_data:
             data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-                cdf, db_engine_spec, False, True
+                result_set, db_engine_spec, False, True
             )
             expand_data.assert_called_once()
 
@@ -380,13 +380,13 @@ class CeleryTestCase(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
 
         with mock.patch.object(
             db_engine_spec, "expand_data", wraps=db_engine_spec.expand_data
         ) as expand_data:
             data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-                cdf, db_engine_spec, True
+                result_set, db_engine_spec, True
             )
             expand_data.assert_not_called()
 
@@ -402,14 +402,14 @@ class CeleryTestCase(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
         query = {
             "database_id": 1,
             "sql": "SELECT * FROM birth_names LIMIT 100",
             "status": QueryStatus.PENDING,
         }
         serialized_data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-            cdf, db_engine_spec, use_new_deserialization
+            result_set, db_engine_spec, use_new_deserialization
         )
         payload = {
             "query_id": 1,
@@ -435,14 +435,14 @@ class CeleryTestCase(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
         query = {
             "database_id": 1,
             "sql": "SELECT * FROM birth_names LIMIT 100",
             "status": QueryStatus.PENDING,
         }
         serialized_data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-            cdf, db_engine_spec, use_new_deserialization
+            result_set, db_engine_spec, use_new_deserialization
         )
         payload = {
             "query_id": 1,
@@ -53,6 +53,7 @@ from superset.models.dashboard import Dashboard
 from superset.models.datasource_access_request import DatasourceAccessRequest
 from superset.models.slice import Slice
 from superset.models.sql_lab import Query
+from superset.result_set import SupersetResultSet
 from superset.utils import core as utils
 from superset.views import core as views
 from superset.views.database.views import DatabaseView
@@ -369,6 +370,21 @@ class CoreTests(SupersetTestCase):
         assert len(resp) > 0
         assert "Carbon Dioxide" in resp
 
+    def test_filter_values_endpoint(self):
+        self.login(username="admin")
+        tbl_id = self.table_ids.get("energy_usage")
+        url = "/superset/filter_values/table/{}/?column=source&column=target"
+        resp = json.loads(self.get_resp(url.format(tbl_id)))
+        self.assertEqual(set(resp), {"source", "target"})
+        self.assertIn("Carbon Dioxide", resp["target"])
+        self.assertEqual(len(resp["source"]), len(set(resp["source"])))
+
+        resp = json.loads(
+            self.get_resp(url.format(tbl_id) + "&prefix=Carbon%20D&limit=5")
+        )
+        self.assertEqual(resp["target"], ["Carbon Dioxide"])
+        self.assertTrue(all(v.startswith("Carbon D") for v in resp["source"]))
+
     def test_slice_data(self):
         # slice data should have some required attributes
         self.login(username="admin")
@@ -1011,14 +1027,14 @@ class CoreTests(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = dataframe.SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
         query = {
             "database_id": 1,
             "sql": "SELECT * FROM birth_names LIMIT 100",
             "status": utils.QueryStatus.PENDING,
         }
         serialized_data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-            cdf, db_engine_spec, use_new_deserialization
+            result_set, db_engine_spec, use_new_deserialization
         )
         payload = {
             "query_id": 1,
@@ -1054,14 +1070,14 @@ class CoreTests(SupersetTestCase):
             ("d", "datetime"),
         )
         db_engine_spec = BaseEngineSpec()
-        cdf = dataframe.SupersetDataFrame(data, cursor_descr, db_engine_spec)
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
         query = {
             "database_id": 1,
             "sql": "SELECT * FROM birth_names LIMIT 100",
             "status": utils.QueryStatus.PENDING,
         }
         serialized_data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
-            cdf, db_engine_spec, use_new_deserialization
+            result_set, db_engine_spec, use_new_deserialization
         )
         payload = {
             "query_id": 1,
@@ -1088,11 +1104,35 @@ class CoreTests(SupersetTestCase):
             deserialized_payload = views._deserialize_results_payload(
                 serialized_payload, query_mock, use_new_deserialization
             )
-            payload["data"] = dataframe.SupersetDataFrame.format_data(cdf.raw_df)
+            payload["data"] = dataframe.df_to_records(result_set.to_pandas_df())
 
             self.assertDictEqual(deserialized_payload, payload)
             expand_data.assert_called_once()
 
+    def test_results_msgpack_deserialization_page(self):
+        data = [("a", 4, 4.0), ("b", 5, 5.0), ("c", 6, 6.0)]
+        cursor_descr = (("a", "string"), ("b", "int"), ("c", "float"))
+        db_engine_spec = BaseEngineSpec()
+        result_set = SupersetResultSet(data, cursor_descr, db_engine_spec)
+        serialized_data, selected_columns, all_columns, expanded_columns = sql_lab._serialize_and_expand_data(
+            result_set, db_engine_spec, True
+        )
+        payload = {
+            "data": serialized_data,
+            "columns": all_columns,
+            "selected_columns": selected_columns,
+            "expanded_columns": expanded_columns,
+        }
+        serialized_payload = sql_lab._serialize_payload(payload, True)
+
+        query_mock = mock.Mock()
+        query_mock.database.db_engine_spec = db_engine_spec
+        deserialized_payload = views._deserialize_results_payload(
+            serialized_payload, query_mock, True, offset=1, limit=1, columns=["b"]
+        )
+        self.assertEqual([{"b": 5}], deserialized_payload["data"])
+        self.assertEqual(["b"], [c["name"] for c in deserialized_payload["columns"]])
+
     @mock.patch.dict(
         "superset.extensions.feature_flag_manager._feature_flags",
         {"FOO": lambda x: 1},
@@ -160,3 +160,19 @@ class SupersetDataFrameTestCase(SupersetTestCase):
         cdf = SupersetDataFrame(data, cursor_descr, PrestoEngineSpec)
         self.assertEqual(cdf.raw_df.dtypes[0], np.dtype("O"))
         self.assertEqual(cdf.raw_df.dtypes[1], pd.Int64Dtype())
+
+    def test_df_to_records_stringifies_large_ints(self):
+        df = pd.DataFrame(
+            {
+                "small": [1, 2],
+                "big": [2 ** 60, 3],
+                "nullable": pd.Series([2 ** 60, None], dtype=object),
+            }
+        )
+        self.assertEqual(
+            df_to_records(df),
+            [
+                {"small": 1, "big": str(2 ** 60), "nullable": str(2 ** 60)},
+                {"small": 2, "big": 3, "nullable": None},
+            ],
+        )
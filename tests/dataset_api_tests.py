@@ -15,9 +15,13 @@
 # specific language governing permissions and limitations
 # under the License.
 """Unit tests for Superset"""
+import gzip
 import json
+import os
+import tempfile
+import time
 from typing import List
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import prison
 import yaml
@@ -25,6 +29,7 @@ from sqlalchemy.sql import func
 
 from superset import db, security_manager
 from superset.connectors.sqla.models import SqlaTable, SqlMetric, TableColumn
+from superset.datasets import utils as dataset_utils
 from superset.dao.exceptions import (
     DAOCreateFailedError,
     DAODeleteFailedError,
@@ -742,3 +747,150 @@ class DatasetApiTests(SupersetTestCase):
         self.login(username="gamma")
         rv = self.client.get(uri)
         self.assertEqual(rv.status_code, 401)
+
+    def test_download_dataset(self):
+        """
+            Dataset API: Test download streams the table as CSV
+        """
+        birth_names_dataset = self.get_birth_names_dataset()
+        uri = f"api/v1/dataset/download/{birth_names_dataset.id}"
+
+        self.login(username="admin")
+        rv = self.client.get(uri)
+        self.assertEqual(rv.status_code, 200)
+        lines = rv.data.decode("utf-8").splitlines()
+        self.assertIn("name", lines[0].split(","))
+        self.assertGreater(len(lines), 1)
+
+    def test_download_dataset_gzip_range(self):
+        """
+            Dataset API: Test gzipped download can be resumed with a range
+        """
+        birth_names_dataset = self.get_birth_names_dataset()
+        uri = f"api/v1/dataset/download/{birth_names_dataset.id}?compression=gzip"
+
+        self.login(username="admin")
+        rv = self.client.get(uri)
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.mimetype, "application/gzip")
+        full = rv.data
+        self.assertIn(b"name", gzip.decompress(full).splitlines()[0])
+
+        etag = rv.headers["ETag"]
+
+        rv = self.client.get(uri, headers={"Range": "bytes=10-", "If-Range": etag})
+        self.assertEqual(rv.status_code, 206)
+        self.assertEqual(rv.data, full[10:])
+
+        # without a known export the range is ignored
+        rv = self.client.get(uri, headers={"Range": "bytes=10-"})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
+    @patch("superset.datasets.api.clone_dataset.apply_async")
+    @patch("superset.models.custom.Workspace.get_or_create_workspace")
+    @patch("superset.datasets.api.security_manager.is_beta_user", return_value=True)
+    def test_clone_dataset_across_databases(
+        self, is_beta_user, get_or_create_workspace, apply_async
+    ):
+        """
+            Dataset API: Test cloning into another database runs in a task
+        """
+        example_db = get_example_database()
+        target = Database(
+            database_name="clone_target",
+            sqlalchemy_uri=example_db.sqlalchemy_uri_decrypted,
+        )
+        db.session.add(target)
+        db.session.commit()
+        workspace = Mock(db_id=target.id)
+        workspace.name = "public"
+        get_or_create_workspace.return_value = workspace
+        apply_async.return_value = Mock(id="task-id")
+        birth_names_dataset = self.get_birth_names_dataset()
+
+        self.login(username="admin")
+        rv = self.client.post(
+            "api/v1/dataset/clone",
+            data={"id": birth_names_dataset.id, "name": "birth_names_clone"},
+        )
+        try:
+            self.assertEqual(rv.status_code, 202)
+            self.assertEqual(json.loads(rv.data.decode("utf-8"))["task_id"], "task-id")
+            _, kwargs = apply_async.call_args
+            self.assertEqual(
+                kwargs["args"],
+                (birth_names_dataset.id, target.id, "birth_names_clone", "public"),
+            )
+            self.assertTrue(
+                kwargs["task_id"].startswith(f"{self.get_user('admin').id}-")
+            )
+        finally:
+            db.session.delete(target)
+            db.session.commit()
+
+    @patch("superset.datasets.api.clone_dataset.AsyncResult")
+    def test_clone_dataset_status(self, async_result):
+        """
+            Dataset API: Test clone status is only visible to its user
+        """
+        async_result.return_value = Mock(state="PROGRESS", info={"rows": 10})
+        user_id = self.get_user("admin").id
+
+        self.login(username="admin")
+        rv = self.client.get(f"api/v1/dataset/clone/{user_id}-abc")
+        self.assertEqual(rv.status_code, 200)
+        data = json.loads(rv.data.decode("utf-8"))
+        self.assertEqual(data["status"], "PROGRESS")
+        self.assertEqual(data["rows"], 10)
+        async_result.assert_called_once_with(f"{user_id}-abc")
+
+        rv = self.client.get(f"api/v1/dataset/clone/{user_id + 1}-abc")
+        self.assertEqual(rv.status_code, 404)
+
+    def test_tee_to_file_completion_bounds(self):
+        """
+            Dataset API: Test interrupted downloads are only completed within bounds
+        """
+
+        def blocks():
+            for _ in range(10):
+                yield b"x" * 10
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.csv")
+            data = dataset_utils.tee_to_file(blocks(), path, complete_on_close=True)
+            next(data)
+            data.close()
+            for _ in range(50):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.1)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"x" * 100)
+
+            # a file growing past the limit is given up
+            path = os.path.join(directory, "large.csv")
+            data = dataset_utils.tee_to_file(
+                blocks(), path, complete_on_close=True, complete_max_bytes=50
+            )
+            next(data)
+            data.close()
+            for _ in range(50):
+                if os.listdir(directory) == ["export.csv"]:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(os.listdir(directory), ["export.csv"])
+
+            # no completion without a free slot
+            path = os.path.join(directory, "busy.csv")
+            with patch.object(
+                dataset_utils, "_completion_slots"
+            ) as completion_slots:
+                completion_slots.acquire.return_value = False
+                data = dataset_utils.tee_to_file(
+                    blocks(), path, complete_on_close=True
+                )
+                next(data)
+                data.close()
+            self.assertEqual(os.listdir(directory), ["export.csv"])
@@ -17,8 +17,14 @@
 from tests.test_app import app  # isort:skip
 
 import datetime
+import io
+import tempfile
 from unittest import mock
 
+import numpy
+import pandas as pd
+from sqlalchemy.types import Integer, String
+
 from superset.db_engine_specs import engines
 from superset.db_engine_specs.base import BaseEngineSpec, builtin_time_grains
 from superset.db_engine_specs.sqlite import SqliteEngineSpec
@@ -232,3 +238,131 @@ class DbEngineSpecsTests(DbEngineSpecTestCase):
         ]
         result = BaseEngineSpec.pyodbc_rows_to_tuples(data)
         self.assertListEqual(result, data)
+
+    def test_infer_csv_dtypes_across_chunks(self):
+        csv = io.StringIO("a,b,c,d\n1,x,1,true\n2,y,1.5,false\n,z,2,\n")
+        dtypes = BaseEngineSpec.infer_csv_dtypes(filepath_or_buffer=csv, chunksize=2)
+        self.assertEqual(dtypes["a"], numpy.dtype("float64"))
+        self.assertEqual(dtypes["b"], numpy.dtype("object"))
+        self.assertEqual(dtypes["c"], numpy.dtype("float64"))
+        self.assertEqual(dtypes["d"], numpy.dtype("object"))
+
+    def test_infer_csv_date_columns_across_chunks(self):
+        csv = io.StringIO(
+            "a,b,c\n"
+            "2020-01-01,2020-01-01,1\n"
+            "2020-01-02,2020-01-02,2\n"
+            "2020-01-03,not a date,3\n"
+        )
+        date_columns = BaseEngineSpec.infer_csv_date_columns(
+            filepath_or_buffer=csv, chunksize=2
+        )
+        self.assertEqual(date_columns, {"a": "%Y-%m-%d"})
+
+    def test_infer_csv_date_columns_same_format(self):
+        csv = io.StringIO(
+            "a,b\n"
+            "2020-01-01,2020-01-01\n"
+            "2020-01-02,2020-01-02\n"
+            "2020-01-03,01/04/2020\n"
+        )
+        date_columns = BaseEngineSpec.infer_csv_date_columns(
+            filepath_or_buffer=csv, chunksize=2
+        )
+        self.assertEqual(date_columns, {"a": "%Y-%m-%d"})
+
+    def test_create_table_from_csv_rolls_back_on_failure(self):
+        database = get_example_database()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as csv:
+            csv.write("a,b\n1,x\n2,y\n3,z\n")
+            csv.flush()
+            with mock.patch.object(
+                BaseEngineSpec, "df_to_sql", side_effect=[None, Exception("boom")]
+            ) as df_to_sql, self.assertRaises(Exception):
+                BaseEngineSpec.create_table_from_csv_without_form(
+                    csv.name,
+                    None,
+                    database,
+                    {"chunksize": 2},
+                    {"name": "csv_rollback", "if_exists": "fail", "index": False},
+                )
+        first, second = df_to_sql.call_args_list
+        self.assertIs(first[1]["con"], second[1]["con"])
+
+    def test_get_bulk_insert_method(self):
+        self.assertIsNone(BaseEngineSpec.get_bulk_insert_method())
+
+    def test_clone_table_same_database(self):
+        database = get_example_database()
+        BaseEngineSpec.clone_table(
+            database, None, "birth_names", None, "birth_names_clone"
+        )
+        try:
+            df = database.get_df("SELECT COUNT(*) AS cnt FROM birth_names_clone")
+            expected = database.get_df("SELECT COUNT(*) AS cnt FROM birth_names")
+            self.assertEqual(df["cnt"][0], expected["cnt"][0])
+        finally:
+            database.get_sqla_engine().execute("DROP TABLE birth_names_clone")
+
+    @staticmethod
+    def get_clone_source(chunks):
+        src_database = mock.Mock(id=-1)
+        src_database.get_quoter.return_value = lambda name: name
+        src_database.get_columns.return_value = [
+            {"name": "a", "type": Integer()},
+            {"name": "b", "type": String(10)},
+        ]
+        src_database.iter_df.return_value = chunks
+        return src_database
+
+    def test_clone_table_across_databases(self):
+        database = get_example_database()
+        src_database = self.get_clone_source(
+            iter(
+                [
+                    pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}),
+                    # NULLs turn the integer column into float64
+                    pd.DataFrame({"a": [None, 4.0], "b": ["z", None]}),
+                ]
+            )
+        )
+        progress = mock.Mock()
+        BaseEngineSpec.clone_table(
+            database,
+            None,
+            "source",
+            None,
+            "clone_across",
+            src_database=src_database,
+            chunksize=2,
+            progress=progress,
+        )
+        try:
+            columns = {
+                col["name"]: col["type"]
+                for col in database.get_columns("clone_across")
+            }
+            self.assertIsInstance(columns["a"], Integer)
+            df = database.get_df("SELECT a FROM clone_across ORDER BY a")
+            self.assertEqual(df["a"].dropna().tolist(), [1, 2, 4])
+            progress.assert_called_with(4)
+        finally:
+            database.get_sqla_engine().execute("DROP TABLE clone_across")
+
+    def test_clone_table_drops_table_on_failure(self):
+        def chunks():
+            yield pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+            raise Exception("connection lost")
+
+        database = get_example_database()
+        src_database = self.get_clone_source(chunks())
+        with self.assertRaises(Exception):
+            BaseEngineSpec.clone_table(
+                database,
+                None,
+                "source",
+                None,
+                "clone_failed",
+                src_database=src_database,
+            )
+        self.assertFalse(database.has_table_by_name("clone_failed"))
@@ -83,3 +83,9 @@ class PostgresTests(DbEngineSpecTestCase):
             PostgresEngineSpec.convert_dttm("TIMESTAMP", dttm),
             "TO_TIMESTAMP('2019-01-02 03:04:05.678900', 'YYYY-MM-DD HH24:MI:SS.US')",
         )
+
+    def test_get_bulk_insert_method(self):
+        self.assertEqual(
+            PostgresEngineSpec.get_bulk_insert_method(),
+            PostgresEngineSpec.psql_insert_copy,
+        )
@@ -0,0 +1,58 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# isort:skip_file
+import numpy as np
+import pandas as pd
+
+import tests.test_app
+from superset.filters import concat_chunks, downcast_df
+
+from .base_tests import SupersetTestCase
+
+
+class DataFiltersTestCase(SupersetTestCase):
+    def test_downcast_df(self):
+        df = pd.DataFrame(
+            {
+                "int": [1, 2, 3, 4],
+                "float": [0.5, 1.5, np.nan, 2.0],
+                "precise": [0.1, 0.2, 0.3, 0.4],
+                "label": ["a", "b", "a", "a"],
+                "text": ["w", "x", "y", "z"],
+            }
+        )
+        df = downcast_df(df)
+        self.assertEqual(df["int"].dtype, np.int8)
+        self.assertEqual(df["float"].dtype, np.float32)
+        self.assertEqual(df["precise"].dtype, np.float64)
+        self.assertEqual(df["label"].dtype.name, "category")
+        self.assertEqual(df["text"].dtype, np.object_)
+
+    def test_downcast_df_without_categories(self):
+        df = pd.DataFrame({"label": ["a", "a", "a"]})
+        df = downcast_df(df, max_category_ratio=None)
+        self.assertEqual(df["label"].dtype, np.object_)
+
+    def test_concat_chunks_null_chunk(self):
+        chunks = [
+            pd.DataFrame({"a": [1, 2], "b": pd.to_datetime(["2020-01-01"] * 2)}),
+            pd.DataFrame({"a": [None, None], "b": [None, None]}),
+        ]
+        df = concat_chunks(chunks)
+        self.assertEqual(len(df), 4)
+        self.assertEqual(df["a"].dtype, np.float64)
+        self.assertTrue(pd.api.types.is_datetime64_dtype(df["b"].dtype))
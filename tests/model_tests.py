@@ -107,6 +107,22 @@ class DatabaseModelTestCase(SupersetTestCase):
         user_name = make_url(model.get_sqla_engine(user_name=example_user).url).username
         self.assertNotEqual(example_user, user_name)
 
+    def test_get_sqla_engine_pooled(self):
+        extra = '{"engine_pool": {"pool_size": 2, "idle_timeout": 60}}'
+        uri = "sqlite:////tmp/pooled_engine_test.db"
+        model = Database(id=-1, database_name="pooled", sqlalchemy_uri=uri, extra=extra)
+        other = Database(id=-1, database_name="pooled", sqlalchemy_uri=uri, extra=extra)
+
+        engine = model.get_sqla_engine()
+        self.assertIs(engine, other.get_sqla_engine())
+        self.assertEqual(2, engine.pool.size())
+        self.assertEqual(1, engine.execute("SELECT 1").scalar())
+
+        model = Database(database_name="not_pooled", sqlalchemy_uri=uri)
+        self.assertIsNot(model.get_sqla_engine(), Database(
+            database_name="not_pooled", sqlalchemy_uri=uri
+        ).get_sqla_engine())
+
     def test_select_star(self):
         db = get_example_database()
         table_name = "energy_usage"
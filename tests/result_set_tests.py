@@ -16,6 +16,7 @@
 # under the License.
 # isort:skip_file
 from datetime import datetime
+from unittest.mock import patch
 
 import tests.test_app
 from superset.dataframe import df_to_records
@@ -248,3 +249,24 @@ class SupersetResultSetTestCase(SupersetTestCase):
         ]
         results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
         self.assertEqual(results.columns, [])
+
+    def test_type_hints_fall_back_to_inference(self):
+        data = [("a", 1, 1.5), ("b", 2.5, 2.5)]
+        cursor_descr = [
+            ("one", "varchar(10)", None, None, None, None, True),
+            ("two", "bigint", None, None, None, None, True),
+            ("three", "double", None, None, None, None, True),
+        ]
+        results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(str(results.pa_table.schema.field("one").type), "string")
+        self.assertEqual(str(results.pa_table.schema.field("two").type), "double")
+        self.assertEqual(str(results.pa_table.schema.field("three").type), "double")
+
+    def test_parallel_column_conversion(self):
+        data = [(i, str(i), [i]) for i in range(10)]
+        cursor_descr = [("a", "int"), ("b", "string"), ("c",)]
+        with patch("superset.result_set.PARALLEL_MIN_CELLS", 1):
+            results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(
+            df_to_records(results.to_pandas_df())[3], {"a": 3, "b": "3", "c": "[3]"}
+        )
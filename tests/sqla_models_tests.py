@@ -16,6 +16,7 @@
 # under the License.
 # isort:skip_file
 from typing import Dict
+from unittest.mock import patch
 
 from superset.connectors.sqla.models import SqlaTable, TableColumn
 from superset.db_engine_specs.druid import DruidEngineSpec
@@ -109,3 +110,22 @@ class DatabaseModelTestCase(SupersetTestCase):
         extra_cache_keys = table.get_extra_cache_keys(query_obj)
         self.assertFalse(table.has_calls_to_cache_key_wrapper(query_obj))
         self.assertListEqual(extra_cache_keys, [])
+
+    def test_fetch_values_for_columns(self):
+        table = self.get_table_by_name("birth_names")
+        column_names = ["gender", "state", "num"]
+        values = table.fetch_values_for_columns(column_names, limit=10000)
+        self.assertEqual(set(values["gender"]), {"boy", "girl"})
+        self.assertTrue(all(isinstance(value, int) for value in values["num"]))
+
+        # one query per type slot returns the same values
+        with patch("superset.connectors.sqla.models.VALUES_QUERY_MAX_SLOTS", 1):
+            batched = table.fetch_values_for_columns(column_names, limit=10000)
+        for column_name in column_names:
+            self.assertEqual(
+                sorted(batched[column_name]), sorted(values[column_name])
+            )
+
+        values = table.fetch_values_for_columns(["state"], limit=10000, prefix="C")
+        self.assertTrue(values["state"])
+        self.assertTrue(all(value.startswith("C") for value in values["state"]))
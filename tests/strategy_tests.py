@@ -27,6 +27,7 @@ from superset.tasks.cache import (
     DashboardTagsStrategy,
     get_form_data,
     TopNDashboardsStrategy,
+    warm_up_charts,
 )
 
 from .base_tests import SupersetTestCase
@@ -245,3 +246,19 @@ class CacheWarmUpTests(SupersetTestCase):
         result = sorted(strategy.get_urls())
         expected = sorted(tag1_urls + tag2_urls)
         self.assertEqual(result, expected)
+
+    def test_warm_up_charts(self):
+        slc = self.get_slice("Girls", db.session)
+        charts = [(slc, None), (slc, {"slice_id": slc.id})]
+
+        report = warm_up_charts(charts, workers=2, per_database=1)
+        self.assertEqual(report["success"], [slc.id, slc.id])
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(len(report["charts"]), 1)
+        self.assertEqual(report["charts"][0]["shared_with"], [slc.id])
+        self.assertGreaterEqual(report["charts"][0]["duration_ms"], 0)
+
+        # nothing is started past the time budget
+        report = warm_up_charts(charts, time_budget=-1)
+        self.assertEqual(report["success"], [])
+        self.assertEqual(report["skipped"], [slc.id, slc.id])
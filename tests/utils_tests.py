@@ -59,6 +59,12 @@ from superset.utils.core import (
     zlib_compress,
     zlib_decompress,
 )
+from superset.utils.task_results import (
+    pack_result,
+    select_path,
+    TYPED_ARRAY_EXT,
+    unpack_result,
+)
 from superset.views.utils import get_time_range_endpoints
 from superset.views.utils import build_extra_filters
 from tests.base_tests import SupersetTestCase
@@ -1238,3 +1244,17 @@ class UtilsTestCase(SupersetTestCase):
         expected_filename = hashlib.md5(ssl_certificate.encode("utf-8")).hexdigest()
         self.assertIn(expected_filename, path)
         self.assertTrue(os.path.exists(path))
+
+    def test_task_result_envelope(self):
+        result = {
+            "status": "SUCCESS",
+            "data": {"predict": [list(range(20)), [0.5] * 20, [1, "a"]]},
+        }
+        envelope = pack_result(result)
+        self.assertEqual(unpack_result(envelope), result)
+        self.assertEqual(
+            select_path(unpack_result(envelope), "data.predict.1"), [0.5] * 20
+        )
+        packed = unpack_result(envelope, typed_arrays=True)["data"]["predict"][0]
+        self.assertEqual(packed.code, TYPED_ARRAY_EXT)
+        self.assertRaises(KeyError, select_path, result, "data.missing")
@@ -15,11 +15,12 @@
 # specific language governing permissions and limitations
 # under the License.
 # isort:skip_file
+import base64
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from math import nan
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import numpy as np
 import pandas as pd
@@ -165,6 +166,100 @@ class BaseVizTestCase(SupersetTestCase):
         test_viz = viz.BaseViz(datasource, form_data={})
         self.assertEqual(app.config["CACHE_DEFAULT_TIMEOUT"], test_viz.cache_timeout)
 
+    @patch("superset.viz.security_manager.get_rls_ids", return_value=[])
+    def test_task_cache_key_includes_user(self, mock_rls_ids):
+        datasource = self.get_datasource_mock()
+        datasource.uid = "1__table"
+        datasource.changed_on = datetime(2020, 1, 1)
+        task = Mock()
+        task.name = "regression_task"
+        test_viz = viz.BaseViz(datasource, form_data={})
+
+        key = test_viz.task_cache_key(task, 1, "target", [], user_id=1)
+        self.assertNotEqual(
+            key, test_viz.task_cache_key(task, 1, "target", [], user_id=2)
+        )
+        self.assertNotEqual(
+            key, test_viz.task_cache_key(task, 1, "other", [], user_id=1)
+        )
+
+        datasource.changed_on = datetime(2020, 1, 2)
+        self.assertNotEqual(
+            key, test_viz.task_cache_key(task, 1, "target", [], user_id=1)
+        )
+
+    @patch("superset.viz.security_manager.get_rls_ids", return_value=[])
+    @patch("superset.viz.cache")
+    def test_submit_task_attaches_to_cached_task(self, mock_cache, mock_rls_ids):
+        datasource = self.get_datasource_mock()
+        datasource.uid = "1__table"
+        datasource.changed_on = datetime(2020, 1, 1)
+        task = Mock()
+        task.name = "regression_task"
+        task.delay.return_value.id = "new-task"
+        task.app.conf.result_expires = timedelta(hours=1)
+        test_viz = viz.BaseViz(datasource, form_data={"cache_timeout": 86400})
+
+        mock_cache.get.return_value = "running-task"
+        task.AsyncResult.return_value.state = "PROCESSING"
+        self.assertEqual("running-task", test_viz.submit_task(task, 1, user_id=1))
+        task.delay.assert_not_called()
+
+        task.AsyncResult.return_value.state = "FAILURE"
+        self.assertEqual("new-task", test_viz.submit_task(task, 1, user_id=1))
+        task.delay.assert_called_once_with(1, user_id=1)
+        # the task id is not cached longer than celery keeps the result
+        mock_cache.set.assert_called_once_with(ANY, "new-task", timeout=3600)
+
+    def test_get_table_df_uses_task_result(self):
+        datasource = self.get_datasource_mock()
+        form_data = {"viz_type": "plotly_tsne", "taskId": "task-id"}
+        test_viz = viz.BaseViz(datasource, form_data=form_data)
+        result = {
+            "data": [
+                {
+                    "cluster_id": 0,
+                    "value": [
+                        {"train": {"x": 0.5, "y": 1.5}, "column": {"a": 1, "b": "x"}},
+                        {"train": {"x": 2.5, "y": 3.5}, "column": {"a": 2, "b": "y"}},
+                    ],
+                }
+            ]
+        }
+        with patch.object(test_viz, "get_task_result", return_value=result):
+            df = test_viz.get_table_df()
+        self.assertEqual(
+            ["cluster_id", "train_x", "train_y", "a", "b"], list(df.columns)
+        )
+        self.assertEqual([1, 2], df["a"].tolist())
+        self.assertTrue(pd.api.types.is_float_dtype(df["train_x"]))
+
+    def test_timeseries_prediction_to_dataframe(self):
+        data = {
+            "predict": [
+                [
+                    {
+                        "name": name,
+                        "value": {
+                            "prediction": {
+                                "date": ["2020-01-01", "2020-01-02"],
+                                "max": [3, 4],
+                                "median": [2, 3],
+                                "min": [1, 2],
+                            }
+                        },
+                    }
+                    for name in ("a", "b")
+                ]
+            ]
+        }
+        df = viz.timeseries_prediction_to_dataframe(data)
+        self.assertEqual("Dates", df.index.name)
+        self.assertEqual(
+            [("a", "MAX"), ("a", "MEDIAN"), ("a", "MIN")], list(df.columns[:3])
+        )
+        self.assertEqual([2, 3], df[("b", "MEDIAN")].tolist())
+
 
 class TableVizTestCase(SupersetTestCase):
     def test_get_data_applies_percentage(self):
@@ -1062,6 +1157,61 @@ class BaseDeckGLVizTestCase(SupersetTestCase):
         with self.assertRaises(SpatialException):
             test_viz_deckgl.parse_coordinates("fldkjsalkj,fdlaskjfjadlksj")
 
+    def test_process_spatial_data_obj(self):
+        datasource = self.get_datasource_mock()
+        form_data = {
+            "delimited_key": {"type": "delimited", "lonlatCol": "lonlat"},
+            "geohash_key": {
+                "type": "geohash",
+                "geohashCol": "geo",
+                "reverseCheckbox": True,
+            },
+        }
+        test_viz_deckgl = viz.BaseDeckGLViz(datasource, form_data)
+        df = pd.DataFrame(
+            {
+                "lonlat": ["1.23, 3.21", "1.23 3.21", None, "45 N, 12 E"],
+                "geo": ["u4pruydqqvj", "u4pruydqqvj", "ezs42", None],
+            }
+        )
+        df = test_viz_deckgl.process_spatial_data_obj("delimited_key", df)
+        self.assertEqual(df["delimited_key"][0], (1.23, 3.21))
+        self.assertEqual(df["delimited_key"][1], (1.23, 3.21))
+        self.assertIsNone(df["delimited_key"][2])
+        self.assertEqual(df["delimited_key"][3], (45.0, 12.0))
+
+        df = test_viz_deckgl.process_spatial_data_obj("geohash_key", df)
+        self.assertNotIn("geo", df.columns)
+        lat, lon = df["geohash_key"][0]
+        self.assertAlmostEqual(lat, 57.64911, places=5)
+        self.assertAlmostEqual(lon, 10.40744, places=5)
+        lat, lon = df["geohash_key"][2]
+        self.assertAlmostEqual(lat, 42.6, places=1)
+        self.assertAlmostEqual(lon, -5.6, places=1)
+        self.assertIsNone(df["geohash_key"][3])
+
+        with self.assertRaises(SpatialException):
+            test_viz_deckgl.process_spatial_data_obj(
+                "geohash_key", pd.DataFrame({"geo": ["not-a-geohash"]})
+            )
+
+    def test_binary_positions(self):
+        datasource = self.get_datasource_mock()
+        form_data = {
+            "spatial": {"type": "latlong", "lonCol": "lon", "latCol": "lat"},
+            "binary_positions": True,
+        }
+        test_viz_deckgl = viz.DeckScatterViz(datasource, form_data)
+        test_viz_deckgl.metric = None
+        df = pd.DataFrame({"lon": [1.5, 2.5], "lat": [-3.0, 4.0]})
+        data = test_viz_deckgl.get_data(df)
+        self.assertNotIn("position", data["features"][0])
+        positions = np.frombuffer(
+            base64.b64decode(data["positions"]["data"]), dtype="<f8"
+        )
+        self.assertEqual(positions.tolist(), [1.5, -3.0, 2.5, 4.0])
+        self.assertEqual(data["positions"]["size"], 2)
+
     @patch("superset.utils.core.uuid.uuid4")
     def test_filter_nulls(self, mock_uuid4):
         mock_uuid4.return_value = uuid.UUID("12345678123456781234567812345678")
@@ -1165,6 +1315,66 @@ class TimeSeriesVizTestCase(SupersetTestCase):
         ]
         self.assertEqual(expected, viz_data)
 
+    def test_timeseries_columnar_payload(self):
+        datasource = self.get_datasource_mock()
+        form_data = {
+            "groupby": ["name"],
+            "metrics": ["sum__payout"],
+            "columnar_payload": True,
+        }
+        df = pd.DataFrame(
+            {
+                "name": ["a", "a", "b"],
+                "__timestamp": ["2018-02-20", "2018-03-09", "2018-03-09"],
+                "sum__payout": [1.0, 2.0, 3.0],
+            }
+        )
+        viz_data = viz.NVD3TimeSeriesViz(datasource, form_data).get_data(df)
+        self.assertEqual(["2018-02-20", "2018-03-09"], viz_data["x"])
+        self.assertEqual(
+            [{"key": ("a",), "y": [1.0, 2.0]}, ("b",)],
+            [viz_data["series"][0], viz_data["series"][1]["key"]],
+        )
+        self.assertTrue(np.isnan(viz_data["series"][1]["y"][0]))
+
+    def test_timeseries_downsampling(self):
+        datasource = self.get_datasource_mock()
+        n = 1000
+        df = pd.DataFrame(
+            {
+                "__timestamp": pd.date_range("2019-01-01", periods=n, freq="H"),
+                "y": np.sin(np.arange(n) / 10.0),
+            }
+        )
+        df.loc[500, "y"] = 10.0
+        for method in ["lttb", "minmax"]:
+            form_data = {
+                "metrics": ["y"],
+                "downsample": method,
+                "downsample_max_points": 100,
+            }
+            test_viz = viz.NVD3TimeSeriesViz(datasource, form_data)
+            values = test_viz.get_data(df.copy())[0]["values"]
+            self.assertTrue(test_viz.is_downsampled)
+            self.assertLessEqual(len(values), 100)
+            ys = [value["y"] for value in values]
+            # the first and last points and the spike are kept
+            self.assertIn(10.0, ys)
+            self.assertEqual(ys[0], df["y"].iloc[0])
+            self.assertEqual(ys[-1], df["y"].iloc[-1])
+
+        for form_data in [
+            {"metrics": ["y"], "downsample": False},
+            {"metrics": ["y"], "downsample_max_points": 100},
+        ]:
+            test_viz = viz.NVD3TimeSeriesViz(datasource, form_data)
+            self.assertEqual(len(test_viz.get_data(df.copy())[0]["values"]), n)
+            self.assertFalse(test_viz.is_downsampled)
+
+        form_data = {"metrics": ["y"], "downsample": "grid"}
+        with self.assertRaises(Exception):
+            viz.NVD3TimeSeriesViz(datasource, form_data).get_data(df.copy())
+
     def test_process_data_resample(self):
         datasource = self.get_datasource_mock()
 
@@ -1275,3 +1485,26 @@ class BigNumberVizTestCase(SupersetTestCase):
         )
         data = viz.BigNumberViz(datasource, {"metrics": ["y"]}).get_data(df)
         assert np.isnan(data[2]["y"])
+
+
+class BubbleVizTestCase(SupersetTestCase):
+    def test_get_data_downsampling(self):
+        datasource = self.get_datasource_mock()
+        form_data = {"downsample": True, "downsample_max_points": 50}
+        test_viz = viz.BubbleViz(datasource, form_data)
+        test_viz.x_metric, test_viz.y_metric, test_viz.z_metric = "x_m", "y_m", "z_m"
+        test_viz.series = "name"
+        rng = np.random.RandomState(1)
+        df = pd.DataFrame(
+            {
+                "name": ["a"] * 995 + ["b"] * 5,
+                "x_m": np.append(rng.normal(size=995), [100.0] * 5),
+                "y_m": np.append(rng.normal(size=995), [100.0] * 5),
+                "z_m": 1.0,
+            }
+        )
+        data = test_viz.get_data(df)
+        self.assertTrue(test_viz.is_downsampled)
+        self.assertLessEqual(sum(len(series["values"]) for series in data), 50)
+        # the outlying group sits alone in its grid cells and is kept
+        self.assertIn("b", [series["key"] for series in data])